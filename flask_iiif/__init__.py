@@ -35,7 +35,17 @@ from six import string_types
 from werkzeug.utils import cached_property, import_string
 
 from . import config
+from .budget import PixelBudget
+from .cache.aio import AsyncImageCache, AsyncImageCacheAdapter
 from .cache.cache import ImageCache
+from .cache.decoded import DecodedImageCache
+from .cache.memory import ImageMemoryCache
+from .derivatives import DerivativeIndex
+from .executor import RenderExecutor
+from .metadata.metadata import ImageMetadataIndex
+from .processpool import ProcessRenderExecutor
+from .scheduler import RenderScheduler
+from .singleflight import SingleFlight
 from .utils import iiif_image_url
 
 
@@ -45,6 +55,7 @@ class IIIF(object):
     def __init__(self, app=None):
         """Initialize login callback."""
         self.uuid_to_image_opener = None
+        self.async_uuid_to_image_opener = None
         self.api_decorator_callback = None
         if app is not None:
             self.init_app(app)
@@ -67,6 +78,199 @@ class IIIF(object):
         assert isinstance(handler, ImageCache)
         return handler
 
+    @cached_property
+    def async_cache(self):
+        """Return the cache handler of the asynchronous endpoints.
+
+        .. note::
+
+            It is set with
+            :py:attr:`~flask_iiif.config.IIIF_ASYNC_CACHE_HANDLER`, the cache
+            handler runs on threads if it is not. More infos could be found
+            in :py:mod:`~flask_iiif.cache.aio`.
+        """
+        handler = current_app.config["IIIF_ASYNC_CACHE_HANDLER"]
+        if handler is None:
+            return AsyncImageCacheAdapter(self.cache)
+        if isinstance(handler, string_types):
+            handler = import_string(handler)
+        if callable(handler):
+            handler = handler(self.app)
+        assert isinstance(handler, AsyncImageCache)
+        return handler
+
+    @cached_property
+    def metadata(self):
+        """Return the image metadata index, if any.
+
+        .. note::
+
+            The index is set with
+            :py:attr:`~flask_iiif.config.IIIF_METADATA_HANDLER`. More infos
+            could be found in :py:mod:`~flask_iiif.metadata.metadata`.
+        """
+        handler = current_app.config["IIIF_METADATA_HANDLER"]
+        if handler is None:
+            return None
+        if isinstance(handler, string_types):
+            handler = import_string(handler)
+        if callable(handler):
+            handler = handler(self.app)
+        assert isinstance(handler, ImageMetadataIndex)
+        return handler
+
+    @cached_property
+    def decoded_cache(self):
+        """Return the in-process cache of decoded images, if any.
+
+        .. note::
+
+            The cache is enabled with
+            :py:attr:`~flask_iiif.config.IIIF_DECODED_CACHE_SIZE`.
+        """
+        size = current_app.config.get("IIIF_DECODED_CACHE_SIZE", 0)
+        if not size:
+            return None
+        return DecodedImageCache(size)
+
+    @cached_property
+    def source_sizes(self):
+        """Return the in-process cache of the source image sizes.
+
+        The sizes are stored as ``"width,height"`` strings, see
+        :func:`~flask_iiif.restful.source_size`.
+
+        .. note::
+
+            Its size is set with
+            :py:attr:`~flask_iiif.config.IIIF_SOURCE_SIZES_CACHE_SIZE`.
+        """
+        return ImageMemoryCache(
+            max_bytes=current_app.config.get("IIIF_SOURCE_SIZES_CACHE_SIZE", 0)
+        )
+
+    @cached_property
+    def derivatives(self):
+        """Return the index of the cached renderings, if any.
+
+        .. note::
+
+            It is enabled with
+            :py:attr:`~flask_iiif.config.IIIF_DERIVE_FROM_CACHE`. More infos
+            could be found in :py:mod:`~flask_iiif.derivatives`.
+        """
+        if not current_app.config.get("IIIF_DERIVE_FROM_CACHE", False):
+            return None
+        return DerivativeIndex(self.cache)
+
+    @cached_property
+    def single_flight(self):
+        """Return the coordinator rendering each cache miss once.
+
+        .. note::
+
+            It is enabled with :py:attr:`~flask_iiif.config.IIIF_SINGLE_FLIGHT`.
+            More infos could be found in :py:mod:`~flask_iiif.singleflight`.
+        """
+        return SingleFlight()
+
+    @cached_property
+    def render_executor(self):
+        """Return the thread pool rendering the images, if any.
+
+        .. note::
+
+            The pool is enabled with
+            :py:attr:`~flask_iiif.config.IIIF_RENDER_WORKERS`. More infos
+            could be found in :py:mod:`~flask_iiif.executor`.
+        """
+        workers = current_app.config.get("IIIF_RENDER_WORKERS", 0)
+        if not workers:
+            return None
+        return RenderExecutor(
+            workers,
+            max_queue=current_app.config.get("IIIF_RENDER_QUEUE_SIZE", 0),
+            retry_after=current_app.config.get("IIIF_RENDER_RETRY_AFTER"),
+        )
+
+    @cached_property
+    def render_processes(self):
+        """Return the process pool rendering the images, if any.
+
+        .. note::
+
+            The pool is enabled with
+            :py:attr:`~flask_iiif.config.IIIF_RENDER_PROCESSES`. More infos
+            could be found in :py:mod:`~flask_iiif.processpool`.
+        """
+        processes = current_app.config.get("IIIF_RENDER_PROCESSES", 0)
+        if not processes:
+            return None
+        return ProcessRenderExecutor(processes)
+
+    @cached_property
+    def pixel_budget(self):
+        """Return the budget of pixels decoded at the same time, if any.
+
+        .. note::
+
+            The budget is enabled with
+            :py:attr:`~flask_iiif.config.IIIF_DECODE_PIXEL_BUDGET`. More
+            infos could be found in :py:mod:`~flask_iiif.budget`.
+        """
+        capacity = current_app.config.get("IIIF_DECODE_PIXEL_BUDGET")
+        if not capacity:
+            return None
+        return PixelBudget(
+            capacity,
+            timeout=current_app.config.get("IIIF_DECODE_PIXEL_BUDGET_TIMEOUT"),
+            retry_after=current_app.config.get("IIIF_RENDER_RETRY_AFTER"),
+        )
+
+    @cached_property
+    def scheduler(self):
+        """Return the scheduler of the renderings by cost, if any.
+
+        .. note::
+
+            The scheduler is enabled with
+            :py:attr:`~flask_iiif.config.IIIF_SCHEDULER_LANES`. More infos
+            could be found in :py:mod:`~flask_iiif.scheduler`.
+        """
+        lanes = current_app.config.get("IIIF_SCHEDULER_LANES")
+        if not lanes:
+            return None
+        return RenderScheduler(
+            lanes,
+            uuid_limit=current_app.config.get("IIIF_SCHEDULER_UUID_LIMIT"),
+            timeout=current_app.config.get("IIIF_SCHEDULER_TIMEOUT"),
+            retry_after=current_app.config.get("IIIF_RENDER_RETRY_AFTER"),
+        )
+
+    def invalidate(self, uuid):
+        """Delete everything cached about an image, once its source changed.
+
+        The cached images and image informations listed in the index of the
+        image are deleted, see
+        :func:`~flask_iiif.cache.cache.ImageCache.invalidate`, with the
+        metadata and the renderings index of the image. The decoded images
+        and the size kept by the current process are deleted too, the other
+        processes keep theirs until they expire, see
+        :py:attr:`~flask_iiif.config.IIIF_SOURCE_SIZES_CACHE_TIME`.
+
+        :param uuid: the image uuid
+        :returns: the number of deleted cache keys
+        """
+        count = self.cache.invalidate(uuid)
+        if self.derivatives is not None:
+            self.cache.delete(self.derivatives.key(uuid))
+        if self.metadata is not None:
+            self.metadata.delete(uuid)
+        if self.decoded_cache is not None:
+            self.decoded_cache.invalidate(uuid)
+        self.source_sizes.delete(uuid)
+        return count
+
     def init_app(self, app):
         """Initialize a Flask application."""
         self.app = app
@@ -82,6 +286,12 @@ class IIIF(object):
             if k.startswith("IIIF_"):
                 self.app.config.setdefault(k, getattr(config, k))
 
+        # Register the commands
+        if hasattr(app, "cli"):
+            from .cli import iiif
+
+            app.cli.add_command(iiif)
+
         # Register context processors
         if hasattr(app, "add_template_global"):
             app.add_template_global(iiif_image_url)
@@ -133,6 +343,17 @@ class IIIF(object):
             IIIFImageBase, url_join(prefix, "<string:version>/<string:uuid>")
         )
 
+    def init_asgi(self, prefix="/api/multimedia/image/"):
+        """Return the ASGI application of the asynchronous endpoints.
+
+        :param str prefix: the url perfix, as for :func:`init_restful`
+
+        .. seealso:: :py:mod:`~flask_iiif.asgi`
+        """
+        from .asgi import IIIFAsgiApp
+
+        return IIIFAsgiApp(self.app, prefix=prefix)
+
     def uuid_to_image_opener_handler(self, callback):
         """Set the callback for the ``uuid`` to ``image`` convertion.
 
@@ -151,6 +372,21 @@ class IIIF(object):
         """
         self.uuid_to_image_opener = callback
 
+    def async_uuid_to_image_opener_handler(self, callback):
+        """Set the coroutine for the ``uuid`` to ``image`` convertion.
+
+        It is used by the asynchronous endpoints instead of
+        :func:`uuid_to_image_opener_handler`.
+
+        .. code-block:: python
+
+            async def uuid_to_path(uuid):
+                # await something magical
+
+            iiif.async_uuid_to_image_opener_handler(uuid_to_path)
+        """
+        self.async_uuid_to_image_opener = callback
+
     def api_decorator_handler(self, callback):
         """Protect API handler.
 
@@ -10,31 +10,131 @@
 
 """Multimedia Image API."""
 
+import datetime
 import itertools
 import math
 import os
 import re
+import struct
+import tempfile
+from io import BufferedReader, FileIO
 
-from flask import current_app
+from flask import current_app, has_app_context
 from PIL import Image
 from six import BytesIO, string_types
 from werkzeug.utils import import_string
 
 from .errors import (
     IIIFValidatorError,
+    MultimediaError,
     MultimediaImageCropError,
     MultimediaImageFormatError,
     MultimediaImageNotFound,
     MultimediaImageQualityError,
     MultimediaImageResizeError,
     MultimediaImageRotateError,
+    MultimediaImageTooLarge,
 )
 
 
+def _jpeg2000_codestream(fp):
+    """Read the coding style of a JPEG 2000 codestream.
+
+    :param fp: The image file object
+    :returns: a ``(decomposition levels, quality layers)`` tuple or ``None``
+              if the coding style could not be found
+    """
+    position = fp.tell()
+    try:
+        fp.seek(0)
+        if fp.read(2) != b"\xff\x4f":
+            # Find the codestream box of a JP2 file
+            fp.seek(0)
+            while True:
+                header = fp.read(8)
+                if len(header) != 8:
+                    return None
+                length, box_type = struct.unpack(">I4s", header)
+                header_length = 8
+                if length == 1:
+                    length = struct.unpack(">Q", fp.read(8))[0]
+                    header_length = 16
+                if box_type == b"jp2c":
+                    break
+                if length < header_length:
+                    return None
+                fp.seek(length - header_length, os.SEEK_CUR)
+            if fp.read(2) != b"\xff\x4f":
+                return None
+
+        # Walk the main header markers until the coding style default
+        while True:
+            marker = fp.read(2)
+            if len(marker) != 2 or marker in (b"\xff\x90", b"\xff\xd9"):
+                return None
+            (length,) = struct.unpack(">H", fp.read(2))
+            if marker == b"\xff\x52":
+                segment = fp.read(length - 2)
+                if len(segment) < 6:
+                    return None
+                layers, levels = struct.unpack(">2xH1xB", segment[:6])
+                return levels, layers
+            fp.seek(length - 2, os.SEEK_CUR)
+    except (IOError, struct.error):
+        return None
+    finally:
+        fp.seek(position)
+
+
 class MultimediaObject(object):
     """The Multimedia Object."""
 
 
+class SourceFile(BufferedReader):
+    """Unchanged source file of an image, as served by identity requests.
+
+    .. seealso:: :func:`~flask_iiif.api.MultimediaImage.serve_source`
+    """
+
+    @property
+    def last_modified(self):
+        """Return the modification date of the file."""
+        return datetime.datetime.utcfromtimestamp(int(os.fstat(self.fileno()).st_mtime))
+
+
+class _SpoolWriter(object):
+    """File written in memory, moved to a temporary file once too large.
+
+    .. seealso:: :py:attr:`~flask_iiif.config.IIIF_SPOOL_MAX_SIZE`
+    """
+
+    def __init__(self, max_size):
+        """Initialize the file.
+
+        :param int max_size: The size in bytes above which the data are
+            moved to a temporary file
+        """
+        self.max_size = max_size
+        self.file = BytesIO()
+
+    def write(self, data):
+        """Write data at the current position."""
+        if isinstance(self.file, BytesIO):
+            position = self.file.tell()
+            size = self.file.seek(0, os.SEEK_END)
+            self.file.seek(position)
+            if max(size, position + len(data)) > self.max_size:
+                rolled = tempfile.TemporaryFile()
+                rolled.write(self.file.getbuffer())
+                rolled.seek(position)
+                self.file = rolled
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        """Return the attributes of the current file."""
+        return getattr(self.file, name)
+
+
 class MultimediaImage(MultimediaObject):
     r"""Multimedia Image API.
 
@@ -84,17 +184,46 @@ class MultimediaImage(MultimediaObject):
             image.resize(size)
             # Serve it
             return send_file(image.serve(), mimetype='image/jpeg')
+
+    In lazy mode the operations are only recorded and applied by
+    :func:`render`, which is called by :func:`save` and :func:`serve`. The
+    crops and resizes are merged into a single resample of the source and
+    rotations by multiples of 90 degrees are applied as transpositions of
+    the already resized image:
+
+    .. code-block:: python
+
+        image = MultimediaImage.from_file(path, lazy=True)
+        image.crop('20,20,400,300')
+        image.resize('300,')
+        image.rotate(90)
+        # Only one crop and resample of the source is done
+        image.save('/tmp/image.jpeg')
     """
 
-    def __init__(self, image):
-        """Initialize the image."""
+    def __init__(self, image, lazy=False):
+        """Initialize the image.
+
+        :param image: The :py:mod:`PIL.Image` to work on
+        :param bool lazy: Record the operations instead of applying them
+        """
         self.image = image
+        self.lazy = lazy
+        # The pending crop box on the source, output size and resample
+        self._geometry = None
+        # The pending operations applied after the geometry
+        self._operations = []
+        # The decoded image shared with other requests, never closed
+        self._shared = None
+        # The pixel budget and the pixels reserved for the decoding
+        self._reserved = None
 
     @classmethod
-    def from_file(cls, path):
+    def from_file(cls, path, lazy=False):
         """Return the image object from the given path.
 
         :param str path: The absolute path of the file
+        :param bool lazy: Record the operations instead of applying them
         :returns: a :class:`~flask_iiif.api.MultimediaImage`
                   instance
         """
@@ -104,19 +233,20 @@ class MultimediaImage(MultimediaObject):
             )
 
         image = Image.open(path)
-        return cls(image)
+        return cls(image, lazy=lazy)
 
     @classmethod
-    def from_string(cls, source):
+    def from_string(cls, source, lazy=False):
         """Create an :class:`~flask_iiif.api.MultimediaImage` instance.
 
         :param str source: the image string
         :type source: `BytesIO` object
+        :param bool lazy: Record the operations instead of applying them
         :returns: a :class:`~flask_iiif.api.MultimediaImage`
                   instance
         """
         image = Image.open(source)
-        return cls(image)
+        return cls(image, lazy=lazy)
 
     def resize(self, dimensions, resample=None):
         """Resize the image.
@@ -136,88 +266,20 @@ class MultimediaImage(MultimediaObject):
                 * '!w,h': Best fit for the given width and height.
 
         """
-        real_width, real_height = self.image.size
-        point_x, point_y = 0, 0
-
-        # Check if it is `pct:`
-        if dimensions.startswith("pct:"):
-            percent = float(dimensions.split(":")[1]) * 0.01
-            if percent < 0:
-                raise MultimediaImageResizeError(
-                    (
-                        "Image percentage could not be negative, {0} has been" " given"
-                    ).format(percent)
-                )
-
-            width = max(1, int(real_width * percent))
-            height = max(1, int(real_height * percent))
-
-        # Check if it is `,h` or `^,h`,
-        # the '^' case is handled the same way as just height being present
-        elif dimensions.startswith((",", "^,")):
-            if dimensions.startswith(","):  # Handle `,h`
-                height = int(dimensions[1:])
-            else:  # Handle `^,h`
-                height = int(dimensions[2:])
-
-            # find the ratio
-            ratio = self.reduce_by(height, real_height)
-            # calculate width (minimum 1)
-            width = max(1, int(real_width * ratio))
-
-        # Check if it is `!w,h`
-        elif dimensions.startswith("!"):
-            point_x, point_y = map(int, dimensions[1:].split(","))
-            # find the ratio
-            ratio_x = self.reduce_by(point_x, real_width)
-            ratio_y = self.reduce_by(point_y, real_height)
-            # take the min
-            ratio = min(ratio_x, ratio_y)
-            # calculate the dimensions
-            width = max(1, int(real_width * ratio))
-            height = max(1, int(real_height * ratio))
-
-        # Check if it is `w,` or `^w,`
-        # the '^' case is handled the same way as just width being present
-        elif dimensions.endswith(",") or (
-            (dimensions.startswith("^") and dimensions.endswith(","))
-        ):
-            if dimensions.endswith(",") and not dimensions.startswith(
-                "^"
-            ):  # Handle `w,`
-                width = int(dimensions[:-1])
-            else:  # Handle `^w,`
-                width = int(dimensions[1:-1])
-
-            # find the ratio
-            ratio = self.reduce_by(width, real_width)
-            # calculate the height
-            height = max(1, int(real_height * ratio))
-
-        # Normal mode `w,h`
-        else:
-            try:
-                width, height = map(int, dimensions.split(","))
-            except ValueError:
-                raise MultimediaImageResizeError(
-                    "The request must contain width,height sequence"
-                )
-
-        # If a dimension is missing throw error
-        if any(
-            (dimension <= 0 and dimension is not None) for dimension in (width, height)
-        ):
-            raise MultimediaImageResizeError(
-                (
-                    "Width and height cannot be zero or negative, {0},{1} has"
-                    " been given"
-                ).format(width, height)
+        if self.lazy:
+            self._record_geometry()
+            box, size, _ = self._geometry
+            self._geometry = (
+                box,
+                self.get_resize_dimensions(dimensions, *size),
+                resample,
             )
+            return
 
-        arguments = dict(size=(width, height))
-        if resample:
-            arguments["resample"] = resample
-        self.image = self.image.resize(**arguments)
+        width, height = self.get_resize_dimensions(dimensions, *self.image.size)
+        self.image = self.image.resize(
+            **self._resize_arguments((width, height), resample)
+        )
 
     def crop(self, coordinates):
         """Crop the image.
@@ -232,69 +294,27 @@ class MultimediaImage(MultimediaObject):
                 * 'pct:x,y,w,h': percentage.
 
         """
-        # Get image full dimensions
-        real_width, real_height = self.image.size
-        real_dimensions = itertools.cycle((real_width, real_height))
-
-        dimensions = []
-        percentage = False
-        if coordinates.startswith("pct:"):
-            for coordinate in coordinates.split(":")[1].split(","):
-                dimensions.append(float(coordinate))
-            percentage = True
-        else:
-            for coordinate in coordinates.split(","):
-                dimensions.append(int(coordinate))
-
-        # First check if it has 4 coordinates x,y,w,h
-        dimensions_length = len(dimensions)
-        if dimensions_length != 4:
-            raise MultimediaImageCropError(
-                "Must have 4 dimensions {0} has been given".format(dimensions_length)
-            )
-
-        # Make sure that there is not any negative dimension
-        if any(coordinate < 0 for coordinate in dimensions):
-            raise MultimediaImageCropError(
-                "Dimensions cannot be negative {0} has been given".format(dimensions)
-            )
-
-        if percentage:
-            if any(coordinate > 100.0 for coordinate in dimensions):
-                raise MultimediaImageCropError(
-                    "Dimensions could not be grater than 100%"
-                )
-
-            # Calculate the dimensions
-            start_x, start_y, width, height = [
-                int(
-                    math.floor(
-                        self.percent_to_number(dimension) * next(real_dimensions)
-                    )
-                )
-                for dimension in dimensions
-            ]
-        else:
-            start_x, start_y, width, height = dimensions
-
-        # Check if any of the requested axis is outside of image borders
-        if any(axis > next(real_dimensions) for axis in (start_x, start_y)):
-            raise MultimediaImageCropError(
-                "Outside of image borders {0},{1}".format(real_width, real_height)
+        if self.lazy:
+            self._record_geometry()
+            box, size, resample = self._geometry
+            crop_box = self.get_crop_box(coordinates, *size)
+            # Map the crop box on the source pixels
+            scale_x = self.reduce_by(box[2] - box[0], size[0])
+            scale_y = self.reduce_by(box[3] - box[1], size[1])
+            self._geometry = (
+                (
+                    box[0] + crop_box[0] * scale_x,
+                    box[1] + crop_box[1] * scale_y,
+                    box[0] + crop_box[2] * scale_x,
+                    box[1] + crop_box[3] * scale_y,
+                ),
+                (crop_box[2] - crop_box[0], crop_box[3] - crop_box[1]),
+                resample,
             )
+            return
 
-        # Calculate the final dimensions
-        max_x = start_x + width
-        max_y = start_y + height
-        # Check if the final width is bigger than the the real image width
-        if max_x > real_width:
-            max_x = real_width
-
-        # Check if the final height is bigger than the the real image height
-        if max_y > real_height:
-            max_y = real_height
-
-        self.image = self.image.crop((start_x, start_y, max_x, max_y))
+        box = self.get_crop_box(coordinates, *self.image.size)
+        self.image = self.image.crop(box)
 
     def rotate(self, degrees, mirror=False):
         """Rotate the image clockwise by given degrees.
@@ -316,6 +336,10 @@ class MultimediaImage(MultimediaObject):
                 "Degrees must be between 0 and 360, {0} has been given".format(degrees)
             )
 
+        if self.lazy:
+            self._operations.append(("rotate", (degrees,), dict(mirror=mirror)))
+            return
+
         # mirror must be applied before rotation
         if mirror:
             self.image = self.image.transpose(transforms.get("mirror"))
@@ -350,6 +374,10 @@ class MultimediaImage(MultimediaObject):
                 ).format(quality, qualities)
             )
 
+        if self.lazy:
+            self._operations.append(("quality", (quality,), {}))
+            return
+
         qualities_by_code = zip(qualities, current_app.config["IIIF_CONVERTERS"])
 
         if quality not in ("default", "color"):
@@ -370,7 +398,118 @@ class MultimediaImage(MultimediaObject):
 
         :return: the image size
         """
-        return self.image.size
+        if not self.lazy:
+            return self.image.size
+
+        width, height = self._geometry[1] if self._geometry else self.image.size
+        for name, args, _ in self._operations:
+            if name != "rotate":
+                continue
+            if float(args[0]) % 90:
+                # The size of free rotations is only known once applied
+                self.render()
+                return self.image.size
+            if float(args[0]) % 180:
+                width, height = height, width
+        return width, height
+
+    def render(self):
+        """Apply the operations recorded in lazy mode.
+
+        The pending crops and resizes are applied in a single pass, followed
+        by the rotations and quality changes in their recorded order.
+        """
+        if not self.lazy:
+            return
+
+        geometry, operations = self._geometry, self._operations
+        self._geometry, self._operations = None, []
+        self.lazy = False
+        try:
+            if geometry:
+                box, size, resample = geometry
+                if box == (0, 0) + self.image.size and size == self.image.size:
+                    pass
+                elif size == (box[2] - box[0], box[3] - box[1]) and all(
+                    float(coordinate).is_integer() for coordinate in box
+                ):
+                    self.image = self.image.crop(tuple(map(int, box)))
+                else:
+                    self.image = self.image.resize(
+                        **self._resize_arguments(size, resample, box=box)
+                    )
+
+            for name, args, kwargs in operations:
+                if name == "rotate" and not float(args[0]) % 90:
+                    self._transpose(*args, **kwargs)
+                else:
+                    getattr(self, name)(*args, **kwargs)
+        finally:
+            self.lazy = True
+
+    @staticmethod
+    def _resize_arguments(size, resample=None, box=None):
+        """Build the arguments of :py:meth:`PIL.Image.Image.resize`.
+
+        Large downscales are first reduced by an integer factor with a cheap
+        box filter, as configured by
+        :py:data:`~flask_iiif.config.IIIF_RESIZE_REDUCING_GAP`.
+        """
+        arguments = dict(size=size)
+        if box is not None:
+            arguments["box"] = box
+        if resample:
+            arguments["resample"] = resample
+        if has_app_context():
+            reducing_gap = current_app.config.get("IIIF_RESIZE_REDUCING_GAP")
+            if reducing_gap:
+                arguments["reducing_gap"] = reducing_gap
+        return arguments
+
+    def _record_geometry(self):
+        """Prepare the pending geometry before a crop or a resize."""
+        if self._operations:
+            # Geometry can't be merged across rotations or quality changes
+            self.render()
+        if not self._geometry:
+            self._geometry = ((0, 0) + self.image.size, self.image.size, None)
+
+    def _transpose(self, degrees, mirror=False):
+        """Rotate the image by a multiple of 90 degrees, as :func:`rotate`.
+
+        The pixels are moved without resampling, and the mode is converted
+        as by :func:`rotate`, so that both modes render the same image.
+
+        :param degrees: The degrees given to :func:`rotate`, should be a
+            multiple of 90
+        :param bool mirror: Flip image from left to right
+        """
+        # PIL wants to do anti-clockwise rotation so swap these around
+        transforms = {
+            "90": Image.ROTATE_270,
+            "180": Image.ROTATE_180,
+            "270": Image.ROTATE_90,
+        }
+
+        # mirror must be applied before rotation
+        if mirror:
+            self.image = self.image.transpose(Image.FLIP_LEFT_RIGHT)
+
+        if str(degrees) in transforms:
+            self.image = self.image.transpose(transforms[str(degrees)])
+            return
+
+        # Same mode and anti-clockwise direction as the rotations by any angle
+        self.image = self.image.convert("RGBA")
+        degrees = int(float(degrees)) % 360
+        if degrees:
+            self.image = self.image.transpose(
+                {
+                    90: Image.ROTATE_90,
+                    180: Image.ROTATE_180,
+                    270: Image.ROTATE_270,
+                }[degrees]
+            )
 
     def save(self, path, image_format="jpeg", quality=90):
         """Store the image to the specific path.
@@ -385,6 +524,7 @@ class MultimediaImage(MultimediaObject):
             and it will be changed to jpeg.
 
         """
+        self.render()
         # transform `image_format` is lower case and not equals to jpg
         cleaned_image_format = self._prepare_for_output(image_format)
         self.image.save(path, cleaned_image_format, quality=quality)
@@ -400,8 +540,21 @@ class MultimediaImage(MultimediaObject):
             `image_format` = jpg will not be recognized by
             :py:mod:`PIL.Image` and it will be changed to jpeg.
 
+        .. note::
+
+            With :py:attr:`~flask_iiif.config.IIIF_SPOOL_MAX_SIZE`, the
+            images larger than it are encoded into a temporary file instead,
+            which is removed once closed.
+
         """
-        image_buffer = BytesIO()
+        self.render()
+        max_size = 0
+        if has_app_context():
+            max_size = current_app.config.get("IIIF_SPOOL_MAX_SIZE", 0)
+        if max_size:
+            image_buffer = _SpoolWriter(max_size)
+        else:
+            image_buffer = BytesIO()
         # transform `image_format` is lower case and not equals to jpg
         cleaned_image_format = self._prepare_for_output(image_format)
         save_kwargs = dict(quality=quality)
@@ -410,6 +563,9 @@ class MultimediaImage(MultimediaObject):
             save_kwargs.update(save_all=True)
 
         self.image.save(image_buffer, cleaned_image_format, **save_kwargs)
+        if max_size:
+            # A BytesIO, or a temporary file if it was too large
+            image_buffer = image_buffer.file
         image_buffer.seek(0)
 
         return image_buffer
@@ -443,8 +599,169 @@ class MultimediaImage(MultimediaObject):
         if image_format in ("pdf", "jpeg"):
             self.image = self.image.convert("RGB")
 
+        if self.image is self._shared:
+            # Saving stores the encoder settings on the image
+            self.image = self.image.copy()
+
         return image_format
 
+    @classmethod
+    def get_resize_dimensions(cls, dimensions, real_width, real_height):
+        """Calculate the output size of :func:`resize` without touching pixels.
+
+        :param str dimensions: The dimensions to resize the image
+        :param int real_width: The width of the image to be resized
+        :param int real_height: The height of the image to be resized
+        :returns: the ``(width, height)`` of the resized image
+        """
+        point_x, point_y = 0, 0
+
+        # Check if it is `pct:`
+        if dimensions.startswith("pct:"):
+            percent = float(dimensions.split(":")[1]) * 0.01
+            if percent < 0:
+                raise MultimediaImageResizeError(
+                    (
+                        "Image percentage could not be negative, {0} has been" " given"
+                    ).format(percent)
+                )
+
+            width = max(1, int(real_width * percent))
+            height = max(1, int(real_height * percent))
+
+        # Check if it is `,h` or `^,h`,
+        # the '^' case is handled the same way as just height being present
+        elif dimensions.startswith((",", "^,")):
+            if dimensions.startswith(","):  # Handle `,h`
+                height = int(dimensions[1:])
+            else:  # Handle `^,h`
+                height = int(dimensions[2:])
+
+            # find the ratio
+            ratio = cls.reduce_by(height, real_height)
+            # calculate width (minimum 1)
+            width = max(1, int(real_width * ratio))
+
+        # Check if it is `!w,h`
+        elif dimensions.startswith("!"):
+            point_x, point_y = map(int, dimensions[1:].split(","))
+            # find the ratio
+            ratio_x = cls.reduce_by(point_x, real_width)
+            ratio_y = cls.reduce_by(point_y, real_height)
+            # take the min
+            ratio = min(ratio_x, ratio_y)
+            # calculate the dimensions
+            width = max(1, int(real_width * ratio))
+            height = max(1, int(real_height * ratio))
+
+        # Check if it is `w,` or `^w,`
+        # the '^' case is handled the same way as just width being present
+        elif dimensions.endswith(",") or (
+            (dimensions.startswith("^") and dimensions.endswith(","))
+        ):
+            if dimensions.endswith(",") and not dimensions.startswith(
+                "^"
+            ):  # Handle `w,`
+                width = int(dimensions[:-1])
+            else:  # Handle `^w,`
+                width = int(dimensions[1:-1])
+
+            # find the ratio
+            ratio = cls.reduce_by(width, real_width)
+            # calculate the height
+            height = max(1, int(real_height * ratio))
+
+        # Normal mode `w,h`
+        else:
+            try:
+                width, height = map(int, dimensions.split(","))
+            except ValueError:
+                raise MultimediaImageResizeError(
+                    "The request must contain width,height sequence"
+                )
+
+        # If a dimension is missing throw error
+        if any(
+            (dimension <= 0 and dimension is not None) for dimension in (width, height)
+        ):
+            raise MultimediaImageResizeError(
+                (
+                    "Width and height cannot be zero or negative, {0},{1} has"
+                    " been given"
+                ).format(width, height)
+            )
+
+        return width, height
+
+    @classmethod
+    def get_crop_box(cls, coordinates, real_width, real_height):
+        """Calculate the box of :func:`crop` without touching pixels.
+
+        :param str coordinates: The coordinates to crop the image
+        :param int real_width: The width of the image to be cropped
+        :param int real_height: The height of the image to be cropped
+        :returns: the ``(left, upper, right, lower)`` crop box
+        """
+        real_dimensions = itertools.cycle((real_width, real_height))
+
+        dimensions = []
+        percentage = False
+        if coordinates.startswith("pct:"):
+            for coordinate in coordinates.split(":")[1].split(","):
+                dimensions.append(float(coordinate))
+            percentage = True
+        else:
+            for coordinate in coordinates.split(","):
+                dimensions.append(int(coordinate))
+
+        # First check if it has 4 coordinates x,y,w,h
+        dimensions_length = len(dimensions)
+        if dimensions_length != 4:
+            raise MultimediaImageCropError(
+                "Must have 4 dimensions {0} has been given".format(dimensions_length)
+            )
+
+        # Make sure that there is not any negative dimension
+        if any(coordinate < 0 for coordinate in dimensions):
+            raise MultimediaImageCropError(
+                "Dimensions cannot be negative {0} has been given".format(dimensions)
+            )
+
+        if percentage:
+            if any(coordinate > 100.0 for coordinate in dimensions):
+                raise MultimediaImageCropError(
+                    "Dimensions could not be grater than 100%"
+                )
+
+            # Calculate the dimensions
+            start_x, start_y, width, height = [
+                int(
+                    math.floor(cls.percent_to_number(dimension) * next(real_dimensions))
+                )
+                for dimension in dimensions
+            ]
+        else:
+            start_x, start_y, width, height = dimensions
+
+        # Check if any of the requested axis is outside of image borders
+        if any(axis > next(real_dimensions) for axis in (start_x, start_y)):
+            raise MultimediaImageCropError(
+                "Outside of image borders {0},{1}".format(real_width, real_height)
+            )
+
+        # Calculate the final dimensions
+        max_x = start_x + width
+        max_y = start_y + height
+        # Check if the final width is bigger than the the real image width
+        if max_x > real_width:
+            max_x = real_width
+
+        # Check if the final height is bigger than the the real image height
+        if max_y > real_height:
+            max_y = real_height
+
+        return start_x, start_y, max_x, max_y
+
     @staticmethod
     def reduce_by(nominally, dominator):
         """Calculate the ratio."""
@@ -536,11 +853,586 @@ class IIIFImageAPIWrapper(MultimediaImage):
             "quality": self.apply_quality,
         }
 
+        # Reject the requests over the limits before decoding anything
+        self.check_limits(cases, **kwargs)
+
+        # Let the decoder skip the pixels the request doesn't need
+        kwargs.update(self.prepare_decode(cases, **kwargs))
+
         for key in order:
             # Ignore if has the ignore value for the specific key
             if kwargs.get(key) != cases.get(key, {}).get("ignore"):
                 tools.get(key)(kwargs.get(key))
 
+    def request_size(self, cases, **kwargs):
+        """Calculate the sizes of a request from the image header.
+
+        :param dict cases: The IIIF validations of the requested version
+        :returns: the ``(width, height)`` of the region on the source and
+                  the ``(width, height)`` of the output image
+        """
+        return self.get_request_size(cases, *self.size(), **kwargs)
+
+    @classmethod
+    def get_request_size(cls, cases, real_width, real_height, **kwargs):
+        """Calculate the sizes of a request from the size of the source.
+
+        :param dict cases: The IIIF validations of the requested version
+        :param int real_width: The width of the source
+        :param int real_height: The height of the source
+        :returns: the ``(width, height)`` of the region on the source and
+                  the ``(width, height)`` of the output image
+        """
+        width, height = real_width, real_height
+        region = kwargs.get("region")
+        if region not in (None, cases.get("region", {}).get("ignore")):
+            box = cls.get_crop_box(region, width, height)
+            width, height = box[2] - box[0], box[3] - box[1]
+        region_size = (width, height)
+        size = kwargs.get("size")
+        if size not in (None, cases.get("size", {}).get("ignore")):
+            width, height = cls.get_resize_dimensions(size, width, height)
+        rotation = kwargs.get("rotation")
+        if rotation not in (None, cases.get("rotation", {}).get("ignore")):
+            degrees = float(rotation.lstrip("!")) % 360
+            if degrees % 90:
+                # Bounding box of the rotated image
+                radians = math.radians(degrees)
+                cos, sin = abs(math.cos(radians)), abs(math.sin(radians))
+                width, height = (
+                    int(math.ceil(width * cos + height * sin)),
+                    int(math.ceil(width * sin + height * cos)),
+                )
+            elif degrees % 180:
+                width, height = height, width
+        return region_size, (width, height)
+
+    @classmethod
+    def canonical_parameters(cls, width=None, height=None, **kwargs):
+        """Normalize the parameters of a request.
+
+        Equivalent requests get the same parameters: the region and the size
+        are resolved to pixels if the size of the source is known, the
+        rotations between 0 and 360 are taken modulo 360 and the quality and the format are
+        replaced by their canonical names.
+
+        :param int width: The width of the source, if known
+        :param int height: The height of the source, if known
+        :returns: the ``region``, ``size``, ``rotation``, ``quality`` and
+                  ``image_format`` of the request
+        """
+        version = kwargs.get("version", "v2")
+        cases = current_app.config["IIIF_VALIDATIONS"].get(version)
+        region, size = kwargs.get("region"), kwargs.get("size")
+        if width and height:
+            try:
+                box = 0, 0, width, height
+                if region != cases.get("region", {}).get("ignore"):
+                    box = cls.get_crop_box(region, width, height)
+                output = box[2] - box[0], box[3] - box[1]
+                if size != cases.get("size", {}).get("ignore"):
+                    output = cls.get_resize_dimensions(size, *output)
+            except (MultimediaError, ValueError):
+                # The request is rejected when the image is rendered
+                pass
+            else:
+                region = "{0},{1},{2},{3}".format(
+                    box[0], box[1], box[2] - box[0], box[3] - box[1]
+                )
+                size = "{0},{1}".format(*output)
+
+        rotation = kwargs.get("rotation")
+        mirror = "!" if rotation.startswith("!") else ""
+        try:
+            degrees = float(rotation.lstrip("!"))
+        except ValueError:
+            degrees = None
+        if degrees is not None and 0 <= degrees <= 360:
+            # Out of range rotations are kept, they are rejected when the
+            # image is rendered
+            rotation = "{0}{1:g}".format(mirror, degrees % 360)
+
+        quality = kwargs.get("quality")
+        quality = {"color": "default", "grey": "gray"}.get(quality, quality)
+
+        image_format = kwargs.get("image_format")
+        image_format = current_app.config["IIIF_FORMATS_PIL_MAP"].get(
+            image_format, image_format
+        )
+        return dict(
+            region=region,
+            size=size,
+            rotation=rotation,
+            quality=quality,
+            image_format=image_format,
+        )
+
+    def estimate_cost(self, **kwargs):
+        """Estimate the work of a request from the image header.
+
+        :returns: the cost of the request, see :func:`get_cost`
+        """
+        return self.get_cost(*self.size(), **kwargs)
+
+    @classmethod
+    def get_cost(cls, real_width, real_height, **kwargs):
+        """Estimate the work of a request from the size of the source.
+
+        The cost is the number of pixels of the region on the source plus
+        the number of output pixels, weighted by the encoding cost of the
+        format.
+
+        :param int real_width: The width of the source
+        :param int real_height: The height of the source
+        :returns: the cost of the request
+
+        .. seealso::
+
+            :py:attr:`~flask_iiif.config.IIIF_SCHEDULER_FORMAT_WEIGHTS`
+        """
+        cases = current_app.config["IIIF_VALIDATIONS"].get(kwargs.get("version", "v2"))
+        (region_width, region_height), (width, height) = cls.get_request_size(
+            cases, real_width, real_height, **kwargs
+        )
+        weights = current_app.config.get("IIIF_SCHEDULER_FORMAT_WEIGHTS") or {}
+        weight = weights.get(kwargs.get("image_format"), 1)
+        return int(region_width * region_height + width * height * weight)
+
+    def check_limits(self, cases, **kwargs):
+        """Reject the requests whose output is over the configured limits.
+
+        The output size is calculated from the image header, so nothing is
+        decoded.
+
+        :param dict cases: The IIIF validations of the requested version
+        :raises MultimediaImageTooLarge: if the output is too large
+
+        .. seealso::
+
+            :py:attr:`~flask_iiif.config.IIIF_MAX_WIDTH`,
+            :py:attr:`~flask_iiif.config.IIIF_MAX_HEIGHT` and
+            :py:attr:`~flask_iiif.config.IIIF_MAX_OUTPUT_PIXELS`
+        """
+        max_width = current_app.config.get("IIIF_MAX_WIDTH")
+        max_height = current_app.config.get("IIIF_MAX_HEIGHT")
+        max_pixels = current_app.config.get("IIIF_MAX_OUTPUT_PIXELS")
+        if not (max_width or max_height or max_pixels):
+            return
+
+        _, (width, height) = self.request_size(cases, **kwargs)
+        if (
+            (max_width and width > max_width)
+            or (max_height and height > max_height)
+            or (max_pixels and width * height > max_pixels)
+        ):
+            raise MultimediaImageTooLarge(
+                "The requested image of {0}x{1} pixels is too large".format(
+                    width, height
+                )
+            )
+
+    def _reserve_decode(self, width, height):
+        """Check and reserve the pixels about to be decoded.
+
+        :param int width: The width of the decoded image
+        :param int height: The height of the decoded image
+        :raises MultimediaImageTooLarge: if the decoded image is too large
+
+        .. seealso::
+
+            :py:attr:`~flask_iiif.config.IIIF_MAX_DECODE_PIXELS` and
+            :py:class:`~flask_iiif.budget.PixelBudget`
+        """
+        max_pixels = current_app.config.get("IIIF_MAX_DECODE_PIXELS")
+        if max_pixels and width * height > max_pixels:
+            raise MultimediaImageTooLarge(
+                "The source image of {0}x{1} pixels is too large".format(width, height)
+            )
+        self.reserve_budget(width, height)
+
+    def reserve_budget(self, width, height):
+        """Reserve pixels from the pixel budget of the application, if any.
+
+        The pixels are reserved once and released by :func:`close_image`.
+
+        :param int width: The width of the decoded image
+        :param int height: The height of the decoded image
+
+        .. seealso:: :py:class:`~flask_iiif.budget.PixelBudget`
+        """
+        iiif = current_app.extensions.get("iiif")
+        budget = iiif.pixel_budget if iiif is not None else None
+        if budget is not None and self._reserved is None:
+            self._reserved = (budget, budget.acquire(width * height))
+
+    def metadata(self):
+        """Return what is known about the source without decoding it.
+
+        :returns: a ``dict`` with the ``width``, ``height``, ``mode``,
+                  ``format``, ``tiles`` (the ``[width, height]`` of the TIFF
+                  tiles or ``None``), ``levels`` (the ``[width, height]`` of
+                  each resolution level) and ``icc`` of the image
+
+        .. seealso:: :py:mod:`~flask_iiif.metadata.metadata`
+        """
+        width, height = self.image.size
+        tags = getattr(self.image, "tag_v2", {})
+        tiles = None
+        if 322 in tags and 323 in tags:
+            # TIFF TileWidth and TileLength
+            tiles = [tags[322], tags[323]]
+
+        return dict(
+            width=width,
+            height=height,
+            mode=self.image.mode,
+            format=self.image.format,
+            tiles=tiles,
+            levels=[list(size) for _, size in self.pyramid_levels()],
+            icc=bool(self.image.info.get("icc_profile")),
+        )
+
+    def is_identity(self, **kwargs):
+        """Check if the IIIF API returns the source image unchanged.
+
+        The requested region and size must cover the whole image, without
+        rotation nor quality change, and the format must match the encoding
+        of the source, so the source file can be served as it is.
+
+        .. note::
+
+            Please note the :func:`validate_api` should be run before
+            :func:`is_identity`.
+
+        """
+        if getattr(self.image, "n_frames", 1) > 1 and self.image.format != "GIF":
+            # Only the first frame would be served
+            return False
+
+        image_format = current_app.config["IIIF_FORMATS_PIL_MAP"].get(
+            kwargs.get("image_format")
+        )
+        if not image_format or image_format.upper() != self.image.format:
+            return False
+
+        rotation = kwargs.get("rotation", "0")
+        if rotation.startswith("!") or float(rotation) % 360:
+            return False
+
+        if kwargs.get("quality", "default") not in ("default", "color"):
+            return False
+
+        version = kwargs.get("version", "v2")
+        cases = current_app.config["IIIF_VALIDATIONS"].get(version)
+        real_width, real_height = self.image.size
+        box = (0, 0, real_width, real_height)
+        region = kwargs.get("region")
+        if region not in (None, cases.get("region", {}).get("ignore")):
+            box = self.get_crop_box(region, real_width, real_height)
+        if box != (0, 0, real_width, real_height):
+            return False
+
+        size = kwargs.get("size")
+        if size not in (None, cases.get("size", {}).get("ignore")):
+            dimensions = self.get_resize_dimensions(size, real_width, real_height)
+            if dimensions != (real_width, real_height):
+                return False
+        return True
+
+    def serve_source(self):
+        """Return the unchanged source file.
+
+        The sources opened from a path are opened again, so that they are
+        streamed instead of being read in memory.
+
+        :returns: a :class:`SourceFile`, or a `BytesIO` object for the
+                  sources given as a bytestream
+
+        .. seealso:: :func:`is_identity`
+        """
+        if getattr(self.image, "filename", None):
+            return SourceFile(FileIO(self.image.filename))
+        self.image.fp.seek(0)
+        return BytesIO(self.image.fp.read())
+
+    def prepare_decode(self, cases, **kwargs):
+        """Reduce the decoding work before the image pixels are loaded.
+
+        The final crop box and output size are calculated from the image
+        header, and the decoder is asked for the smallest image that still
+        covers them. The smallest level of pyramidal TIFF images is selected,
+        JPEG and JPEG 2000 images are decoded at a reduced resolution and
+        tiled or striped TIFF images only decode the tiles overlapping the
+        region.
+
+        :param dict cases: The IIIF validations of the requested version
+        :returns: the ``region`` and ``size`` to be applied on the reduced
+                  image, expressed in its pixels
+
+        .. note::
+
+            Nothing is changed if the image is already loaded or if the
+            request can not be served from a reduced image.
+        """
+        region = kwargs.get("region")
+        size = kwargs.get("size")
+        full_region = region in (None, cases.get("region", {}).get("ignore"))
+        full_size = size in (None, cases.get("size", {}).get("ignore"))
+        if not getattr(self.image, "tile", None):
+            return {}
+
+        real_width, real_height = self.image.size
+        if full_region:
+            box = (0, 0, real_width, real_height)
+        else:
+            box = self.get_crop_box(region, real_width, real_height)
+
+        box_width, box_height = box[2] - box[0], box[3] - box[1]
+        if not box_width or not box_height:
+            return {}
+
+        if not full_size:
+            width, height = self.get_resize_dimensions(size, box_width, box_height)
+            # The size the full image needs to keep the requested output sharp
+            needed = (
+                int(math.ceil(real_width * self.reduce_by(width, box_width))),
+                int(math.ceil(real_height * self.reduce_by(height, box_height))),
+            )
+            self._reduce_pyramid(needed)
+            self._reduce_jpeg(needed, kwargs.get("quality"))
+            self._reduce_jpeg2000(needed)
+            size = "{0},{1}".format(width, height)
+
+        reduced_width, reduced_height = self._decoded_size()
+        scale_x = self.reduce_by(real_width, reduced_width)
+        scale_y = self.reduce_by(real_height, reduced_height)
+        box = (
+            int(math.floor(box[0] / scale_x)),
+            int(math.floor(box[1] / scale_y)),
+            min(reduced_width, int(math.ceil(box[2] / scale_x))),
+            min(reduced_height, int(math.ceil(box[3] / scale_y))),
+        )
+
+        offset_x, offset_y = 0, 0
+        if not self._load_decoded(kwargs.get("uuid")):
+            offset_x, offset_y = self._reduce_tiff(box)
+            self._reserve_decode(*self.image.size)
+        if (reduced_width, reduced_height) == (real_width, real_height) and not (
+            offset_x or offset_y
+        ):
+            return {}
+
+        return dict(
+            region="{0},{1},{2},{3}".format(
+                box[0] - offset_x, box[1] - offset_y, box[2] - box[0], box[3] - box[1]
+            ),
+            size=size,
+        )
+
+    def _decoded_size(self):
+        """Return the size of the image once its pixels are loaded."""
+        reduce = getattr(self.image, "reduce", 0)
+        if self.image.format != "JPEG2000" or not isinstance(reduce, int):
+            return self.image.size
+        # Same rounding as the JPEG 2000 decoder
+        power = 1 << reduce
+        adjust = power >> 1
+        width, height = self.image.size
+        return (width + adjust) // power, (height + adjust) // power
+
+    def _load_decoded(self, uuid=None):
+        """Load the pixels through the in-process decoded images cache.
+
+        The decoded images are shared by the requests on the same image and
+        resolution level. JPEG 2000 images are loaded in any case, as their
+        reduced size is only applied by the decoder.
+
+        :param uuid: The image uuid
+        :returns: ``True`` if the pixels have been loaded
+
+        .. seealso:: :py:class:`~flask_iiif.cache.decoded.DecodedImageCache`
+        """
+        iiif = current_app.extensions.get("iiif")
+        cache = iiif.decoded_cache if iiif is not None and uuid else None
+        # Frames of animated images are seeked while being served
+        if cache is None or (
+            getattr(self.image, "n_frames", 1) > 1 and self.image.format != "TIFF"
+        ):
+            if self._decoded_size() == self.image.size:
+                return False
+            self._reserve_decode(*self._decoded_size())
+            self.image.load()
+            return True
+
+        key = (
+            uuid,
+            self.image.tell(),
+            self._decoded_size(),
+            self.image.mode,
+            getattr(self.image, "layers", 0),
+        )
+        decoded = cache.get(key)
+        if decoded is None:
+            self._reserve_decode(*self._decoded_size())
+            self.image.load()
+            # Share the pixels only, the source file is closed
+            decoded = self.image.copy()
+            decoded.format = self.image.format
+            cache.set(key, decoded)
+        self.image.close()
+        self.image = decoded
+        self._shared = self.image
+        return True
+
+    def _reduce_jpeg(self, size, quality=None):
+        """Use the JPEG DCT scaling to decode a smaller image.
+
+        :param tuple size: The minimum size of the decoded image
+        :param str quality: The requested quality
+        """
+        if self.image.format != "JPEG" or not current_app.config.get(
+            "IIIF_JPEG_DRAFT", False
+        ):
+            return
+
+        # Grey outputs can be decoded directly in greyscale
+        mode = "L" if quality in ("gray", "grey", "bitonal") else None
+        self.image.draft(mode, size)
+
+    def _reduce_jpeg2000(self, size):
+        """Only decode the JPEG 2000 resolution levels needed for the size.
+
+        :param tuple size: The minimum size of the decoded image
+        """
+        if self.image.format != "JPEG2000" or not current_app.config.get(
+            "IIIF_JPEG2000_REDUCE", False
+        ):
+            return
+
+        codestream = _jpeg2000_codestream(self.image.fp)
+        if not codestream:
+            return
+
+        levels, layers = codestream
+        real_width, real_height = self.image.size
+        reduce = 0
+        while reduce < levels:
+            # Same rounding as the decoder
+            power = 1 << (reduce + 1)
+            adjust = power >> 1
+            if (real_width + adjust) // power < size[0] or (
+                real_height + adjust
+            ) // power < size[1]:
+                break
+            reduce += 1
+
+        if not reduce:
+            return
+
+        self.image.reduce = reduce
+        self.image.layers = min(
+            layers, current_app.config.get("IIIF_JPEG2000_LAYERS", 0) or layers
+        )
+
+    def pyramid_levels(self):
+        """Return the resolution levels of a pyramidal image.
+
+        The pages of a multi-page TIFF are considered as resolution levels
+        when each one is a smaller version of the previous one.
+
+        :returns: a list of ``(page, (width, height))`` from the largest to
+                  the smallest level
+        """
+        levels = [(0, self.image.size)]
+        if self.image.format != "TIFF" or getattr(self.image, "n_frames", 1) < 2:
+            return levels
+
+        current = self.image.tell()
+        real_width, real_height = self.image.size
+        try:
+            for page in range(1, self.image.n_frames):
+                self.image.seek(page)
+                width, height = self.image.size
+                previous_width, previous_height = levels[-1][1]
+                # The aspect ratio must match within the rounding of a pixel
+                if (
+                    width >= previous_width
+                    or height >= previous_height
+                    or abs(width * real_height - height * real_width)
+                    > max(real_width, real_height)
+                ):
+                    break
+                levels.append((page, (width, height)))
+        finally:
+            self.image.seek(current)
+        return levels
+
+    def _reduce_pyramid(self, size):
+        """Select the smallest pyramid level still covering the size.
+
+        :param tuple size: The minimum size of the decoded image
+        """
+        if not current_app.config.get("IIIF_TIFF_PYRAMID", False):
+            return
+
+        candidates = [
+            page
+            for page, (width, height) in self.pyramid_levels()
+            if width >= size[0] and height >= size[1]
+        ]
+        if candidates and candidates[-1] != self.image.tell():
+            self.image.seek(candidates[-1])
+
+    def _reduce_tiff(self, box):
+        """Only decode the TIFF tiles or strips overlapping the box.
+
+        :param tuple box: The ``(left, upper, right, lower)`` box to decode
+        :returns: the position of the decoded image in the full image
+
+        .. note::
+
+            Only the tiles that Pillow decodes on its own can be skipped,
+            images compressed through libtiff are always fully decoded.
+        """
+        tiles = self.image.tile
+        if (
+            self.image.format != "TIFF"
+            or len(tiles) < 2
+            or not current_app.config.get("IIIF_TIFF_PARTIAL_DECODE", False)
+        ):
+            return 0, 0
+
+        tiles = [
+            tile
+            for tile in tiles
+            if tile[1][0] < box[2]
+            and tile[1][2] > box[0]
+            and tile[1][1] < box[3]
+            and tile[1][3] > box[1]
+        ]
+        left = min(tile[1][0] for tile in tiles)
+        upper = min(tile[1][1] for tile in tiles)
+        right = max(tile[1][2] for tile in tiles)
+        lower = max(tile[1][3] for tile in tiles)
+
+        shifted = []
+        for tile in tiles:
+            extents = (
+                tile[1][0] - left,
+                tile[1][1] - upper,
+                tile[1][2] - left,
+                tile[1][3] - upper,
+            )
+            tile_args = (tile[0], extents) + tuple(tile[2:])
+            # Recent Pillow versions describe the tiles with a named tuple
+            shifted.append(
+                tile._make(tile_args) if hasattr(tile, "_make") else tile_args
+            )
+
+        self.image.tile = shifted
+        self.image._size = (right - left, lower - upper)
+        return left, upper
+
     def apply_region(self, value):
         """IIIF apply crop.
 
@@ -569,7 +1461,11 @@ class IIIFImageAPIWrapper(MultimediaImage):
         if value.startswith("!"):
             mirror = True
             degrees = value[1:]
-        self.rotate(360 - float(degrees), mirror=mirror)
+        degrees = float(degrees)
+        if degrees in (0, 360) and not mirror:
+            # A full turn leaves the image as it is
+            return
+        self.rotate(360 - degrees, mirror=mirror)
 
     def apply_quality(self, value):
         """IIIF apply quality.
@@ -579,12 +1475,13 @@ class IIIFImageAPIWrapper(MultimediaImage):
         self.quality(value)
 
     @classmethod
-    def open_image(cls, source):
+    def open_image(cls, source, lazy=False):
         """Create an :class:`~flask_iiif.api.MultimediaImage` instance.
 
         :param str source: The image image string
         :type source: `BytesIO` object
         :param str source_type: the type of ``data``
+        :param bool lazy: Record the operations instead of applying them
         :returns: a :class:`~flask_iiif.api.MultimediaImage`
                   instance
         """
@@ -592,8 +1489,17 @@ class IIIFImageAPIWrapper(MultimediaImage):
             image = Image.open(source)
         except (AttributeError, IOError):
             raise MultimediaImageNotFound("The requested image cannot be opened")
-        return cls(image)
+        return cls(image, lazy=lazy)
 
     def close_image(self):
-        """Close an image file descriptor."""
-        self.image.close()
+        """Close an image file descriptor.
+
+        The pixels reserved from the
+        :py:class:`~flask_iiif.budget.PixelBudget` are released.
+        """
+        if self.image is not self._shared:
+            self.image.close()
+        if self._reserved is not None:
+            budget, pixels = self._reserved
+            self._reserved = None
+            budget.release(pixels)
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Asynchronous IIIF Image API.
+
+The image, information and base endpoints of :py:mod:`~flask_iiif.restful`
+served by an ASGI application. The cache is read through the coroutines of
+:class:`~flask_iiif.cache.aio.AsyncImageCache`, the rendered images are
+stored as by the synchronous endpoints, see
+:func:`~flask_iiif.restful.cache_rendered`, the images are opened by the
+asynchronous opener, if any, and the decoding and encoding run on threads,
+so that a process keeps many cache hits and information requests in flight.
+
+.. code-block:: python
+
+    iiif = IIIF(app)
+
+    async def uuid_to_image(uuid):
+        return await storage.read(uuid)
+
+    iiif.async_uuid_to_image_opener_handler(uuid_to_image)
+    asgi_app = iiif.init_asgi()
+
+The requests run within a Flask request context built from the ASGI scope,
+so that the API decorator, the signals and the configuration work as they
+do for the synchronous endpoints.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import sys
+from io import BytesIO
+from urllib.parse import urljoin as url_join
+
+from flask import current_app, redirect, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+
+from .api import IIIFImageAPIWrapper
+from .cache.aio import run_sync
+from .decorators import raise_http_error
+from .errors import MultimediaError
+from .restful import (
+    cache_rendered,
+    current_iiif,
+    image_cache_key,
+    image_response,
+    image_size,
+    indexed_size,
+    info_cache_key,
+    info_response,
+    remember_size,
+    render_cost,
+    render_image,
+)
+from .signals import iiif_before_info_request, iiif_before_process_request
+from .utils import should_cache
+
+
+class IIIFAsgiApp(object):
+    """ASGI application of the IIIF Image API."""
+
+    def __init__(self, app, prefix="/api/multimedia/image/"):
+        """Initialize the application.
+
+        :param app: the Flask application of the extension
+        :param str prefix: the url prefix, starting and ending with `/`
+        """
+        if not prefix.startswith("/") or not prefix.endswith("/"):
+            raise RuntimeError("The `prefix` must always start and end with `/`")
+        self.app = app
+        self.url_map = Map(
+            [
+                Rule(
+                    url_join(
+                        prefix,
+                        (
+                            "<string:version>/<string:uuid>/"
+                            "<string:region>/<string:size>/<string:rotation>/"
+                            "<string:quality>.<string:image_format>"
+                        ),
+                    ),
+                    endpoint="image",
+                    methods=["GET"],
+                ),
+                Rule(
+                    url_join(prefix, "<string:version>/<string:uuid>/info.json"),
+                    endpoint="info",
+                    methods=["GET"],
+                ),
+                Rule(
+                    url_join(prefix, "<string:version>/<string:uuid>"),
+                    endpoint="base",
+                    methods=["GET"],
+                ),
+            ]
+        )
+
+    async def __call__(self, scope, receive, send):
+        """Serve an ASGI connection."""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        environ = self.environ(scope)
+        with self.app.request_context(environ):
+            response = await self.dispatch(environ)
+            await self.send_response(response, environ, send)
+
+    @staticmethod
+    def environ(scope):
+        """Return the WSGI environment of an HTTP scope.
+
+        :param dict scope: the ASGI connection scope
+        """
+        server = scope.get("server") or ("localhost", 80)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+            "PATH_INFO": scope["path"].encode().decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": "HTTP/{0}".format(scope.get("http_version", "1.1")),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": BytesIO(),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        if scope.get("client"):
+            environ["REMOTE_ADDR"] = scope["client"][0]
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                name = "HTTP_" + name
+            if name in environ:
+                value = environ[name] + "," + value
+            environ[name] = value
+        return environ
+
+    async def dispatch(self, environ):
+        """Return the response of a request.
+
+        :param dict environ: the WSGI environment of the request
+        """
+        adapter = self.url_map.bind_to_environ(environ)
+        try:
+            endpoint, view_args = adapter.match()
+            if current_iiif.api_decorator_callback:
+                await run_sync(current_iiif.api_decorator_callback, **view_args)
+            try:
+                return await getattr(self, endpoint)(adapter, **view_args)
+            except MultimediaError as error:
+                raise_http_error(error)
+        except HTTPException as error:
+            return self.error_response(error, environ)
+
+    @staticmethod
+    def error_response(error, environ):
+        """Return the JSON response of an HTTP error, as Flask-RESTful does.
+
+        :param error: the :class:`~werkzeug.exceptions.HTTPException`
+        """
+        response = error.get_response(environ)
+        if error.code is None or error.code < 400:
+            return response
+        data = getattr(error, "data", None) or dict(message=error.description)
+        response.set_data(current_app.json.dumps(data) + "\n")
+        response.content_type = "application/json"
+        return response
+
+    @staticmethod
+    async def send_response(response, environ, send):
+        """Send a response on the ASGI connection.
+
+        The chunks of the streamed responses, read from files, are read on
+        the executor so that the event loop is not blocked.
+
+        :param response: the :class:`~werkzeug.wrappers.Response`
+        """
+        app_iter = response.get_app_iter(environ)
+        streamed = not response.is_sequence
+        headers = response.get_wsgi_headers(environ).to_wsgi_list()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers
+                ],
+            }
+        )
+        chunks = iter(app_iter)
+        try:
+            while True:
+                if streamed:
+                    chunk = await run_sync(next, chunks, None)
+                else:
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+        finally:
+            if hasattr(app_iter, "close"):
+                if streamed:
+                    await run_sync(app_iter.close)
+                else:
+                    app_iter.close()
+        await send({"type": "http.response.body", "body": b""})
+
+    async def cache_call(self, method, *args):
+        """Call a coroutine of the asynchronous cache.
+
+        The errors are ignored if
+        :py:attr:`~flask_iiif.config.IIIF_CACHE_IGNORE_ERRORS` is set.
+        """
+        try:
+            return await getattr(current_iiif.async_cache, method)(*args)
+        except Exception:
+            if not current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
+                raise
+            return None
+
+    async def open_image(self, uuid):
+        """Return the image path or bytestream of an uuid.
+
+        The asynchronous opener is awaited, if any, otherwise the opener runs
+        on a thread.
+        """
+        opener = current_iiif.async_uuid_to_image_opener
+        if opener is None:
+            return await run_sync(current_iiif.uuid_to_image_opener, uuid)
+        return await opener(uuid)
+
+    @staticmethod
+    async def run_render(func, *args, **kwargs):
+        """Run the image work on the rendering threads.
+
+        The bounded pool of :py:mod:`~flask_iiif.executor` is used if it is
+        enabled, the default executor of the event loop otherwise.
+        """
+        executor = current_iiif.render_executor
+        if executor is not None:
+            return await asyncio.wrap_future(executor.submit(func, *args, **kwargs))
+        return await run_sync(func, *args, **kwargs)
+
+    async def render(self, data, **api_parameters):
+        """Render an image on the rendering threads.
+
+        The rendering slot of the scheduler is taken before a thread of the
+        bounded pool when the cost is known, see
+        :func:`~flask_iiif.restful.run_render`.
+        """
+        if current_iiif.render_executor is None:
+            return await self.run_render(render_image, data=data, **api_parameters)
+        if current_iiif.metadata is not None:
+            cost = await run_sync(render_cost, **api_parameters)
+        else:
+            cost = render_cost(**api_parameters)
+        if cost is None:
+            return await self.run_render(render_image, data=data, **api_parameters)
+
+        scheduler, uuid = current_iiif.scheduler, api_parameters["uuid"]
+        lane = await run_sync(scheduler.acquire, uuid, cost)
+        try:
+            return await self.run_render(
+                render_image, data=data, scheduled=True, **api_parameters
+            )
+        finally:
+            scheduler.release(uuid, lane)
+
+    async def base(self, adapter, version, uuid):
+        """Redirect to the information document with status code 303."""
+        return redirect(
+            adapter.build("info", dict(version=version, uuid=uuid)), code=303
+        )
+
+    async def info(self, adapter, version, uuid):
+        """Return the information document of an image."""
+        # Trigger event before proccess the api request
+        iiif_before_info_request.send(self, version=version, uuid=uuid)
+
+        key = info_cache_key(version, uuid)
+        cached = await self.cache_call("get", key)
+        if cached:
+            width, height = map(int, cached.split(","))
+            remember_size(uuid, width, height)
+        else:
+            size = None
+            if current_iiif.metadata is not None:
+                size = await run_sync(indexed_size, uuid)
+            if size is None:
+                data = await self.open_image(uuid)
+                size = await self.run_render(image_size, uuid, data)
+            width, height = size
+            if should_cache(request.args):
+                await self.cache_call("set", key, "{0},{1}".format(width, height))
+                await self.cache_call("index", uuid, key)
+
+        base_uri = adapter.build(
+            "base", dict(version=version, uuid=uuid), force_external=True
+        )
+        response = info_response(self, version, width, height, base_uri)
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Access-Control-Allow-Methods"] = "GET"
+        return response
+
+    async def image(
+        self, adapter, version, uuid, region, size, rotation, quality, image_format
+    ):
+        """Run the IIIF Image API workflow."""
+        api_parameters = dict(
+            version=version,
+            uuid=uuid,
+            region=region,
+            size=size,
+            rotation=rotation,
+            quality=quality,
+            image_format=image_format,
+        )
+        # Trigger event before proccess the api request
+        iiif_before_process_request.send(self, **api_parameters)
+
+        # Validate IIIF parameters
+        IIIFImageAPIWrapper.validate_api(**api_parameters)
+
+        if current_iiif.metadata is not None:
+            # The size of the source may be read from the index
+            key = await run_sync(image_cache_key, **api_parameters)
+        else:
+            key = image_cache_key(**api_parameters)
+        cached = await self.cache_call("get_entry", key)
+        if cached:
+            return image_response(
+                self,
+                BytesIO(cached["value"]),
+                cached["last_modification"],
+                etag=cached["etag"],
+                **api_parameters
+            )
+
+        data = await self.open_image(uuid)
+        to_serve = await self.render(data, **api_parameters)
+        if should_cache(request.args):
+            # The temporary files are copied into the cache by chunks
+            mimetype = current_app.config["IIIF_FORMATS"].get(
+                image_format, "image/jpeg"
+            )
+            await run_sync(cache_rendered, key, to_serve, mimetype, **api_parameters)
+
+        last_modified = await self.cache_call("get_last_modification", key)
+        return image_response(self, to_serve, last_modified, **api_parameters)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Bound the pixels decoded at the same time by a process.
+
+Each image reserves the pixels it decodes from a
+:class:`PixelBudget` before loading them, and gives them back once closed,
+see :func:`~flask_iiif.api.IIIFImageAPIWrapper.close_image`. The images
+wait while the budget is exhausted, and are rejected with ``503 Service
+Unavailable`` once the timeout elapses.
+"""
+
+from __future__ import absolute_import
+
+import threading
+
+from .errors import MultimediaRenderQueueFull
+
+
+class PixelBudget(object):
+    """Semaphore weighted by the decoded pixels."""
+
+    def __init__(self, capacity, timeout=None, retry_after=None):
+        """Initialize the budget.
+
+        :param int capacity: The pixels decoded at the same time
+        :param timeout: The seconds an image waits for its pixels
+        :param int retry_after: The seconds sent in the ``Retry-After``
+            header of the rejected requests
+        """
+        self.capacity = capacity
+        self.available = capacity
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.condition = threading.Condition()
+
+    def acquire(self, pixels):
+        """Reserve the pixels of an image, waiting for them if needed.
+
+        Images larger than the budget reserve all of it, so that they are
+        decoded alone.
+
+        :param int pixels: The pixels of the image
+        :returns: The reserved pixels, to be released
+        :raises MultimediaRenderQueueFull: if the timeout elapses
+        """
+        pixels = min(pixels, self.capacity)
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.available >= pixels, timeout=self.timeout
+            ):
+                raise MultimediaRenderQueueFull(
+                    "Too many pixels are being decoded", retry_after=self.retry_after
+                )
+            self.available -= pixels
+        return pixels
+
+    def release(self, pixels):
+        """Give back reserved pixels.
+
+        :param int pixels: The pixels returned by :func:`acquire`
+        """
+        with self.condition:
+            self.available += pixels
+            self.condition.notify_all()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Abstract asynchronous cache definition.
+
+The asynchronous endpoints of :py:mod:`~flask_iiif.asgi` use caches
+implementing the coroutines of
+:class:`~flask_iiif.cache.aio.AsyncImageCache`. Any
+:class:`~flask_iiif.cache.cache.ImageCache` can be used through
+:class:`~flask_iiif.cache.aio.AsyncImageCacheAdapter`, which runs its calls on
+threads.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import contextvars
+import functools
+import json
+
+from flask import current_app
+from werkzeug.utils import cached_property
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run a blocking function on the default executor of the event loop.
+
+    The function runs within a copy of the current context, so that the
+    Flask application and request contexts are available.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        None, functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+class AsyncImageCache(object):
+    """Abstract asynchronous cache layer."""
+
+    def __init__(self, app=None):
+        """Initialize the cache."""
+
+    @cached_property
+    def timeout(self):
+        """Return default timeout from config."""
+        return current_app.config["IIIF_CACHE_TIME"]
+
+    async def get(self, key):
+        """Return the key value.
+
+        :param key: the object's key
+        """
+
+    async def get_entry(self, key):
+        """Return the cached object with its metadata.
+
+        :param key: the object's key
+        :return: a dictionary with the ``value``, the
+            ``last_modification``, the ``content_type`` and the ``etag`` of
+            the object, or ``None``
+
+        .. seealso:: :func:`~flask_iiif.cache.cache.ImageCache.get_entry`
+        """
+        value = await self.get(key)
+        if not value:
+            return None
+        return dict(
+            value=value,
+            last_modification=await self.get_last_modification(key),
+            content_type=None,
+            etag=None,
+        )
+
+    async def set(self, key, value, timeout=None):
+        """Cache the object.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        """
+
+    async def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        """
+        await self.set(key, value, timeout=timeout)
+
+    async def get_last_modification(self, key):
+        """Get last modification of cached file.
+
+        :param key: the file object's key
+        """
+
+    async def set_last_modification(self, key, last_modification=None, timeout=None):
+        """Set last modification of cached file.
+
+        :param key: the file object's key
+        :param last_modification: Last modification date of
+            file represented by the key
+        :type last_modification: datetime.datetime
+        :param timeout: the cache timeout in seconds
+        """
+
+    def _last_modification_key_name(self, key):
+        """Generate key for last_modification entry of specified key.
+
+        :param key: the file object's key
+        """
+        return "last_modification::%s" % key
+
+    def _metadata_key_name(self, key):
+        """Generate key for the metadata entry of specified key.
+
+        :param key: the file object's key
+        """
+        return "metadata::%s" % key
+
+    async def index(self, uuid, *keys):
+        """Add keys to the index of an image.
+
+        The index is read and written back, see
+        :func:`~flask_iiif.cache.cache.ImageCache.index`.
+
+        :param uuid: the image uuid
+        :param keys: the keys of the objects of the image
+        """
+        value = await self.get(self._index_key_name(uuid))
+        indexed = set(json.loads(value)) if value else set()
+        # Written back to expire with the last object added
+        await self.set(
+            self._index_key_name(uuid), json.dumps(sorted(indexed.union(keys)))
+        )
+
+    def _index_key_name(self, uuid):
+        """Generate key for the index of the keys of an image.
+
+        :param uuid: the image uuid
+        """
+        return "index::%s" % uuid
+
+    async def delete(self, key):
+        """Delete the specific key."""
+
+    async def flush(self):
+        """Flush the cache."""
+
+    def __call__(self, app=None):
+        """Backwards-compatibility method returning ``self``."""
+        return self
+
+
+class AsyncImageCacheAdapter(AsyncImageCache):
+    """Asynchronous layer running the calls of a cache on threads."""
+
+    def __init__(self, cache):
+        """Initialize the cache.
+
+        :param cache: the :class:`~flask_iiif.cache.cache.ImageCache`
+        """
+        super(AsyncImageCacheAdapter, self).__init__()
+        self.cache = cache
+
+    async def get(self, key):
+        """Return the key value."""
+        return await run_sync(self.cache.get, key)
+
+    async def set(self, key, value, timeout=None):
+        """Cache the object."""
+        return await run_sync(self.cache.set, key, value, timeout=timeout)
+
+    async def get_entry(self, key):
+        """Return the cached object with its metadata."""
+        return await run_sync(self.cache.get_entry, key)
+
+    async def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata."""
+        return await run_sync(
+            self.cache.set_entry,
+            key,
+            value,
+            timeout=timeout,
+            content_type=content_type,
+            etag=etag,
+        )
+
+    async def get_last_modification(self, key):
+        """Get last modification of cached file."""
+        return await run_sync(self.cache.get_last_modification, key)
+
+    async def set_last_modification(self, key, last_modification=None, timeout=None):
+        """Set last modification of cached file."""
+        return await run_sync(
+            self.cache.set_last_modification,
+            key,
+            last_modification=last_modification,
+            timeout=timeout,
+        )
+
+    async def index(self, uuid, *keys):
+        """Add keys to the index of an image."""
+        return await run_sync(self.cache.index, uuid, *keys)
+
+    async def delete(self, key):
+        """Delete the specific key."""
+        return await run_sync(self.cache.delete, key)
+
+    async def flush(self):
+        """Flush the cache."""
+        return await run_sync(self.cache.flush)
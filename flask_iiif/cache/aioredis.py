@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Implements an asynchronous Redis cache.
+
+The keys and values are stored as :class:`~flask_iiif.cache.redis.ImageRedisCache`
+does, so that both caches share their entries.
+"""
+
+from __future__ import absolute_import
+
+from datetime import datetime
+
+from cachelib.serializers import RedisSerializer
+from flask import current_app
+from redis.asyncio import StrictRedis
+
+from .aio import AsyncImageCache
+
+
+class AsyncImageRedisCache(AsyncImageCache):
+    """Asynchronous Redis image cache."""
+
+    def __init__(self, app=None):
+        """Initialize the cache."""
+        super(AsyncImageRedisCache, self).__init__(app=app)
+        app = app or current_app
+        redis_url = app.config["IIIF_CACHE_REDIS_URL"]
+        self.prefix = app.config.get("IIIF_CACHE_REDIS_PREFIX", "iiif")
+        self.redis = StrictRedis.from_url(redis_url)
+        self.serializer = RedisSerializer()
+
+    async def get(self, key):
+        """Return the key value.
+
+        :param key: the object's key
+        :return: the stored object
+        """
+        return self.serializer.loads(await self.redis.get(self.prefix + key))
+
+    async def get_entry(self, key):
+        """Return the cached object with its metadata.
+
+        The object and its metadata are read with a single ``MGET``.
+
+        :param key: the object's key
+        :return: a dictionary with the ``value``, the
+            ``last_modification``, the ``content_type`` and the ``etag`` of
+            the object, or ``None``
+        """
+        value, last_modification, metadata = [
+            self.serializer.loads(item)
+            for item in await self.redis.mget(
+                self.prefix + key,
+                self.prefix + self._last_modification_key_name(key),
+                self.prefix + self._metadata_key_name(key),
+            )
+        ]
+        if not value:
+            return None
+        metadata = metadata or {}
+        return dict(
+            value=value,
+            last_modification=last_modification,
+            content_type=metadata.get("content_type"),
+            etag=metadata.get("etag"),
+        )
+
+    async def set(self, key, value, timeout=None):
+        """Cache the object.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        """
+        await self.set_entry(key, value, timeout=timeout)
+
+    async def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata.
+
+        The object and its metadata are written in a single pipeline.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        """
+        timeout = timeout or self.timeout
+        last_modification = datetime.utcnow().replace(microsecond=0)
+        metadata = dict(content_type=content_type, etag=etag)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(self.prefix + key, self.serializer.dumps(value), ex=timeout)
+            pipe.set(
+                self.prefix + self._last_modification_key_name(key),
+                self.serializer.dumps(last_modification),
+                ex=timeout,
+            )
+            pipe.set(
+                self.prefix + self._metadata_key_name(key),
+                self.serializer.dumps(metadata),
+                ex=timeout,
+            )
+            await pipe.execute()
+
+    async def get_last_modification(self, key):
+        """Get last modification of cached file.
+
+        :param key: the file object's key
+        """
+        return await self.get(self._last_modification_key_name(key))
+
+    async def set_last_modification(self, key, last_modification=None, timeout=None):
+        """Set last modification of cached file.
+
+        :param key: the file object's key
+        :param last_modification: Last modification date of
+            file represented by the key
+        :type last_modification: datetime.datetime
+        :param timeout: the cache timeout in seconds
+        """
+        if not last_modification:
+            last_modification = datetime.utcnow().replace(microsecond=0)
+        timeout = timeout or self.timeout
+        await self.redis.set(
+            self.prefix + self._last_modification_key_name(key),
+            self.serializer.dumps(last_modification),
+            ex=timeout,
+        )
+
+    async def index(self, uuid, *keys):
+        """Add keys to the index of an image.
+
+        The index is the Redis set of
+        :func:`~flask_iiif.cache.redis.ImageRedisCache.index`.
+
+        :param uuid: the image uuid
+        :param keys: the keys of the objects of the image
+        """
+        name = self.prefix + self._index_key_name(uuid)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(name, *keys)
+            pipe.expire(name, self.timeout)
+            await pipe.execute()
+
+    async def delete(self, key):
+        """Delete the specific key."""
+        await self.redis.delete(
+            self.prefix + key,
+            self.prefix + self._last_modification_key_name(key),
+            self.prefix + self._metadata_key_name(key),
+        )
+
+    async def flush(self):
+        """Flush the cache."""
+        keys = [key async for key in self.redis.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self.redis.delete(*keys)
@@ -14,6 +14,11 @@ All cache adaptors must at least implement
 :func:`~flask_iiif.cache.cache.ImageCache.set` methods.
 """
 
+import json
+import time
+from contextlib import contextmanager
+from io import BytesIO
+
 from flask import current_app
 from werkzeug.utils import cached_property
 
@@ -35,6 +40,43 @@ class ImageCache(object):
         :param key: the object's key
         """
 
+    def get_stream(self, key):
+        """Return the cached object as a file.
+
+        The object is read in memory, caches storing the objects as files
+        should override this method.
+
+        :param key: the object's key
+        :return: the file object, or ``None``
+        """
+        value = self.get(key)
+        if not value:
+            return None
+        return BytesIO(value)
+
+    def get_entry(self, key, stream=False):
+        """Return the cached object with its metadata.
+
+        The object and its modification date are read with two calls,
+        caches able to read them at once should override this method.
+
+        :param key: the object's key
+        :param bool stream: return the object as a file, see
+            :func:`get_stream`
+        :return: a dictionary with the ``value``, the
+            ``last_modification``, the ``content_type`` and the ``etag`` of
+            the object, or ``None``
+        """
+        value = self.get_stream(key) if stream else self.get(key)
+        if not value:
+            return None
+        return dict(
+            value=value,
+            last_modification=self.get_last_modification(key),
+            content_type=None,
+            etag=None,
+        )
+
     def set(self, key, value, timeout=None):
         """Cache the object.
 
@@ -44,6 +86,34 @@ class ImageCache(object):
         :param timeout: the cache timeout in seconds
         """
 
+    def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata.
+
+        Caches unable to store the metadata only keep the object and its
+        modification date.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        """
+        self.set(key, value, timeout=timeout)
+
+    def set_stream(self, key, stream, timeout=None):
+        """Cache the object read from a file.
+
+        The file is read in memory, caches able to copy it should override
+        this method.
+
+        :param key: the object's key
+        :param stream: the file object, read from its start
+        :param timeout: the cache timeout in seconds
+        """
+        stream.seek(0)
+        self.set(key, stream.read(), timeout=timeout)
+        stream.seek(0)
+
     def get_last_modification(self, key):
         """Get last modification of cached file.
 
@@ -67,6 +137,116 @@ class ImageCache(object):
         """
         return "last_modification::%s" % key
 
+    def _metadata_key_name(self, key):
+        """Generate key for the metadata entry of specified key.
+
+        :param key: the file object's key
+        """
+        return "metadata::%s" % key
+
+    def acquire_lock(self, key, timeout):
+        """Acquire the lease to render the object of a key.
+
+        Caches without a storage shared between the workers always grant
+        the lease.
+
+        :param key: the object's key
+        :param timeout: the lease expiration in seconds
+        :returns: a token releasing the lease, or ``None`` if it is held
+        """
+        return True
+
+    def release_lock(self, key, token):
+        """Release the lease to render the object of a key.
+
+        :param key: the object's key
+        :param token: the token returned by :func:`acquire_lock`
+        """
+
+    @contextmanager
+    def hold_lock(self, key, timeout=10):
+        """Hold the lease of a key while its object is read and written back.
+
+        The lease is awaited for at most its expiration, the object is
+        updated without it afterwards.
+
+        :param key: the object's key
+        :param timeout: the lease expiration in seconds
+        """
+        deadline = time.time() + timeout
+        token = self.acquire_lock(key, timeout)
+        while token is None and time.time() < deadline:
+            time.sleep(0.01)
+            token = self.acquire_lock(key, timeout)
+        try:
+            yield
+        finally:
+            if token is not None:
+                self.release_lock(key, token)
+
+    def _lock_key_name(self, key):
+        """Generate key for the rendering lease of specified key.
+
+        :param key: the file object's key
+        """
+        return "lock::%s" % key
+
+    def index(self, uuid, *keys):
+        """Add keys to the index of an image.
+
+        The index lists the keys cached for an image, so that they are
+        deleted by :func:`invalidate` without scanning the cache. It is read
+        and written back holding its lease, see :func:`hold_lock`, caches
+        able to add to a set at once should override this method.
+
+        The index is written back even if it lists the keys already, so that
+        it expires with the last object added and not before it.
+
+        :param uuid: the image uuid
+        :param keys: the keys of the objects of the image
+        """
+        name = self._index_key_name(uuid)
+        with self.hold_lock(name):
+            indexed = self.indexed(uuid)
+            self.set(name, json.dumps(sorted(indexed.union(keys))))
+
+    def indexed(self, uuid):
+        """Return the keys in the index of an image.
+
+        :param uuid: the image uuid
+        :rtype: set
+        """
+        value = self.get(self._index_key_name(uuid))
+        return set(json.loads(value)) if value else set()
+
+    def _index_key_name(self, uuid):
+        """Generate key for the index of the keys of an image.
+
+        :param uuid: the image uuid
+        """
+        return "index::%s" % uuid
+
+    def delete_many(self, *keys):
+        """Delete several keys.
+
+        The keys are deleted one by one, caches able to delete them at once
+        should override this method.
+
+        :param keys: the objects' keys
+        """
+        for key in keys:
+            self.delete(key)
+
+    def invalidate(self, uuid):
+        """Delete the indexed keys of an image and its index.
+
+        :param uuid: the image uuid
+        :returns: the number of indexed keys
+        """
+        keys = self.indexed(uuid)
+        self.delete_many(self._index_key_name(uuid), *keys)
+        return len(keys)
+
     def delete(self, key):
         """Delete the specific key."""
 
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Implement an in-process cache of decoded source images."""
+
+from __future__ import absolute_import
+
+import threading
+from collections import OrderedDict
+
+# Bytes per band of the modes using more than one byte per pixel band
+_BAND_BYTES = {"I": 4, "F": 4, "I;16": 2, "I;16B": 2, "I;16L": 2, "I;16N": 2}
+
+
+class DecodedImageCache(object):
+    """Least recently used cache of decoded images, bounded in bytes.
+
+    The images are kept in the memory of the process, so that the requests on
+    the tiles of the same image don't decode the source again.
+
+    .. note::
+
+        The cached images are shared, they must not be modified nor closed.
+    """
+
+    def __init__(self, max_bytes):
+        """Initialize the cache.
+
+        :param int max_bytes: The maximum size of the decoded pixels
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.images = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def image_bytes(image):
+        """Return the memory used by the pixels of an image.
+
+        :param image: The loaded `PIL.Image.Image`
+        :rtype: int
+        """
+        width, height = image.size
+        if image.mode in _BAND_BYTES:
+            return width * height * _BAND_BYTES[image.mode]
+        return width * height * len(image.getbands())
+
+    def get(self, key):
+        """Return the decoded image.
+
+        :param key: The image key
+        :returns: The `PIL.Image.Image` or ``None``
+        """
+        with self.lock:
+            entry = self.images.get(key)
+            if entry is None:
+                return None
+            self.images.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, image):
+        """Cache a decoded image, evicting the least recently used ones.
+
+        Images larger than the cache are not stored.
+
+        :param key: The image key
+        :param image: The loaded `PIL.Image.Image`
+        """
+        nbytes = self.image_bytes(image)
+        if nbytes > self.max_bytes:
+            return
+        with self.lock:
+            old = self.images.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self.images[key] = (image, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.images.popitem(last=False)
+                self.size -= evicted
+
+    def delete(self, key):
+        """Delete a decoded image.
+
+        :param key: The image key
+        """
+        with self.lock:
+            entry = self.images.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def invalidate(self, uuid):
+        """Delete the decoded images of an uuid.
+
+        :param uuid: The image uuid, the first item of the image keys
+        """
+        with self.lock:
+            for key in [key for key in self.images if key[0] == uuid]:
+                self.size -= self.images.pop(key)[1]
+
+    def flush(self):
+        """Delete all the decoded images."""
+        with self.lock:
+            self.images.clear()
+            self.size = 0
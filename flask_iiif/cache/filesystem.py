@@ -0,0 +1,488 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Implement a filesystem cache.
+
+The objects are stored as files, so that they survive the restarts and are
+shared by all the workers of a node:
+
+.. code-block:: python
+
+    IIIF_CACHE_HANDLER = "flask_iiif.cache.filesystem:ImageFileSystemCache"
+    IIIF_CACHE_FILESYSTEM_DIR = "/var/cache/iiif"
+
+Each object is stored in a directory tree sharded by the hash of its key,
+in a file starting with a JSON line holding its expiration and modification
+dates. The files are written to a temporary file and renamed, so that the
+readers never see a partial object or the metadata of another one.
+
+The expired objects are deleted by a background thread, which also deletes
+the least recently modified objects once the cache is over
+:py:attr:`~flask_iiif.config.IIIF_CACHE_FILESYSTEM_MAX_SIZE` and the
+expired rendering leases. Each worker runs the thread, but a single worker
+sweeps the cache in each interval, the one taking the sweep lease.
+
+The cached images are served from their files, see :func:`get_stream`, so
+that the WSGI server can send them with ``sendfile``.
+"""
+
+from __future__ import absolute_import
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from flask import current_app
+
+from .cache import ImageCache
+
+#: Suffix of the lease files
+_LOCK = ".lock"
+#: Prefix of the files being written
+_TMP = ".tmp-"
+#: Seconds after which a file being written is considered abandoned
+_GRACE = 60
+#: Name of the lease of the sweeper
+_SWEEP = "sweep" + _LOCK
+
+
+class ImageFileSystemCache(ImageCache):
+    """Filesystem image cache."""
+
+    def __init__(self, app=None):
+        """Initialize the cache and start its sweeper."""
+        super(ImageFileSystemCache, self).__init__(app=app)
+        app = app or current_app
+        self.directory = app.config.get("IIIF_CACHE_FILESYSTEM_DIR") or os.path.join(
+            tempfile.gettempdir(), "flask-iiif"
+        )
+        self.max_size = app.config.get("IIIF_CACHE_FILESYSTEM_MAX_SIZE")
+        self.sweep_interval = app.config.get("IIIF_CACHE_FILESYSTEM_SWEEP_INTERVAL")
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+
+        self.stopped = threading.Event()
+        self.sweeper = None
+        if self.sweep_interval:
+            self.sweeper = threading.Thread(
+                target=self._sweep_forever, name="iiif-cache-sweeper", daemon=True
+            )
+            self.sweeper.start()
+
+    def path(self, key):
+        """Return the path of the file of a key.
+
+        :param key: the object's key
+        """
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:4], digest)
+
+    def _write(self, path, write):
+        """Write a file atomically.
+
+        :param path: the file path
+        :param write: function writing the content into a file object
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=_TMP, dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                write(fp)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _open(self, path):
+        """Open a file if it has not expired.
+
+        :param path: the file path
+        :returns: the file, positioned at the start of the object, and its
+            metadata, or ``None``
+        """
+        try:
+            fp = open(path, "rb")
+        except (IOError, OSError):
+            return None
+        try:
+            meta = json.loads(fp.readline())
+            if meta["expires"] > time.time():
+                return fp, meta
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+        fp.close()
+        return None
+
+    def _read_meta(self, path):
+        """Return the metadata of a file if it has not expired.
+
+        :param path: the file path
+        """
+        opened = self._open(path)
+        if opened is None:
+            return None
+        opened[0].close()
+        return opened[1]
+
+    def _write_entry(
+        self,
+        path,
+        write,
+        timeout,
+        last_modification=None,
+        text=False,
+        content_type=None,
+        etag=None,
+    ):
+        """Write an object with its metadata atomically.
+
+        :param path: the file path
+        :param write: function writing the object into a file object
+        :param timeout: the cache timeout in seconds
+        :param bool text: if the object is a `str`
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        """
+        if not last_modification:
+            last_modification = datetime.utcnow().replace(microsecond=0)
+        meta = dict(
+            expires=time.time() + (timeout or self.timeout),
+            last_modification=last_modification.isoformat(),
+            text=text,
+            content_type=content_type,
+            etag=etag,
+        )
+
+        def write_entry(fp):
+            fp.write(json.dumps(meta).encode() + b"\n")
+            write(fp)
+
+        self._write(path, write_entry)
+
+    def get(self, key):
+        """Return the key value.
+
+        :param key: the object's key
+        :return: the stored object
+        :rtype: `bytes` or `str`
+        """
+        opened = self._open(self.path(key))
+        if opened is None:
+            return None
+        fp, meta = opened
+        try:
+            with fp:
+                value = fp.read()
+        except (IOError, OSError):
+            return None
+        return value.decode("utf-8") if meta["text"] else value
+
+    def get_stream(self, key):
+        """Return the file of the cached object.
+
+        :param key: the object's key
+        :return: the opened file, positioned at the start of the object, or
+            ``None``
+        """
+        opened = self._open(self.path(key))
+        return None if opened is None else opened[0]
+
+    def get_entry(self, key, stream=False):
+        """Return the cached object with its metadata.
+
+        :param key: the object's key
+        :param bool stream: return the opened file of the object
+        :return: a dictionary with the ``value``, the
+            ``last_modification``, the ``content_type`` and the ``etag`` of
+            the object, or ``None``
+        """
+        opened = self._open(self.path(key))
+        if opened is None:
+            return None
+        fp, meta = opened
+        if stream:
+            value = fp
+        else:
+            try:
+                with fp:
+                    value = fp.read()
+            except (IOError, OSError):
+                return None
+        if meta["text"] and not stream:
+            value = value.decode("utf-8")
+        return dict(
+            value=value,
+            last_modification=datetime.fromisoformat(meta["last_modification"]),
+            content_type=meta.get("content_type"),
+            etag=meta.get("etag"),
+        )
+
+    def set(self, key, value, timeout=None):
+        """Cache the object.
+
+        :param key: the object's key
+        :param value: the stored object
+        :type value: `bytes` or `str`
+        :param timeout: the cache timeout in seconds
+        """
+        self.set_entry(key, value, timeout=timeout)
+
+    def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata.
+
+        :param key: the object's key
+        :param value: the stored object
+        :type value: `bytes` or `str`
+        :param timeout: the cache timeout in seconds
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        """
+        text = isinstance(value, str)
+        data = value.encode("utf-8") if text else value
+        self._write_entry(
+            self.path(key),
+            lambda fp: fp.write(data),
+            timeout,
+            text=text,
+            content_type=content_type,
+            etag=etag,
+        )
+
+    def set_stream(self, key, stream, timeout=None):
+        """Cache the object copied from a file.
+
+        :param key: the object's key
+        :param stream: the file object, read from its start
+        :param timeout: the cache timeout in seconds
+        """
+        stream.seek(0)
+        self._write_entry(
+            self.path(key), lambda fp: shutil.copyfileobj(stream, fp), timeout
+        )
+        stream.seek(0)
+
+    def get_last_modification(self, key):
+        """Get last modification of cached file.
+
+        :param key: the file object's key
+        """
+        meta = self._read_meta(self.path(key))
+        if meta is None:
+            return None
+        return datetime.fromisoformat(meta["last_modification"])
+
+    def set_last_modification(self, key, last_modification=None, timeout=None):
+        """Set last modification of cached file.
+
+        The object is copied into a new file with the new metadata.
+
+        :param key: the file object's key
+        :param last_modification: Last modification date of
+            file represented by the key
+        :type last_modification: datetime.datetime
+        :param timeout: the cache timeout in seconds
+        """
+        path = self.path(key)
+        opened = self._open(path)
+        if opened is None:
+            return
+        fp, meta = opened
+        with fp:
+            self._write_entry(
+                path,
+                lambda output: shutil.copyfileobj(fp, output),
+                timeout or meta["expires"] - time.time(),
+                last_modification=last_modification,
+                text=meta["text"],
+                content_type=meta.get("content_type"),
+                etag=meta.get("etag"),
+            )
+
+    def acquire_lock(self, key, timeout):
+        """Acquire the lease to render the object of a key.
+
+        The lease file is created exclusively, so that a single worker of
+        the node holds it.
+
+        :param key: the object's key
+        :param timeout: the lease expiration in seconds
+        :returns: a token releasing the lease, or ``None`` if it is held
+        """
+        return self._acquire(self.path(key) + _LOCK, timeout)
+
+    def _acquire(self, path, timeout):
+        """Create a lease file holding its token and its expiration.
+
+        :param path: the lease file path
+        :param timeout: the lease expiration in seconds
+        :returns: the token of the lease, or ``None`` if it is held
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        token = uuid4().hex
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError as error:
+                if error.errno != errno.EEXIST:
+                    raise
+                if not self._lease_expired(path, time.time()):
+                    return None
+                # Take over the lease of a worker which died
+                self._unlink(path)
+                continue
+            with os.fdopen(fd, "w") as fp:
+                fp.write("{0} {1}".format(token, time.time() + timeout))
+            return token
+        return None
+
+    def _lease_expired(self, path, now):
+        """Return if a lease file has expired.
+
+        :param path: the lease file path
+        :param now: the current time
+        """
+        try:
+            with open(path) as fp:
+                expires = float(fp.read().split()[1])
+        except (IOError, OSError):
+            # Deleted meanwhile
+            return True
+        except (IndexError, ValueError):
+            # Its expiration is being written
+            expires = self._mtime(path) + _GRACE
+        return expires <= now
+
+    def _renew(self, path, token, timeout):
+        """Extend a lease file, if it is still held.
+
+        :param path: the lease file path
+        :param token: the token of the lease
+        :param timeout: the lease expiration in seconds
+        :returns: if the lease was extended
+        """
+        try:
+            with open(path) as fp:
+                if fp.read().split()[:1] != [token]:
+                    return False
+        except (IOError, OSError):
+            return False
+        expires = "{0} {1}".format(token, time.time() + timeout)
+        self._write(path, lambda fp: fp.write(expires.encode()))
+        return True
+
+    def release_lock(self, key, token):
+        """Release the lease to render the object of a key.
+
+        :param key: the object's key
+        :param token: the token returned by :func:`acquire_lock`
+        """
+        path = self.path(key) + _LOCK
+        try:
+            with open(path) as fp:
+                held = fp.read().split()[:1] == [token]
+        except (IOError, OSError):
+            return
+        if held:
+            self._unlink(path)
+
+    @staticmethod
+    def _unlink(path):
+        """Delete a file, if it exists."""
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def delete(self, key):
+        """Delete the specific key."""
+        self._unlink(self.path(key))
+
+    def flush(self):
+        """Flush the cache."""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                self._unlink(path)
+
+    def sweep(self):
+        """Delete the expired objects and the oldest ones over the size.
+
+        The temporary files and the leases left by the workers which died
+        are deleted too.
+        """
+        now = time.time()
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.startswith(_TMP):
+                    if self._mtime(path) + _GRACE < now:
+                        self._unlink(path)
+                    continue
+                if name.endswith(_LOCK):
+                    if self._lease_expired(path, now):
+                        self._unlink(path)
+                    continue
+                opened = self._open(path)
+                if opened is None:
+                    self._unlink(path)
+                    continue
+                fp, _ = opened
+                with fp:
+                    stat = os.fstat(fp.fileno())
+                    entries.append((stat.st_mtime, stat.st_size - fp.tell(), path))
+
+        if self.max_size:
+            size = sum(entry[1] for entry in entries)
+            for _, nbytes, path in sorted(entries):
+                if size <= self.max_size:
+                    break
+                self._unlink(path)
+                size -= nbytes
+
+    @staticmethod
+    def _mtime(path):
+        """Return the modification time of a file, ``0`` if it is deleted."""
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0
+
+    def _sweep_forever(self):
+        """Sweep the cache until it is stopped.
+
+        The worker holding the sweep lease renews it before each sweep, the
+        other workers take it over once it expired.
+        """
+        path = os.path.join(self.directory, _SWEEP)
+        timeout = 2 * self.sweep_interval
+        token = None
+        while not self.stopped.wait(self.sweep_interval):
+            try:
+                if token is None or not self._renew(path, token, timeout):
+                    token = self._acquire(path, timeout)
+                if token:
+                    self.sweep()
+            except Exception:
+                # The next sweep retries
+                pass
+
+    def stop(self):
+        """Stop the sweeper."""
+        self.stopped.set()
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Implement an in-memory cache bounded in bytes.
+
+Unlike :class:`~flask_iiif.cache.simple.ImageSimpleCache`, which limits the
+number of entries and pickles every value, the objects are stored as they
+are and the least recently used ones are evicted once the cache is over its
+size in bytes:
+
+.. code-block:: python
+
+    IIIF_CACHE_HANDLER = "flask_iiif.cache.memory:ImageMemoryCache"
+    IIIF_CACHE_MEMORY_SIZE = 256 * 1024 * 1024
+
+The cached objects are returned without copies, they are immutable `bytes`
+and `str` objects.
+"""
+
+from __future__ import absolute_import
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from io import BytesIO
+from uuid import uuid4
+
+from flask import current_app
+
+from .cache import ImageCache
+
+
+class ImageMemoryCache(ImageCache):
+    """Least recently used image cache, bounded in bytes."""
+
+    def __init__(self, app=None, max_bytes=None):
+        """Initialize the cache.
+
+        :param int max_bytes: the size of the cached objects, by default
+            :py:attr:`~flask_iiif.config.IIIF_CACHE_MEMORY_SIZE`
+        """
+        super(ImageMemoryCache, self).__init__(app=app)
+        if max_bytes is None:
+            max_bytes = (app or current_app).config["IIIF_CACHE_MEMORY_SIZE"]
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.leases = {}
+        self.indexes = {}
+        self.owners = {}
+        self.lock = threading.Lock()
+
+    def _entry(self, key):
+        """Return the entry of a key, deleting it if it expired.
+
+        The entries are ``[value, nbytes, expires, last_modification,
+        metadata]`` lists, the lock must be held.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.time():
+            self._pop(key)
+            return None
+        return entry
+
+    def _pop(self, key):
+        """Delete the entry of a key, the lock must be held."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+        uuid = self.owners.pop(key, None)
+        if uuid is not None:
+            self.indexes[uuid].discard(key)
+            if not self.indexes[uuid]:
+                del self.indexes[uuid]
+
+    def get(self, key):
+        """Return the key value.
+
+        :param key: the object's key
+        :return: the stored object, without copy
+        :rtype: `bytes` or `str`
+        """
+        with self.lock:
+            entry = self._entry(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def get_entry(self, key, stream=False):
+        """Return the cached object with its metadata.
+
+        :param key: the object's key
+        :param bool stream: return the object as a `BytesIO` object
+        :return: a dictionary with the ``value``, the
+            ``last_modification``, the ``content_type`` and the ``etag`` of
+            the object, or ``None``
+        """
+        with self.lock:
+            entry = self._entry(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            value, _, _, last_modification, metadata = entry
+        return dict(
+            metadata,
+            value=BytesIO(value) if stream else value,
+            last_modification=last_modification,
+        )
+
+    def set(self, key, value, timeout=None, last_modification=None):
+        """Cache the object, evicting the least recently used ones.
+
+        Objects larger than the cache are not stored.
+
+        :param key: the object's key
+        :param value: the stored object
+        :type value: `bytes` or `str`
+        :param timeout: the cache timeout in seconds
+        :param last_modification: the modification date, by default now
+        :type last_modification: datetime.datetime
+        """
+        self.set_entry(key, value, timeout=timeout, last_modification=last_modification)
+
+    def set_entry(
+        self,
+        key,
+        value,
+        timeout=None,
+        content_type=None,
+        etag=None,
+        last_modification=None,
+    ):
+        """Cache the object with its metadata.
+
+        :param key: the object's key
+        :param value: the stored object
+        :type value: `bytes` or `str`
+        :param timeout: the cache timeout in seconds
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        :param last_modification: the modification date, by default now
+        :type last_modification: datetime.datetime
+        """
+        if isinstance(value, (bytearray, memoryview)):
+            value = bytes(value)
+        nbytes = len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+        timeout = timeout or self.timeout
+        if not last_modification:
+            last_modification = datetime.utcnow().replace(microsecond=0)
+        with self.lock:
+            self._pop(key)
+            if nbytes > self.max_bytes:
+                return
+            self.entries[key] = [
+                value,
+                nbytes,
+                time.time() + timeout,
+                last_modification,
+                dict(content_type=content_type, etag=etag),
+            ]
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                self._pop(next(iter(self.entries)))
+
+    def set_stream(self, key, stream, timeout=None):
+        """Cache the object read from a file, if it fits in the cache.
+
+        :param key: the object's key
+        :param stream: the file object, read from its start
+        :param timeout: the cache timeout in seconds
+        """
+        stream.seek(0, 2)
+        if stream.tell() <= self.max_bytes:
+            stream.seek(0)
+            self.set(key, stream.read(), timeout=timeout)
+        else:
+            self.delete(key)
+        stream.seek(0)
+
+    def get_last_modification(self, key):
+        """Get last modification of cached file.
+
+        :param key: the file object's key
+        """
+        with self.lock:
+            entry = self._entry(key)
+            return entry[3] if entry is not None else None
+
+    def set_last_modification(self, key, last_modification=None, timeout=None):
+        """Set last modification of cached file.
+
+        The modification date is kept with the object, it is not set if the
+        object is not cached.
+
+        :param key: the file object's key
+        :param last_modification: Last modification date of
+            file represented by the key
+        :type last_modification: datetime.datetime
+        :param timeout: the cache timeout in seconds
+        """
+        if not last_modification:
+            last_modification = datetime.utcnow().replace(microsecond=0)
+        with self.lock:
+            entry = self._entry(key)
+            if entry is not None:
+                entry[3] = last_modification
+
+    def acquire_lock(self, key, timeout):
+        """Acquire the lease to render the object of a key.
+
+        :param key: the object's key
+        :param timeout: the lease expiration in seconds
+        :returns: a token releasing the lease, or ``None`` if it is held
+        """
+        now = time.time()
+        with self.lock:
+            lease = self.leases.get(key)
+            if lease is not None and lease[1] > now:
+                return None
+            token = uuid4().hex
+            self.leases[key] = (token, now + timeout)
+            return token
+
+    def release_lock(self, key, token):
+        """Release the lease to render the object of a key.
+
+        :param key: the object's key
+        :param token: the token returned by :func:`acquire_lock`
+        """
+        with self.lock:
+            lease = self.leases.get(key)
+            if lease is not None and lease[0] == token:
+                del self.leases[key]
+
+    def delete(self, key):
+        """Delete the specific key."""
+        with self.lock:
+            self._pop(key)
+
+    def index(self, uuid, *keys):
+        """Add keys to the index of an image.
+
+        The index is kept next to the entries, the evicted keys leave it.
+
+        :param uuid: the image uuid
+        :param keys: the keys of the objects of the image
+        """
+        with self.lock:
+            for key in keys:
+                if key in self.entries:
+                    self.owners[key] = uuid
+                    self.indexes.setdefault(uuid, set()).add(key)
+
+    def indexed(self, uuid):
+        """Return the keys in the index of an image.
+
+        :param uuid: the image uuid
+        :rtype: set
+        """
+        with self.lock:
+            return set(self.indexes.get(uuid, ()))
+
+    def invalidate(self, uuid):
+        """Delete the indexed keys of an image.
+
+        :param uuid: the image uuid
+        :returns: the number of indexed keys
+        """
+        with self.lock:
+            keys = self.indexes.pop(uuid, set())
+            for key in keys:
+                self.owners.pop(key, None)
+                self._pop(key)
+        return len(keys)
+
+    def flush(self):
+        """Flush the cache."""
+        with self.lock:
+            self.entries.clear()
+            self.leases.clear()
+            self.indexes.clear()
+            self.owners.clear()
+            self.size = 0
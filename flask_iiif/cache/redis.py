@@ -12,10 +12,12 @@
 from __future__ import absolute_import
 
 from datetime import datetime
+from io import BytesIO
+from uuid import uuid4
 
 from cachelib.redis import RedisCache
 from flask import current_app
-from redis import StrictRedis
+from redis import StrictRedis, WatchError
 
 from .cache import ImageCache
 
@@ -23,13 +25,23 @@ from .cache import ImageCache
 class ImageRedisCache(ImageCache):
     """Redis image cache."""
 
-    def __init__(self, app=None):
-        """Initialize the cache."""
+    def __init__(self, app=None, redis_url=None, client=None):
+        """Initialize the cache.
+
+        :param redis_url: the Redis server, by default
+            :py:attr:`~flask_iiif.config.IIIF_CACHE_REDIS_URL`
+        :param client: the Redis client, instead of connecting to the server
+        """
         super(ImageRedisCache, self).__init__(app=app)
         app = app or current_app
-        redis_url = app.config["IIIF_CACHE_REDIS_URL"]
         prefix = app.config.get("IIIF_CACHE_REDIS_PREFIX", "iiif")
-        self.cache = RedisCache(host=StrictRedis.from_url(redis_url), key_prefix=prefix)
+        if client is None:
+            client = StrictRedis.from_url(
+                redis_url or app.config["IIIF_CACHE_REDIS_URL"],
+                **(app.config.get("IIIF_CACHE_REDIS_OPTIONS") or {})
+            )
+        self.redis = client
+        self.cache = RedisCache(host=self.redis, key_prefix=prefix)
 
     def get(self, key):
         """Return the key value.
@@ -40,6 +52,30 @@ class ImageRedisCache(ImageCache):
         """
         return self.cache.get(key)
 
+    def get_entry(self, key, stream=False):
+        """Return the cached object with its metadata.
+
+        The object and its metadata are read with a single ``MGET``.
+
+        :param key: the object's key
+        :param bool stream: return the object as a `BytesIO` object
+        :return: a dictionary with the ``value``, the
+            ``last_modification``, the ``content_type`` and the ``etag`` of
+            the object, or ``None``
+        """
+        value, last_modification, metadata = self.cache.get_many(
+            key, self._last_modification_key_name(key), self._metadata_key_name(key)
+        )
+        if not value:
+            return None
+        metadata = metadata or {}
+        return dict(
+            value=BytesIO(value) if stream else value,
+            last_modification=last_modification,
+            content_type=metadata.get("content_type"),
+            etag=metadata.get("etag"),
+        )
+
     def set(self, key, value, timeout=None):
         """Cache the object.
 
@@ -48,9 +84,30 @@ class ImageRedisCache(ImageCache):
         :type value: `BytesIO` object
         :param timeout: the cache timeout in seconds
         """
+        self.set_entry(key, value, timeout=timeout)
+
+    def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata.
+
+        The object and its metadata are written in a single pipeline.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        """
         timeout = timeout or self.timeout
-        self.cache.set(key, value, timeout=timeout)
-        self.set_last_modification(key, timeout=timeout)
+        last_modification = datetime.utcnow().replace(microsecond=0)
+        metadata = dict(content_type=content_type, etag=etag)
+        self.cache.set_many(
+            {
+                key: value,
+                self._last_modification_key_name(key): last_modification,
+                self._metadata_key_name(key): metadata,
+            },
+            timeout,
+        )
 
     def get_last_modification(self, key):
         """Get last modification of cached file.
@@ -75,10 +132,109 @@ class ImageRedisCache(ImageCache):
             self._last_modification_key_name(key), last_modification, timeout
         )
 
+    def acquire_lock(self, key, timeout):
+        """Acquire the lease to render the object of a key.
+
+        The lease is set with ``SET NX EX``, so that a single worker of all
+        the nodes sharing the Redis server holds it.
+
+        :param key: the object's key
+        :param timeout: the lease expiration in seconds
+        :returns: a token releasing the lease, or ``None`` if it is held
+        """
+        token = uuid4().hex
+        name = self.cache.key_prefix + self._lock_key_name(key)
+        if self.redis.set(name, token, nx=True, ex=max(1, int(timeout))):
+            return token
+        return None
+
+    def release_lock(self, key, token):
+        """Release the lease to render the object of a key.
+
+        The lease is only deleted if it is still held with the token.
+
+        :param key: the object's key
+        :param token: the token returned by :func:`acquire_lock`
+        """
+        name = self.cache.key_prefix + self._lock_key_name(key)
+        with self.redis.pipeline() as pipe:
+            try:
+                pipe.watch(name)
+                if pipe.get(name) == token.encode():
+                    pipe.multi()
+                    pipe.delete(name)
+                    pipe.execute()
+            except WatchError:
+                # The lease expired and has been acquired again
+                pass
+
     def delete(self, key):
         """Delete the specific key."""
-        self.cache.delete(key)
-        self.cache.delete(self._last_modification_key_name(key))
+        self.cache.delete_many(
+            key, self._last_modification_key_name(key), self._metadata_key_name(key)
+        )
+
+    def _names(self, keys):
+        """Return the Redis names of the objects of keys with their metadata."""
+        prefix = self.cache.key_prefix
+        return [
+            prefix + name
+            for key in keys
+            for name in (
+                key,
+                self._last_modification_key_name(key),
+                self._metadata_key_name(key),
+            )
+        ]
+
+    def index(self, uuid, *keys):
+        """Add keys to the index of an image.
+
+        The index is a Redis set, expiring with the last object added.
+
+        :param uuid: the image uuid
+        :param keys: the keys of the objects of the image
+        """
+        name = self.cache.key_prefix + self._index_key_name(uuid)
+        with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(name, *keys)
+            pipe.expire(name, self.timeout)
+            pipe.execute()
+
+    def indexed(self, uuid):
+        """Return the keys in the index of an image.
+
+        :param uuid: the image uuid
+        :rtype: set
+        """
+        name = self.cache.key_prefix + self._index_key_name(uuid)
+        return set(member.decode("utf-8") for member in self.redis.smembers(name))
+
+    def delete_many(self, *keys):
+        """Delete several keys in a single pipeline."""
+        with self.redis.pipeline(transaction=False) as pipe:
+            for name in self._names(keys):
+                pipe.delete(name)
+            pipe.execute()
+
+    def invalidate(self, uuid):
+        """Delete the indexed keys of an image and its index.
+
+        The index is read and deleted in a pipeline, then its keys are
+        deleted in another one.
+
+        :param uuid: the image uuid
+        :returns: the number of indexed keys
+        """
+        name = self.cache.key_prefix + self._index_key_name(uuid)
+        with self.redis.pipeline(transaction=False) as pipe:
+            pipe.smembers(name)
+            pipe.delete(name)
+            members, _ = pipe.execute()
+        keys = [member.decode("utf-8") for member in members]
+        if keys:
+            self.delete_many(*keys)
+        return len(keys)
 
     def flush(self):
         """Flush the cache."""
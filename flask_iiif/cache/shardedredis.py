@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Implement Redis caches spread over several nodes.
+
+The keys are either spread over independent Redis servers with consistent
+hashing:
+
+.. code-block:: python
+
+    IIIF_CACHE_HANDLER = "flask_iiif.cache.shardedredis:ImageShardedRedisCache"
+    IIIF_CACHE_REDIS_URLS = [
+        "redis://cache-1:6379/0",
+        "redis://cache-2:6379/0",
+        "redis://cache-3:6379/0",
+    ]
+
+or stored in a Redis Cluster, whose startup node is
+:py:attr:`~flask_iiif.config.IIIF_CACHE_REDIS_URL`:
+
+.. code-block:: python
+
+    IIIF_CACHE_HANDLER = "flask_iiif.cache.shardedredis:ImageRedisClusterCache"
+
+The object of a key, its modification date, its metadata and its rendering
+lease are always stored on the same node, so that an entry is still read
+with a single ``MGET``. The connection pool size and the socket timeouts
+are set with :py:attr:`~flask_iiif.config.IIIF_CACHE_REDIS_OPTIONS`.
+"""
+
+from __future__ import absolute_import
+
+import bisect
+import hashlib
+
+from flask import current_app
+from redis.cluster import RedisCluster
+
+from .cache import ImageCache
+from .redis import ImageRedisCache
+
+
+class HashRing(object):
+    """Consistent hashing of the keys over nodes.
+
+    Each node is placed at several points of the ring, so that adding or
+    removing a node only moves the keys of its share of the ring.
+    """
+
+    def __init__(self, nodes=(), replicas=160):
+        """Initialize the ring.
+
+        :param nodes: the node names
+        :param int replicas: the points of each node on the ring
+        """
+        self.replicas = replicas
+        self.points = []
+        self.nodes = {}
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(value):
+        """Return the position of a value on the ring."""
+        return int(hashlib.md5(value.encode("utf-8")).hexdigest()[:16], 16)
+
+    def add(self, node):
+        """Add a node to the ring.
+
+        :param node: the node name
+        """
+        for replica in range(self.replicas):
+            point = self._hash("{0}#{1}".format(node, replica))
+            self.nodes[point] = node
+            bisect.insort(self.points, point)
+
+    def remove(self, node):
+        """Remove a node from the ring.
+
+        :param node: the node name
+        """
+        for replica in range(self.replicas):
+            point = self._hash("{0}#{1}".format(node, replica))
+            if self.nodes.get(point) == node:
+                del self.nodes[point]
+                self.points.remove(point)
+
+    def get(self, key):
+        """Return the node of a key.
+
+        :param key: the object's key
+        """
+        if not self.points:
+            raise ValueError("The ring has no node")
+        index = bisect.bisect(self.points, self._hash(key)) % len(self.points)
+        return self.nodes[self.points[index]]
+
+
+class ImageRoutedCache(ImageCache):
+    """Cache sending each key to another image cache."""
+
+    def __init__(self, router, app=None):
+        """Initialize the cache.
+
+        :param router: function returning the cache of a key and the key
+            stored in it
+        """
+        super(ImageRoutedCache, self).__init__(app=app)
+        self.router = router
+
+    def route(self, key):
+        """Return the cache of a key and the key stored in it.
+
+        :param key: the object's key
+        :returns: the ``(cache, key)`` of the object
+        """
+        return self.router(key)
+
+    def get(self, key):
+        """Return the key value."""
+        cache, key = self.route(key)
+        return cache.get(key)
+
+    def get_entry(self, key, stream=False):
+        """Return the cached object with its metadata."""
+        cache, key = self.route(key)
+        return cache.get_entry(key, stream=stream)
+
+    def set(self, key, value, timeout=None):
+        """Cache the object."""
+        cache, key = self.route(key)
+        cache.set(key, value, timeout=timeout)
+
+    def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata."""
+        cache, key = self.route(key)
+        cache.set_entry(
+            key, value, timeout=timeout, content_type=content_type, etag=etag
+        )
+
+    def get_last_modification(self, key):
+        """Get last modification of cached file."""
+        cache, key = self.route(key)
+        return cache.get_last_modification(key)
+
+    def set_last_modification(self, key, last_modification=None, timeout=None):
+        """Set last modification of cached file."""
+        cache, key = self.route(key)
+        cache.set_last_modification(
+            key, last_modification=last_modification, timeout=timeout
+        )
+
+    def acquire_lock(self, key, timeout):
+        """Acquire the lease to render the object of a key."""
+        cache, key = self.route(key)
+        return cache.acquire_lock(key, timeout)
+
+    def release_lock(self, key, token):
+        """Release the lease to render the object of a key."""
+        cache, key = self.route(key)
+        cache.release_lock(key, token)
+
+    def delete(self, key):
+        """Delete the specific key."""
+        cache, key = self.route(key)
+        cache.delete(key)
+
+    def index(self, uuid, *keys):
+        """Add keys to the index of an image, stored with the route of its uuid."""
+        cache, uuid = self.route(uuid)
+        cache.index(uuid, *keys)
+
+    def indexed(self, uuid):
+        """Return the keys in the index of an image."""
+        cache, uuid = self.route(uuid)
+        return cache.indexed(uuid)
+
+    def delete_many(self, *keys):
+        """Delete several keys, with a pipeline by cache."""
+        routed = {}
+        for key in keys:
+            cache, key = self.route(key)
+            routed.setdefault(id(cache), (cache, []))[1].append(key)
+        for cache, names in routed.values():
+            cache.delete_many(*names)
+
+    def invalidate(self, uuid):
+        """Delete the indexed keys of an image and its index."""
+        keys = self.indexed(uuid)
+        self.delete_many(*keys)
+        cache, uuid = self.route(uuid)
+        cache.delete(cache._index_key_name(uuid))
+        return len(keys)
+
+
+class ImageShardedRedisCache(ImageRoutedCache):
+    """Redis image cache sharded over several servers."""
+
+    def __init__(self, app=None):
+        """Initialize the connections to the nodes.
+
+        The nodes are :py:attr:`~flask_iiif.config.IIIF_CACHE_REDIS_URLS`.
+        """
+        super(ImageShardedRedisCache, self).__init__(self.ring_route, app=app)
+        app = app or current_app
+        urls = app.config["IIIF_CACHE_REDIS_URLS"]
+        self.nodes = dict((url, ImageRedisCache(app, redis_url=url)) for url in urls)
+        self.ring = HashRing(
+            urls, replicas=app.config.get("IIIF_CACHE_REDIS_REPLICAS", 160)
+        )
+
+    def ring_route(self, key):
+        """Return the node of a key.
+
+        :param key: the object's key
+        :returns: the ``(cache, key)`` of the object
+        """
+        return self.nodes[self.ring.get(key)], key
+
+    def flush(self):
+        """Flush the cache on all the nodes."""
+        for node in self.nodes.values():
+            node.flush()
+
+
+class ImageRedisClusterCache(ImageRoutedCache):
+    """Redis Cluster image cache."""
+
+    def __init__(self, app=None):
+        """Initialize the connection to the cluster.
+
+        The cluster is discovered from
+        :py:attr:`~flask_iiif.config.IIIF_CACHE_REDIS_URL`.
+        """
+        super(ImageRedisClusterCache, self).__init__(self.hash_tag_route, app=app)
+        app = app or current_app
+        client = RedisCluster.from_url(
+            app.config["IIIF_CACHE_REDIS_URL"],
+            **(app.config.get("IIIF_CACHE_REDIS_OPTIONS") or {})
+        )
+        self.cache = ImageRedisCache(app, client=client)
+
+    def hash_tag_route(self, key):
+        """Return the key with a hash tag.
+
+        The keys of an object share its hash tag, so that they are stored
+        in the same hash slot.
+
+        :param key: the object's key
+        :returns: the ``(cache, key)`` of the object
+        """
+        return self.cache, "{%s}" % key
+
+    def flush(self):
+        """Flush the cache."""
+        self.cache.flush()
@@ -12,6 +12,8 @@
 from __future__ import absolute_import
 
 from datetime import datetime
+from io import BytesIO
+from uuid import uuid4
 
 from cachelib.simple import SimpleCache
 
@@ -35,6 +37,28 @@ class ImageSimpleCache(ImageCache):
         """
         return self.cache.get(key)
 
+    def get_entry(self, key, stream=False):
+        """Return the cached object with its metadata.
+
+        :param key: the object's key
+        :param bool stream: return the object as a `BytesIO` object
+        :return: a dictionary with the ``value``, the
+            ``last_modification``, the ``content_type`` and the ``etag`` of
+            the object, or ``None``
+        """
+        value, last_modification, metadata = self.cache.get_many(
+            key, self._last_modification_key_name(key), self._metadata_key_name(key)
+        )
+        if not value:
+            return None
+        metadata = metadata or {}
+        return dict(
+            value=BytesIO(value) if stream else value,
+            last_modification=last_modification,
+            content_type=metadata.get("content_type"),
+            etag=metadata.get("etag"),
+        )
+
     def set(self, key, value, timeout=None):
         """Cache the object.
 
@@ -43,9 +67,28 @@ class ImageSimpleCache(ImageCache):
         :type value: `BytesIO` object
         :param timeout: the cache timeout in seconds
         """
+        self.set_entry(key, value, timeout=timeout)
+
+    def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        """
         timeout = timeout or self.timeout
-        self.cache.set(key, value, timeout)
-        self.set_last_modification(key, timeout=timeout)
+        last_modification = datetime.utcnow().replace(microsecond=0)
+        metadata = dict(content_type=content_type, etag=etag)
+        self.cache.set_many(
+            {
+                key: value,
+                self._last_modification_key_name(key): last_modification,
+                self._metadata_key_name(key): metadata,
+            },
+            timeout,
+        )
 
     def get_last_modification(self, key):
         """Get last modification of cached file.
@@ -70,10 +113,46 @@ class ImageSimpleCache(ImageCache):
             self._last_modification_key_name(key), last_modification, timeout
         )
 
+    def acquire_lock(self, key, timeout):
+        """Acquire the lease to render the object of a key.
+
+        :param key: the object's key
+        :param timeout: the lease expiration in seconds
+        :returns: a token releasing the lease, or ``None`` if it is held
+        """
+        token = uuid4().hex
+        if self.cache.add(self._lock_key_name(key), token, timeout):
+            return token
+        return None
+
+    def release_lock(self, key, token):
+        """Release the lease to render the object of a key.
+
+        :param key: the object's key
+        :param token: the token returned by :func:`acquire_lock`
+        """
+        if self.cache.get(self._lock_key_name(key)) == token:
+            self.cache.delete(self._lock_key_name(key))
+
     def delete(self, key):
         """Delete the specific key."""
-        self.cache.delete(key)
-        self.cache.delete(self._last_modification_key_name(key))
+        self.cache.delete_many(
+            key, self._last_modification_key_name(key), self._metadata_key_name(key)
+        )
+
+    def delete_many(self, *keys):
+        """Delete several keys at once."""
+        self.cache.delete_many(
+            *[
+                name
+                for key in keys
+                for name in (
+                    key,
+                    self._last_modification_key_name(key),
+                    self._metadata_key_name(key),
+                )
+            ]
+        )
 
     def flush(self):
         """Flush the cache."""
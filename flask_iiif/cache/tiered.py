@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Implement a two-tier cache.
+
+A small in-process tier, an
+:class:`~flask_iiif.cache.memory.ImageMemoryCache` bounded in bytes, is put
+in front of another :class:`~flask_iiif.cache.cache.ImageCache`, so that the
+hot images are served without a network round trip:
+
+.. code-block:: python
+
+    IIIF_CACHE_HANDLER = "flask_iiif.cache.tiered:ImageTieredCache"
+    IIIF_CACHE_TIERED_BACKEND = "flask_iiif.cache.redis:ImageRedisCache"
+
+The objects are read through and written through the in-process tier. They
+expire from it after a short timeout, so that the changes made by the other
+workers are soon visible.
+"""
+
+from __future__ import absolute_import
+
+import threading
+from io import BytesIO
+
+from flask import current_app
+from six import string_types
+from werkzeug.utils import import_string
+
+from .cache import ImageCache
+from .memory import ImageMemoryCache
+
+
+class ImageTieredCache(ImageCache):
+    """Two-tier image cache."""
+
+    def __init__(self, app=None, backend=None):
+        """Initialize the cache.
+
+        :param backend: the second tier, by default
+            :py:attr:`~flask_iiif.config.IIIF_CACHE_TIERED_BACKEND`
+        """
+        super(ImageTieredCache, self).__init__(app=app)
+        app = app or current_app
+        if backend is None:
+            backend = app.config["IIIF_CACHE_TIERED_BACKEND"]
+            if isinstance(backend, string_types):
+                backend = import_string(backend)
+            if callable(backend):
+                backend = backend(app)
+        self.backend = backend
+        self.l1 = ImageMemoryCache(app, max_bytes=app.config["IIIF_CACHE_L1_SIZE"])
+        self.l1_timeout = app.config["IIIF_CACHE_L1_TIMEOUT"]
+        self.lock = threading.Lock()
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+
+    def _count(self, name):
+        """Count a hit or a miss of :func:`get`."""
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key):
+        """Return the key value, reading the second tier on a miss.
+
+        :param key: the object's key
+        :return: the stored object
+        """
+        value = self.l1.get(key)
+        if value is not None:
+            self._count("l1_hits")
+            return value
+        value = self.backend.get(key)
+        if value is None:
+            self._count("misses")
+            return None
+        self._count("l2_hits")
+        self.l1.set(
+            key,
+            value,
+            timeout=self.l1_timeout,
+            last_modification=self.backend.get_last_modification(key),
+        )
+        return value
+
+    def get_entry(self, key, stream=False):
+        """Return the cached object with its metadata.
+
+        The entries missing from the first tier are read at once from the
+        second tier.
+
+        :param key: the object's key
+        :param bool stream: return the object as a file
+        :return: a dictionary with the ``value``, the
+            ``last_modification``, the ``content_type`` and the ``etag`` of
+            the object, or ``None``
+        """
+        entry = self.l1.get_entry(key, stream=stream)
+        if entry is not None:
+            self._count("l1_hits")
+            return entry
+        entry = self.backend.get_entry(key)
+        if entry is None:
+            self._count("misses")
+            return None
+        self._count("l2_hits")
+        self.l1.set_entry(key, timeout=self.l1_timeout, **entry)
+        if stream:
+            entry["value"] = BytesIO(entry["value"])
+        return entry
+
+    def set(self, key, value, timeout=None):
+        """Cache the object in both tiers.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        """
+        self.backend.set(key, value, timeout=timeout)
+        self.l1.set(key, value, timeout=self.l1_timeout)
+
+    def set_entry(self, key, value, timeout=None, content_type=None, etag=None):
+        """Cache the object with its metadata in both tiers.
+
+        :param key: the object's key
+        :param value: the stored object
+        :param timeout: the cache timeout in seconds
+        :param content_type: the content type of the object
+        :param etag: the entity tag of the object
+        """
+        self.backend.set_entry(
+            key, value, timeout=timeout, content_type=content_type, etag=etag
+        )
+        self.l1.set_entry(
+            key, value, timeout=self.l1_timeout, content_type=content_type, etag=etag
+        )
+
+    def set_stream(self, key, stream, timeout=None):
+        """Cache the object read from a file in both tiers.
+
+        The object is kept in the first tier only if it fits.
+
+        :param key: the object's key
+        :param stream: the file object, read from its start
+        :param timeout: the cache timeout in seconds
+        """
+        self.backend.set_stream(key, stream, timeout=timeout)
+        self.l1.set_stream(key, stream, timeout=self.l1_timeout)
+
+    def get_last_modification(self, key):
+        """Get last modification of cached file.
+
+        :param key: the file object's key
+        """
+        last_modification = self.l1.get_last_modification(key)
+        if last_modification is None:
+            last_modification = self.backend.get_last_modification(key)
+        return last_modification
+
+    def set_last_modification(self, key, last_modification=None, timeout=None):
+        """Set last modification of cached file.
+
+        :param key: the file object's key
+        :param last_modification: Last modification date of
+            file represented by the key
+        :type last_modification: datetime.datetime
+        :param timeout: the cache timeout in seconds
+        """
+        self.backend.set_last_modification(
+            key, last_modification=last_modification, timeout=timeout
+        )
+        self.l1.set_last_modification(key, last_modification=last_modification)
+
+    def acquire_lock(self, key, timeout):
+        """Acquire the lease of the second tier.
+
+        :param key: the object's key
+        :param timeout: the lease expiration in seconds
+        :returns: a token releasing the lease, or ``None`` if it is held
+        """
+        return self.backend.acquire_lock(key, timeout)
+
+    def release_lock(self, key, token):
+        """Release the lease of the second tier.
+
+        :param key: the object's key
+        :param token: the token returned by :func:`acquire_lock`
+        """
+        self.backend.release_lock(key, token)
+
+    def stats(self):
+        """Return the hits of each tier.
+
+        :returns: A dictionary with the ``l1_hits``, ``l2_hits`` and
+            ``misses`` of :func:`get`, and the ``l1_size`` in bytes
+        """
+        with self.lock:
+            return dict(
+                l1_hits=self.l1_hits,
+                l2_hits=self.l2_hits,
+                misses=self.misses,
+                l1_size=self.l1.size,
+            )
+
+    def delete(self, key):
+        """Delete the specific key."""
+        self.l1.delete(key)
+        self.backend.delete(key)
+
+    def index(self, uuid, *keys):
+        """Add keys to the index of an image of the second tier."""
+        self.backend.index(uuid, *keys)
+
+    def indexed(self, uuid):
+        """Return the keys in the index of an image of the second tier."""
+        return self.backend.indexed(uuid)
+
+    def delete_many(self, *keys):
+        """Delete several keys from both tiers."""
+        for key in keys:
+            self.l1.delete(key)
+        self.backend.delete_many(*keys)
+
+    def invalidate(self, uuid):
+        """Delete the indexed keys of an image from both tiers.
+
+        The first tier of the other processes keeps the objects until
+        :py:attr:`~flask_iiif.config.IIIF_CACHE_L1_TIMEOUT` elapses.
+        """
+        for key in self.backend.indexed(uuid):
+            self.l1.delete(key)
+        return self.backend.invalidate(uuid)
+
+    def flush(self):
+        """Flush the cache."""
+        self.l1.flush()
+        self.backend.flush()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Command line interface of the IIIF images.
+
+The commands are registered on the application by
+:func:`~flask_iiif.IIIF.init_app`, under ``flask iiif``.
+"""
+
+from __future__ import absolute_import
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .warm import CacheWarmer, thumbnail_requests
+
+
+@click.group()
+def iiif():
+    """IIIF images commands."""
+
+
+@iiif.command()
+@click.argument("uuids", type=click.File("r"), default="-")
+@click.option(
+    "--size",
+    "sizes",
+    multiple=True,
+    help="Size of the thumbnails, IIIF_WARM_SIZES by default.",
+)
+@click.option("--format", "image_format", help="Format of the images.")
+@click.option("--quality", default="default", help="Quality of the images.")
+@click.option(
+    "--tiles",
+    "min_scale_factor",
+    type=int,
+    help="Warm the tiles down to this scale factor.",
+)
+@click.option("--version", default="v2", help="IIIF version of the requests.")
+@click.option("--workers", type=int, help="Images rendered at the same time.")
+@click.option("--rate", type=float, help="Images rendered per second.")
+@click.option(
+    "--resume",
+    "state",
+    type=click.Path(dir_okay=False),
+    help="File listing the warmed uuids, which are skipped.",
+)
+@with_appcontext
+def warm(uuids, sizes, image_format, quality, min_scale_factor, version, **kwargs):
+    """Render the images of the uuids read from a file, one per line."""
+    config = current_app.config
+    image_format = image_format or config["IIIF_WARM_FORMAT"]
+    requests = thumbnail_requests(
+        sizes or config["IIIF_WARM_SIZES"], image_format=image_format, quality=quality
+    )
+
+    def progress(uuid, stats):
+        click.echo(
+            "{uuids} uuids: {rendered} rendered, {cached} cached, "
+            "{failed} failed ({0})".format(uuid, **stats),
+            err=True,
+        )
+
+    warmer = CacheWarmer(
+        workers=kwargs["workers"] or config["IIIF_WARM_WORKERS"],
+        rate=kwargs["rate"] or config["IIIF_WARM_RATE"],
+        state=kwargs["state"],
+        progress=progress,
+        version=version,
+        min_scale_factor=min_scale_factor,
+        image_format=image_format,
+        quality=quality,
+    )
+    stats = warmer.warm(uuids, requests)
+    click.echo(
+        "Warmed {uuids} uuids, skipped {skipped}: {rendered} images rendered, "
+        "{cached} already cached, {failed} failed.".format(**stats)
+    )
+    if stats["failed"]:
+        raise click.exceptions.Exit(1)
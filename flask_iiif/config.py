@@ -20,6 +20,46 @@
 
     Sets prefix for redis keys, default: `iiif`
 
+.. py:data:: IIIF_CACHE_REDIS_OPTIONS
+
+    Options of the Redis connections of the cache, such as
+    ``max_connections``, ``socket_timeout`` or ``socket_connect_timeout``,
+    default: `{}`.
+
+.. py:data:: IIIF_CACHE_REDIS_URLS
+
+    Redis servers of
+    :py:class:`~flask_iiif.cache.shardedredis.ImageShardedRedisCache`,
+    default: `[]`.
+
+.. py:data:: IIIF_CACHE_REDIS_REPLICAS
+
+    Points of each Redis server on the consistent hashing ring, default:
+    `160`.
+
+.. py:data:: IIIF_METADATA_HANDLER
+
+    Add the preferred image metadata index, default: `None` (no index).
+
+    .. seealso:: :py:class:`~flask_iiif.metadata.metadata.ImageMetadataIndex`
+
+.. py:data:: IIIF_METADATA_REDIS_URL
+
+    Redis server of
+    :py:class:`~flask_iiif.metadata.redis.ImageRedisMetadataIndex`,
+    default: `redis://localhost:6379/1`
+
+    The index outlives the image cache: a flush of the cache must not touch
+    it, so it is kept in another database than
+    :py:data:`IIIF_CACHE_REDIS_URL`. The cache flush deletes every key
+    starting with :py:data:`IIIF_CACHE_REDIS_PREFIX`, or the whole database
+    without prefix.
+
+.. py:data:: IIIF_METADATA_REDIS_PREFIX
+
+    Sets prefix for the redis keys of the metadata index, it must not start
+    with :py:data:`IIIF_CACHE_REDIS_PREFIX`, default: `metadata:`
+
 .. py:data:: IIIF_CACHE_TIME
 
     How much time the image would be cached.
@@ -52,6 +92,279 @@
         `IIIF Image API v2
         <http://iiif.io/api/image/2.0/>`_
 
+.. py:data:: IIIF_JPEG_DRAFT
+
+    Decode JPEG images at 1/2, 1/4 or 1/8 of their size when the requested
+    output is small enough, default: `True`.
+
+.. py:data:: IIIF_TIFF_PARTIAL_DECODE
+
+    Only decode the tiles or strips of a TIFF image overlapping the requested
+    region, default: `True`.
+
+.. py:data:: IIIF_TIFF_PYRAMID
+
+    Decode the smallest level of a pyramidal TIFF image still covering the
+    requested output, default: `True`.
+
+.. py:data:: IIIF_JPEG2000_REDUCE
+
+    Only decode the resolution levels of a JPEG 2000 image needed by the
+    requested output, default: `True`.
+
+.. py:data:: IIIF_JPEG2000_LAYERS
+
+    Maximum number of quality layers decoded when a JPEG 2000 image is
+    decoded at a reduced resolution, default: `0` (all the layers).
+
+.. py:data:: IIIF_LAZY_RENDERING
+
+    Record the IIIF operations and merge them into as few pixel passes as
+    possible when the image is served, default: `False`.
+
+    .. seealso:: :py:class:`~flask_iiif.api.MultimediaImage`
+
+.. py:data:: IIIF_RESIZE_REDUCING_GAP
+
+    Reduce the image by an integer factor before resampling it, as long as
+    the remaining scale is at least this value, default: `3.0`. Higher
+    values give a better quality, `None` always resamples the full image.
+
+    .. seealso::
+
+        `Pillow resize
+        <https://pillow.readthedocs.io/en/stable/reference/Image.html#PIL.Image.Image.resize>`_
+
+.. py:data:: IIIF_PASSTHROUGH
+
+    Serve the source file without decoding it when the request asks for the
+    full image in the format of the source, default: `True`.
+
+.. py:data:: IIIF_SOURCE_SIZES_CACHE_SIZE
+
+    Memory in bytes of the source image sizes kept by each process, so that
+    the cache key of a rendered image is built from its resolved geometry
+    without opening the source, default: `1048576` (1 MiB).
+
+.. py:data:: IIIF_SOURCE_SIZES_CACHE_TIME
+
+    Time in seconds a process keeps the size of a source image. The sizes are
+    deleted by :func:`~flask_iiif.IIIF.invalidate` in the invalidating
+    process only, the other processes use the old size until it expires,
+    default: `60`.
+
+.. py:data:: IIIF_DERIVE_FROM_CACHE
+
+    Render the images from the larger cached renderings of the same region
+    instead of the source image, default: `False`.
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.derivatives`
+
+.. py:data:: IIIF_DERIVE_MIN_SCALE
+
+    Times a cached rendering must be larger than the requested image to be
+    derived from, default: `2.0`.
+
+.. py:data:: IIIF_DERIVE_FORMATS
+
+    Formats of the cached renderings which can be derived from, default:
+    `("jpeg", "png", "tiff", "webp")`.
+
+.. py:data:: IIIF_DECODED_CACHE_SIZE
+
+    Memory in bytes of the decoded source images kept by each process, so
+    that the requests on the same image and resolution level decode it only
+    once, default: `0` (disabled).
+
+    .. seealso::
+
+        :py:class:`~flask_iiif.cache.decoded.DecodedImageCache`
+
+.. py:data:: IIIF_SINGLE_FLIGHT
+
+    Render each cached image only once when the requests miss the cache at
+    the same time, the other requests wait for it, default: `True`.
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.singleflight`
+
+.. py:data:: IIIF_SINGLE_FLIGHT_LEASE
+
+    Seconds after which the lease of a worker rendering an image expires,
+    default: `30`.
+
+.. py:data:: IIIF_SINGLE_FLIGHT_WAIT
+
+    Seconds a request waits for an image rendered by another worker before
+    rendering it itself, default: `10`.
+
+.. py:data:: IIIF_SINGLE_FLIGHT_INTERVAL
+
+    Seconds between two reads of the cache while waiting, default: `0.05`.
+
+.. py:data:: IIIF_RENDER_WORKERS
+
+    Threads rendering the images of each process, default: `0` (the images
+    are rendered by the threads serving the requests).
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.executor`
+
+.. py:data:: IIIF_RENDER_QUEUE_SIZE
+
+    Images waiting for a rendering thread before the requests are rejected
+    with ``503 Service Unavailable``, default: `16`.
+
+.. py:data:: IIIF_RENDER_RETRY_AFTER
+
+    Seconds sent in the ``Retry-After`` header of the rejected requests,
+    default: `5`.
+
+.. py:data:: IIIF_RENDER_PROCESSES
+
+    Processes rendering the images, for the operations holding the GIL,
+    default: `0` (the images are rendered by threads).
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.processpool`
+
+.. py:data:: IIIF_ASYNC_CACHE_HANDLER
+
+    Cache handler of the asynchronous endpoints, default: `None` (the
+    :py:data:`IIIF_CACHE_HANDLER` runs on threads). The rendered images are
+    stored through the :py:data:`IIIF_CACHE_HANDLER`, on threads, so both
+    handlers must share their storage.
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.asgi`
+
+.. py:data:: IIIF_SPOOL_MAX_SIZE
+
+    Size in bytes above which the rendered images are encoded into a
+    temporary file, streamed by chunks and removed once served, default: `0`
+    (the images are kept in memory).
+
+.. py:data:: IIIF_MAX_WIDTH
+
+    Maximum width of the requested images, default: `None` (no limit).
+    The limits are checked from the image header, before decoding it, and
+    the requests over them are rejected with ``400 Bad Request``.
+
+.. py:data:: IIIF_MAX_HEIGHT
+
+    Maximum height of the requested images, default: `None` (no limit).
+
+.. py:data:: IIIF_MAX_OUTPUT_PIXELS
+
+    Maximum pixels of the requested images, default: `None` (no limit).
+
+.. py:data:: IIIF_MAX_DECODE_PIXELS
+
+    Maximum pixels decoded from the source images, once reduced, default:
+    `None` (no limit).
+
+.. py:data:: IIIF_DECODE_PIXEL_BUDGET
+
+    Pixels decoded at the same time by each process, the other images wait
+    for them, default: `None` (no limit).
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.budget`
+
+.. py:data:: IIIF_DECODE_PIXEL_BUDGET_TIMEOUT
+
+    Seconds an image waits for the pixel budget before the request is
+    rejected with ``503 Service Unavailable``, default: `30`.
+
+.. py:data:: IIIF_SCHEDULER_LANES
+
+    Lanes of the renderings, by increasing cost, as a list of dictionaries
+    with the ``name``, the ``max_cost`` (``None`` for any) and the number of
+    concurrent renderings (``workers``) of each lane, default: `None` (the
+    renderings are not scheduled).
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.scheduler`
+
+.. py:data:: IIIF_SCHEDULER_UUID_LIMIT
+
+    Concurrent renderings of the same image, default: `None` (no limit).
+
+.. py:data:: IIIF_SCHEDULER_TIMEOUT
+
+    Seconds a rendering waits for its lane before the request is rejected
+    with ``503 Service Unavailable``, default: `30`.
+
+.. py:data:: IIIF_SCHEDULER_FORMAT_WEIGHTS
+
+    Weight of the output pixels in the cost of a rendering, by format,
+    default: `2` for PDF, PNG and TIFF, `1` for the others.
+
+.. py:data:: IIIF_CACHE_MEMORY_SIZE
+
+    Bytes of :py:class:`~flask_iiif.cache.memory.ImageMemoryCache`,
+    default: `256 MiB`.
+
+.. py:data:: IIIF_CACHE_FILESYSTEM_DIR
+
+    Directory of :py:class:`~flask_iiif.cache.filesystem.ImageFileSystemCache`,
+    default: `None` (`flask-iiif` in the temporary directory).
+
+.. py:data:: IIIF_CACHE_FILESYSTEM_MAX_SIZE
+
+    Bytes of the files of the filesystem cache, the least recently written
+    ones are deleted by the sweeper, default: `None` (no limit).
+
+.. py:data:: IIIF_CACHE_FILESYSTEM_SWEEP_INTERVAL
+
+    Seconds between the sweeps of the filesystem cache, default: `60`
+    (`0` disables the sweeper thread).
+
+.. py:data:: IIIF_CACHE_TIERED_BACKEND
+
+    Cache adaptor of the second tier of
+    :py:class:`~flask_iiif.cache.tiered.ImageTieredCache`, default:
+    `flask_iiif.cache.redis:ImageRedisCache`.
+
+.. py:data:: IIIF_CACHE_L1_SIZE
+
+    Bytes of the in-process tier of
+    :py:class:`~flask_iiif.cache.tiered.ImageTieredCache`, default: `32 MiB`.
+
+.. py:data:: IIIF_CACHE_L1_TIMEOUT
+
+    Seconds the objects stay in the in-process tier, default: `10`.
+
+.. py:data:: IIIF_WARM_SIZES
+
+    Sizes of the thumbnails rendered by ``flask iiif warm``, default:
+    `("!100,100", "!400,400")`.
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.warm`
+
+.. py:data:: IIIF_WARM_FORMAT
+
+    Format of the images rendered by ``flask iiif warm``, default: `jpg`.
+
+.. py:data:: IIIF_WARM_WORKERS
+
+    Images rendered at the same time by ``flask iiif warm``, default: `4`.
+
+.. py:data:: IIIF_WARM_RATE
+
+    Images rendered per second by ``flask iiif warm``, default: `None`
+    (unlimited).
+
 .. py:data:: IIIF_API_INFO_RESPONSE_SKELETON
 
     Information request document for the image.
@@ -63,6 +376,7 @@
         <http://iiif.io/api/image/2.0/#information-request>`_
 
 """
+
 # Cache handler
 IIIF_CACHE_HANDLER = "flask_iiif.cache.simple:ImageSimpleCache"
 
@@ -74,6 +388,22 @@ IIIF_CACHE_TIME = 60 * 60 * 24 * 2
 # Redis URL Cache
 IIIF_CACHE_REDIS_URL = "redis://localhost:6379/0"
 
+# Options of the Redis connections of the cache
+IIIF_CACHE_REDIS_OPTIONS = {}
+
+# Redis servers of the sharded cache
+IIIF_CACHE_REDIS_URLS = []
+
+# Points of each Redis server on the consistent hashing ring
+IIIF_CACHE_REDIS_REPLICAS = 160
+
+# Image metadata index
+IIIF_METADATA_HANDLER = None
+
+# Redis URL and keys prefix of the metadata index
+IIIF_METADATA_REDIS_URL = "redis://localhost:6379/1"
+IIIF_METADATA_REDIS_PREFIX = "metadata:"
+
 # Supported qualities
 IIIF_QUALITIES = ("default", "gray", "grey", "bitonal", "color", "native")
 # Suported coverters
@@ -160,6 +490,125 @@ IIIF_MODE = {
     "F": ["default", "color", "gray", "grey", "bitonal"],
 }
 
+# Use the JPEG DCT scaling on downscaling requests
+IIIF_JPEG_DRAFT = True
+
+# Decode only the TIFF tiles or strips needed by the requested region
+IIIF_TIFF_PARTIAL_DECODE = True
+
+# Use the sub-resolution pages of pyramidal TIFF images
+IIIF_TIFF_PYRAMID = True
+
+# Use the resolution levels of JPEG 2000 images
+IIIF_JPEG2000_REDUCE = True
+
+# Quality layers decoded at reduced resolutions, 0 decodes all of them
+IIIF_JPEG2000_LAYERS = 0
+
+# Merge the image operations when the image is served
+IIIF_LAZY_RENDERING = False
+
+# Integer pre-reduction of large downscales, None disables it
+IIIF_RESIZE_REDUCING_GAP = 3.0
+
+# Serve the source file as it is for identity requests
+IIIF_PASSTHROUGH = True
+
+# Source image sizes cache size in bytes
+IIIF_SOURCE_SIZES_CACHE_SIZE = 1024 * 1024
+
+# Source image sizes cache timeout in seconds
+IIIF_SOURCE_SIZES_CACHE_TIME = 60
+
+# Derive the images from the larger cached renderings
+IIIF_DERIVE_FROM_CACHE = False
+
+# Scale and formats of the cached renderings derived from
+IIIF_DERIVE_MIN_SCALE = 2.0
+IIIF_DERIVE_FORMATS = ("jpeg", "png", "tiff", "webp")
+
+# Decoded source images cache size in bytes, 0 disables it
+IIIF_DECODED_CACHE_SIZE = 0
+
+# Render each cache miss once across the threads and workers
+IIIF_SINGLE_FLIGHT = True
+
+# Single-flight lease expiration, wait limit and polling interval in seconds
+IIIF_SINGLE_FLIGHT_LEASE = 30
+IIIF_SINGLE_FLIGHT_WAIT = 10
+IIIF_SINGLE_FLIGHT_INTERVAL = 0.05
+
+# Rendering threads, 0 renders on the request threads
+IIIF_RENDER_WORKERS = 0
+
+# Images waiting for a rendering thread
+IIIF_RENDER_QUEUE_SIZE = 16
+
+# Retry-After seconds of the requests rejected when the queue is full
+IIIF_RENDER_RETRY_AFTER = 5
+
+# Rendering processes, 0 renders on threads
+IIIF_RENDER_PROCESSES = 0
+
+# Asynchronous cache handler, None runs the cache handler on threads
+IIIF_ASYNC_CACHE_HANDLER = None
+
+# Encode the images larger than this size into temporary files, 0 disables it
+IIIF_SPOOL_MAX_SIZE = 0
+
+# Limits of the requested images, None disables them
+IIIF_MAX_WIDTH = None
+IIIF_MAX_HEIGHT = None
+IIIF_MAX_OUTPUT_PIXELS = None
+
+# Limit of the pixels decoded from the source images, None disables it
+IIIF_MAX_DECODE_PIXELS = None
+
+# Pixels decoded at the same time by each process, None disables the budget
+IIIF_DECODE_PIXEL_BUDGET = None
+
+# Seconds waited for the pixel budget
+IIIF_DECODE_PIXEL_BUDGET_TIMEOUT = 30
+
+# Lanes of the renderings by cost, None disables the scheduler
+IIIF_SCHEDULER_LANES = None
+
+# Concurrent renderings of the same image, None disables the limit
+IIIF_SCHEDULER_UUID_LIMIT = None
+
+# Seconds waited for a rendering lane
+IIIF_SCHEDULER_TIMEOUT = 30
+
+# Weight of the output pixels in the rendering cost by format
+IIIF_SCHEDULER_FORMAT_WEIGHTS = {"pdf": 2, "png": 2, "tif": 2, "tiff": 2}
+
+# Bytes of the in-memory cache
+IIIF_CACHE_MEMORY_SIZE = 256 * 1024 * 1024
+
+# Directory of the filesystem cache, None for a temporary directory
+IIIF_CACHE_FILESYSTEM_DIR = None
+
+# Bytes of the filesystem cache, None disables the limit
+IIIF_CACHE_FILESYSTEM_MAX_SIZE = None
+
+# Seconds between the sweeps of the filesystem cache
+IIIF_CACHE_FILESYSTEM_SWEEP_INTERVAL = 60
+
+# Second tier of the tiered cache
+IIIF_CACHE_TIERED_BACKEND = "flask_iiif.cache.redis:ImageRedisCache"
+
+# Bytes of the in-process tier of the tiered cache
+IIIF_CACHE_L1_SIZE = 32 * 1024 * 1024
+
+# Seconds the objects stay in the in-process tier
+IIIF_CACHE_L1_TIMEOUT = 10
+
+# Thumbnails, format, threads and rate of the cache warming
+IIIF_WARM_SIZES = ("!100,100", "!400,400")
+IIIF_WARM_FORMAT = "jpg"
+IIIF_WARM_WORKERS = 4
+IIIF_WARM_RATE = None
+
 # API Info
 IIIF_API_INFO_RESPONSE_SKELETON = {
     "v1": {
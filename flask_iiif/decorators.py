@@ -13,6 +13,7 @@ from functools import wraps
 
 from flask import current_app
 from flask_restful import abort
+from werkzeug.exceptions import ServiceUnavailable
 from werkzeug.local import LocalProxy
 
 from .errors import (
@@ -24,16 +25,43 @@ from .errors import (
     MultimediaImageQualityError,
     MultimediaImageResizeError,
     MultimediaImageRotateError,
+    MultimediaRenderQueueFull,
 )
 
 __all__ = (
     "api_decorator",
     "error_handler",
+    "raise_http_error",
 )
 
 current_iiif = LocalProxy(lambda: current_app.extensions["iiif"])
 
 
+def raise_http_error(error):
+    """Raise the HTTP error answering a multimedia error.
+
+    :param error: the :class:`~flask_iiif.errors.MultimediaError`
+    """
+    if isinstance(
+        error,
+        (
+            MultimediaImageCropError,
+            MultimediaImageResizeError,
+            MultimediaImageFormatError,
+            MultimediaImageRotateError,
+            MultimediaImageQualityError,
+        ),
+    ):
+        abort(500, message=error.message, code=500)
+    if isinstance(error, MultimediaRenderQueueFull):
+        exception = ServiceUnavailable(retry_after=error.retry_after)
+        exception.data = dict(message=error.message, code=error.code)
+        raise exception
+    if isinstance(error, IIIFValidatorError):
+        abort(400, message=error.message, code=400)
+    abort(error.code, message=error.message, code=error.code)
+
+
 def error_handler(f):
     """Error handler."""
 
@@ -42,18 +70,8 @@ def error_handler(f):
         """Wrap the errors."""
         try:
             return f(*args, **kwargs)
-        except (
-            MultimediaImageCropError,
-            MultimediaImageResizeError,
-            MultimediaImageFormatError,
-            MultimediaImageRotateError,
-            MultimediaImageQualityError,
-        ) as error:
-            abort(500, message=error.message, code=500)
-        except IIIFValidatorError as error:
-            abort(400, message=error.message, code=400)
         except (MultimediaError, MultimediaImageNotFound) as error:
-            abort(error.code, message=error.message, code=error.code)
+            raise_http_error(error)
 
     return inner
 
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Derive the small images from the larger ones already cached.
+
+The viewers ask for the same image at several sizes. Once a large rendering
+of a region is cached, the smaller ones are downscaled from it instead of
+decoding the source image again:
+
+.. code-block:: python
+
+    IIIF_DERIVE_FROM_CACHE = True
+    IIIF_DERIVE_MIN_SCALE = 2.0
+
+The cached renderings of each image are listed with their resolved geometry
+in an index stored in the image cache, see :class:`DerivativeIndex`, and
+updated holding its lease in the cache. A
+request is rendered from the smallest cached rendering of the same region,
+in the default quality and without rotation, which is at least
+:py:attr:`~flask_iiif.config.IIIF_DERIVE_MIN_SCALE` times larger, so that
+its compression artifacts vanish once downscaled.
+"""
+
+from __future__ import absolute_import
+
+import json
+import re
+
+#: A region resolved to pixels
+_REGION = re.compile(r"^\d+,\d+,[1-9]\d*,[1-9]\d*$")
+#: A size resolved to pixels
+_SIZE = re.compile(r"^[1-9]\d*,[1-9]\d*$")
+
+
+def resolved(parameters):
+    """Return if the region and the size of a request are resolved.
+
+    They are left as requested when the request is invalid, see
+    :func:`~flask_iiif.api.IIIFImageAPIWrapper.canonical_parameters`, it is
+    then rendered from the source so that it is rejected.
+
+    :param dict parameters: the normalized parameters of the request
+    """
+    return bool(
+        _REGION.match(parameters["region"] or "")
+        and _SIZE.match(parameters["size"] or "")
+    )
+
+
+class DerivativeIndex(object):
+    """Index of the cached renderings of each image."""
+
+    def __init__(self, cache, max_entries=256):
+        """Initialize the index.
+
+        :param cache: the :class:`~flask_iiif.cache.cache.ImageCache` storing
+            the index
+        :param int max_entries: the renderings kept by image, the oldest
+            ones are forgotten first
+        """
+        self.cache = cache
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(uuid):
+        """Return the cache key of the index of an image.
+
+        :param uuid: the image uuid
+        """
+        return "iiif:derivatives:{0}".format(uuid)
+
+    def get(self, uuid):
+        """Return the cached renderings of an image.
+
+        :param uuid: the image uuid
+        :returns: the normalized parameters of the renderings by cache key
+        """
+        value = self.cache.get(self.key(uuid))
+        return json.loads(value) if value else {}
+
+    def add(self, uuid, key, parameters):
+        """Add a cached rendering to the index.
+
+        :param uuid: the image uuid
+        :param key: the cache key of the rendering
+        :param dict parameters: its normalized parameters, see
+            :func:`~flask_iiif.api.IIIFImageAPIWrapper.canonical_parameters`
+        """
+        if self.get(uuid).get(key) == parameters:
+            return
+        with self.cache.hold_lock(self.key(uuid)):
+            derivatives = self.get(uuid)
+            derivatives.pop(key, None)
+            derivatives[key] = parameters
+            while len(derivatives) > self.max_entries:
+                derivatives.pop(next(iter(derivatives)))
+            self.cache.set(self.key(uuid), json.dumps(derivatives))
+
+    def discard(self, uuid, key):
+        """Remove a rendering which is not cached anymore.
+
+        :param uuid: the image uuid
+        :param key: the cache key of the rendering
+        """
+        if key not in self.get(uuid):
+            return
+        with self.cache.hold_lock(self.key(uuid)):
+            derivatives = self.get(uuid)
+            if derivatives.pop(key, None) is not None:
+                self.cache.set(self.key(uuid), json.dumps(derivatives))
+
+    def find(self, uuid, parameters, min_scale=2.0, formats=None):
+        """Return the smallest rendering a request can be derived from.
+
+        :param uuid: the image uuid
+        :param dict parameters: the normalized parameters of the request,
+            with its region and its size resolved, see :func:`resolved`
+        :param float min_scale: the rendering must be this many times larger
+            than the requested image
+        :param formats: the image formats which can be derived from, all if
+            not set
+        :returns: the cache key of the rendering or ``None``
+        """
+        width, height = map(int, parameters["size"].split(","))
+        found = None
+        for key, derivative in self.get(uuid).items():
+            if (
+                derivative["region"] != parameters["region"]
+                or derivative["rotation"] != "0"
+                or derivative["quality"] != "default"
+            ):
+                continue
+            if formats is not None and derivative["image_format"] not in formats:
+                continue
+            derived_width, derived_height = map(int, derivative["size"].split(","))
+            if derived_width < width * min_scale or derived_height < height * min_scale:
+                continue
+            area = derived_width * derived_height
+            if found is None or area < found[0]:
+                found = area, key
+        return found and found[1]
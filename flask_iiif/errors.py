@@ -10,6 +10,13 @@
 """Multimedia error."""
 
 
+def _restore_error(cls, state):
+    """Recreate a pickled error."""
+    error = cls.__new__(cls)
+    error.__dict__.update(state)
+    return error
+
+
 class MultimediaError(Exception):
     """General multimedia exception."""
 
@@ -19,6 +26,10 @@ class MultimediaError(Exception):
         self.message = message or self.__class__.__name__
         self.code = code or 500
 
+    def __reduce__(self):
+        """Keep the message and the code of the errors sent by processes."""
+        return _restore_error, (self.__class__, self.__dict__)
+
     def __str__(self):
         """Error message."""
         return repr(
@@ -58,3 +69,20 @@ class MultimediaImageFormatError(MultimediaError):
 
 class IIIFValidatorError(MultimediaError):
     """IIIF API validator error."""
+
+
+class MultimediaRenderQueueFull(MultimediaError):
+    """Too many images are being rendered."""
+
+    def __init__(self, message=None, retry_after=None):
+        """Init with status code 503."""
+        super(MultimediaRenderQueueFull, self).__init__(message, code=503)
+        self.retry_after = retry_after
+
+
+class MultimediaImageTooLarge(MultimediaError):
+    """Image over the configured size limits."""
+
+    def __init__(self, message=None):
+        """Init with status code 400."""
+        super(MultimediaImageTooLarge, self).__init__(message, code=400)
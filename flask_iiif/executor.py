@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Render the images on a bounded pool of threads.
+
+Pillow releases the GIL while decoding, resampling and encoding, so the
+rendering scales on a pool of threads, separate from the threads serving the
+requests. The number of images waiting for a thread is limited: once the
+queue is full, the requests are rejected with ``503 Service Unavailable`` and
+a ``Retry-After`` header instead of waiting longer and longer.
+
+The queue depth and the waiting times are available with
+:func:`RenderExecutor.stats`.
+"""
+
+from __future__ import absolute_import
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import copy_current_request_context, current_app, has_request_context
+
+from .errors import MultimediaRenderQueueFull
+
+
+class RenderExecutor(object):
+    """Bounded thread pool rendering the images."""
+
+    def __init__(self, max_workers, max_queue=0, retry_after=None):
+        """Initialize the pool.
+
+        :param int max_workers: The number of rendering threads
+        :param int max_queue: The number of images waiting for a thread
+        :param int retry_after: The seconds sent in the ``Retry-After``
+            header of the rejected requests
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="iiif-render"
+        )
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a function, run within the current application context.
+
+        The function runs within a copy of the request context, if any.
+
+        :returns: The :class:`concurrent.futures.Future` of the function
+        :raises MultimediaRenderQueueFull: if the queue is full
+        """
+        with self.lock:
+            if self.queued + self.running >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise MultimediaRenderQueueFull(
+                    "Too many images are being rendered", retry_after=self.retry_after
+                )
+            self.queued += 1
+
+        app = current_app._get_current_object()
+        queued_at = time.time()
+        if has_request_context():
+            # The image openers may rely on the request
+            func = copy_current_request_context(func)
+
+        def task():
+            waited = time.time() - queued_at
+            with self.lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_time += waited
+                self.max_wait_time = max(self.max_wait_time, waited)
+            try:
+                with app.app_context():
+                    return func(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        return self.pool.submit(task)
+
+    def run(self, func, *args, **kwargs):
+        """Run a function on the pool and wait for its result.
+
+        :raises MultimediaRenderQueueFull: if the queue is full
+        """
+        return self.submit(func, *args, **kwargs).result()
+
+    @property
+    def queue_depth(self):
+        """Return the number of images waiting for a thread."""
+        return self.queued
+
+    def stats(self):
+        """Return the measures of the pool.
+
+        :returns: A dictionary with the ``queued``, ``running``,
+            ``completed`` and ``rejected`` renderings, the total
+            ``wait_time`` and the ``max_wait_time`` in seconds
+        """
+        with self.lock:
+            return dict(
+                queued=self.queued,
+                running=self.running,
+                completed=self.completed,
+                rejected=self.rejected,
+                wait_time=self.wait_time,
+                max_wait_time=self.max_wait_time,
+            )
+
+    def shutdown(self, wait=True):
+        """Stop the threads once the queued images are rendered."""
+        self.pool.shutdown(wait=wait)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Abstract image metadata index definition.
+
+The index keeps, for each image ``uuid``, what is known about the source
+without decoding it: ``width``, ``height``, ``mode``, ``format``, ``tiles``
+(the tile size or ``None``), ``levels`` (the sizes of the resolution levels)
+and ``icc`` (if the image embeds an ICC profile), as returned by
+:func:`~flask_iiif.api.IIIFImageAPIWrapper.metadata`.
+
+The index is filled on the first time an image is opened, or at ingest:
+
+.. code-block:: python
+
+    from flask_iiif.api import IIIFImageAPIWrapper
+
+    image = IIIFImageAPIWrapper.open_image(source)
+    current_iiif.metadata.set(uuid, image.metadata())
+    image.close_image()
+
+All index adaptors must at least implement
+:func:`~flask_iiif.metadata.metadata.ImageMetadataIndex.get` and
+:func:`~flask_iiif.metadata.metadata.ImageMetadataIndex.set` methods.
+"""
+
+
+class ImageMetadataIndex(object):
+    """Abstract metadata index layer."""
+
+    def __init__(self, app=None):
+        """Initialize the index."""
+
+    def get(self, uuid):
+        """Return the metadata of the image.
+
+        :param uuid: the image uuid
+        :return: the metadata ``dict`` or ``None`` if the image is unknown
+        """
+
+    def set(self, uuid, metadata):
+        """Store the metadata of the image.
+
+        :param uuid: the image uuid
+        :param dict metadata: the image metadata
+        """
+
+    def delete(self, uuid):
+        """Delete the metadata of the image."""
+
+    def flush(self):
+        """Flush the index."""
+
+    def __call__(self, app=None):
+        """Backwards-compatibility method returning ``self``."""
+        return self
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Implements a Redis metadata index."""
+
+from __future__ import absolute_import
+
+import json
+
+from flask import current_app
+from redis import StrictRedis
+
+from .metadata import ImageMetadataIndex
+
+
+class ImageRedisMetadataIndex(ImageMetadataIndex):
+    """Redis image metadata index.
+
+    The metadata are stored as JSON without expiration, under
+    :py:data:`~flask_iiif.config.IIIF_METADATA_REDIS_PREFIX`.
+    """
+
+    def __init__(self, app=None):
+        """Initialize the index."""
+        super(ImageRedisMetadataIndex, self).__init__(app=app)
+        app = app or current_app
+        redis_url = app.config["IIIF_METADATA_REDIS_URL"]
+        self.prefix = app.config["IIIF_METADATA_REDIS_PREFIX"]
+        self.client = StrictRedis.from_url(redis_url)
+
+    def get(self, uuid):
+        """Return the metadata of the image.
+
+        :param uuid: the image uuid
+        :return: the metadata ``dict`` or ``None`` if the image is unknown
+        """
+        metadata = self.client.get(self.prefix + uuid)
+        return json.loads(metadata) if metadata is not None else None
+
+    def set(self, uuid, metadata):
+        """Store the metadata of the image.
+
+        :param uuid: the image uuid
+        :param dict metadata: the image metadata
+        """
+        self.client.set(self.prefix + uuid, json.dumps(metadata))
+
+    def delete(self, uuid):
+        """Delete the metadata of the image."""
+        self.client.delete(self.prefix + uuid)
+
+    def flush(self):
+        """Flush the index."""
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Implement an in-memory metadata index."""
+
+from __future__ import absolute_import
+
+from .metadata import ImageMetadataIndex
+
+
+class ImageSimpleMetadataIndex(ImageMetadataIndex):
+    """In-memory image metadata index.
+
+    .. note::
+
+        The index lives in the process memory, so it is neither shared
+        between the workers nor kept across restarts.
+    """
+
+    def __init__(self, app=None):
+        """Initialize the index."""
+        super(ImageSimpleMetadataIndex, self).__init__(app=app)
+        self.index = {}
+
+    def get(self, uuid):
+        """Return the metadata of the image.
+
+        :param uuid: the image uuid
+        :return: the metadata ``dict`` or ``None`` if the image is unknown
+        """
+        metadata = self.index.get(uuid)
+        return dict(metadata) if metadata is not None else None
+
+    def set(self, uuid, metadata):
+        """Store the metadata of the image.
+
+        :param uuid: the image uuid
+        :param dict metadata: the image metadata
+        """
+        self.index[uuid] = dict(metadata)
+
+    def delete(self, uuid):
+        """Delete the metadata of the image."""
+        self.index.pop(uuid, None)
+
+    def flush(self):
+        """Flush the index."""
+        self.index.clear()
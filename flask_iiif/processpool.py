@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Render the images on a pool of processes.
+
+Some operations, such as rotations by arbitrary angles, mode conversions or
+the PNG encoding, hold the GIL and don't scale on threads. The processes
+receive a render specification with the IIIF parameters, read the source
+file from its path or from a shared memory block, and return the encoded
+image in another shared memory block, so that the images are never pickled
+nor copied.
+
+The processes don't have the Flask application: they run with a copy of its
+``IIIF_*`` configuration. The pixels decoded by the processes are reserved
+from the :class:`~flask_iiif.budget.PixelBudget` of the application, if any,
+while they render. If a process dies, for instance killed once out of memory,
+its rendering fails and the pool is replaced by a new one.
+"""
+
+from __future__ import absolute_import
+
+import io
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from uuid import uuid4
+
+from flask import Flask, current_app
+
+#: Application of the rendering process
+_worker_app = None
+
+
+class SharedMemoryFile(io.RawIOBase):
+    """Read a shared memory block as a file, without copying it."""
+
+    def __init__(self, block, size, unlink=False):
+        """Initialize the file.
+
+        :param block: The :class:`~multiprocessing.shared_memory.SharedMemory`
+            block, closed with the file
+        :param int size: The size of the data in the block
+        :param bool unlink: Destroy the block once the file is closed
+        """
+        super(SharedMemoryFile, self).__init__()
+        self.block = block
+        self.view = block.buf[:size]
+        self.position = 0
+        self.unlink = unlink
+
+    def readable(self):
+        """Return ``True``, the file is readable."""
+        return True
+
+    def seekable(self):
+        """Return ``True``, the file is seekable."""
+        return True
+
+    def readinto(self, buffer):
+        """Read the data at the current position into a buffer."""
+        with self.view[self.position : self.position + len(buffer)] as data:
+            read = len(data)
+            buffer[:read] = data
+        self.position += read
+        return read
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Move the current position."""
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = max(0, offset)
+        return self.position
+
+    def tell(self):
+        """Return the current position."""
+        return self.position
+
+    def close(self):
+        """Close the block, and destroy it if needed."""
+        if not self.closed:
+            self.view.release()
+            self.block.close()
+            if self.unlink:
+                self.block.unlink()
+        super(SharedMemoryFile, self).close()
+
+
+def _copy_to_shared_memory(stream, name=None):
+    """Copy a file into a new shared memory block.
+
+    :param stream: The file object, read from its start
+    :param name: The name of the block, a random one if not set
+    :returns: The block and the size of the data
+    """
+    from multiprocessing import shared_memory
+
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(0)
+    block = shared_memory.SharedMemory(name=name, create=True, size=max(1, size))
+    position = 0
+    for chunk in iter(lambda: stream.read(1 << 20), b""):
+        block.buf[position : position + len(chunk)] = chunk
+        position += len(chunk)
+    return block, size
+
+
+def _init_worker(config):
+    """Create the application of a rendering process.
+
+    :param dict config: The ``IIIF_*`` configuration
+    """
+    global _worker_app
+    _worker_app = Flask(__name__)
+    _worker_app.config.update(config)
+
+
+def _render(spec):
+    """Render an image in a rendering process.
+
+    :param dict spec: The render specification
+    :returns: The size of the image in the shared memory block named by
+        the specification
+    """
+    from multiprocessing import shared_memory
+
+    from .api import IIIFImageAPIWrapper
+
+    with _worker_app.app_context():
+        source = spec["path"]
+        if not source:
+            source = SharedMemoryFile(
+                shared_memory.SharedMemory(name=spec["source"]), spec["size"]
+            )
+        try:
+            image = IIIFImageAPIWrapper.open_image(
+                source, lazy=_worker_app.config.get("IIIF_LAZY_RENDERING", False)
+            )
+            try:
+                image.apply_api(**spec["parameters"])
+                # A temporary file with IIIF_SPOOL_MAX_SIZE
+                output = image.serve(image_format=spec["image_format"])
+            finally:
+                image.close_image()
+        finally:
+            if not spec["path"]:
+                source.close()
+
+    try:
+        block, size = _copy_to_shared_memory(output, spec["output"])
+    finally:
+        output.close()
+    block.close()
+    return size
+
+
+def _unlink_shared_memory(name):
+    """Destroy a shared memory block, if it exists.
+
+    :param name: The name of the block
+    """
+    from multiprocessing import shared_memory
+
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+class ProcessRenderExecutor(object):
+    """Pool of processes rendering the images."""
+
+    def __init__(self, max_workers, config=None):
+        """Initialize the pool.
+
+        :param int max_workers: The number of rendering processes
+        :param dict config: The application configuration
+        """
+        config = config if config is not None else current_app.config
+        self.max_workers = max_workers
+        self.config = self.worker_config(config)
+        self.lock = threading.Lock()
+        self.pool = self.create_pool()
+
+    def create_pool(self):
+        """Start the rendering processes."""
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.config,),
+        )
+
+    def replace_pool(self, pool):
+        """Replace a pool broken by the death of one of its processes.
+
+        :param pool: The broken pool, the pool is kept if it was already
+            replaced
+        """
+        with self.lock:
+            if self.pool is pool:
+                self.pool = self.create_pool()
+        pool.shutdown(wait=False)
+
+    @staticmethod
+    def worker_config(config):
+        """Return the configuration sent to the rendering processes.
+
+        The handlers which can not be pickled, such as the cache, are left
+        out.
+        """
+        worker_config = {}
+        for key, value in config.items():
+            if not key.startswith("IIIF_"):
+                continue
+            try:
+                pickle.dumps(value)
+            except Exception:
+                continue
+            worker_config[key] = value
+        return worker_config
+
+    def render(self, image, image_format, **parameters):
+        """Render an opened image on a rendering process.
+
+        :param image: The opened :class:`~flask_iiif.api.IIIFImageAPIWrapper`
+        :param image_format: The requested image format
+        :param parameters: The parameters of
+            :func:`~flask_iiif.api.IIIFImageAPIWrapper.apply_api`
+        :returns: The encoded image as a :class:`SharedMemoryFile`, which
+            destroys its block once closed
+        :raises BrokenProcessPool: if a rendering process died, the pool is
+            replaced for the next images
+        """
+        from multiprocessing import shared_memory
+
+        spec = dict(
+            path=getattr(image.image, "filename", None),
+            source=None,
+            size=0,
+            image_format=image_format,
+            parameters=parameters,
+            # Named by the parent, so that it is destroyed on errors
+            output="iiif_{0}".format(uuid4().hex[:16]),
+        )
+        # The decoded size is only known by the process, the whole source
+        # is reserved; the pixels are released once the image is closed
+        image.reserve_budget(*image.size())
+
+        block = None
+        if not spec["path"]:
+            block, size = _copy_to_shared_memory(image.image.fp)
+            spec.update(source=block.name, size=size)
+
+        pool = self.pool
+        try:
+            size = pool.submit(_render, spec).result()
+        except BaseException as error:
+            _unlink_shared_memory(spec["output"])
+            if isinstance(error, BrokenProcessPool):
+                self.replace_pool(pool)
+            raise
+        finally:
+            if block is not None:
+                block.close()
+                block.unlink()
+
+        return SharedMemoryFile(
+            shared_memory.SharedMemory(name=spec["output"]), size, unlink=True
+        )
+
+    def shutdown(self, wait=True):
+        """Stop the processes once the queued images are rendered."""
+        with self.lock:
+            pool = self.pool
+        pool.shutdown(wait=wait)
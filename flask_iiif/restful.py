@@ -9,7 +9,10 @@
 # more details.
 
 """Multimedia IIIF Image API."""
+
 import datetime
+import hashlib
+from contextlib import nullcontext
 from email.utils import parsedate
 from io import BytesIO
 
@@ -19,8 +22,9 @@ from flask_restful.utils import cors
 from werkzeug.local import LocalProxy
 from werkzeug.utils import secure_filename
 
-from .api import IIIFImageAPIWrapper
+from .api import IIIFImageAPIWrapper, SourceFile
 from .decorators import api_decorator, error_handler
+from .derivatives import resolved
 from .signals import (
     iiif_after_info_request,
     iiif_after_process_request,
@@ -32,6 +36,480 @@ from .utils import should_cache
 current_iiif = LocalProxy(lambda: current_app.extensions["iiif"])
 
 
+def index_metadata(uuid, image):
+    """Store the metadata of an opened image in the index, if any.
+
+    The images whose size is already known by the process are skipped, their
+    metadata have been read from the index or stored when it was learnt.
+
+    :param uuid: the image uuid
+    :param image: the opened :class:`~flask_iiif.api.IIIFImageAPIWrapper`
+    """
+    if current_iiif.metadata is None or current_iiif.source_sizes.get(uuid):
+        return
+    if current_iiif.metadata.get(uuid):
+        return
+    current_iiif.metadata.set(uuid, image.metadata())
+
+
+def info_cache_key(version, uuid):
+    """Return the cache key of the size of an image."""
+    return "iiif:info:{0}/{1}".format(version, uuid)
+
+
+def remember_size(uuid, width, height):
+    """Keep the size of a source image in the process.
+
+    The size expires after
+    :py:attr:`~flask_iiif.config.IIIF_SOURCE_SIZES_CACHE_TIME`, the source
+    could have changed in another process.
+
+    :param uuid: the image uuid
+    """
+    current_iiif.source_sizes.set(
+        uuid,
+        "{0},{1}".format(width, height),
+        timeout=current_app.config["IIIF_SOURCE_SIZES_CACHE_TIME"],
+    )
+
+
+def source_size(uuid):
+    """Return the size of a source image without opening it, if known.
+
+    The size is read from the process, then from the metadata index.
+
+    :param uuid: the image uuid
+    :returns: the ``(width, height)`` of the image or ``None``
+    """
+    cached = current_iiif.source_sizes.get(uuid)
+    if cached:
+        return tuple(map(int, cached.split(",")))
+    return indexed_size(uuid)
+
+
+def image_parameters(
+    uuid, region, size, quality, rotation, image_format, version="v2", **kwargs
+):
+    """Return the normalized parameters of a request.
+
+    The region and the size are resolved once the size of the source is
+    known, see
+    :func:`~flask_iiif.api.IIIFImageAPIWrapper.canonical_parameters`.
+    """
+    width, height = source_size(uuid) or (None, None)
+    return IIIFImageAPIWrapper.canonical_parameters(
+        width,
+        height,
+        version=version,
+        region=region,
+        size=size,
+        rotation=rotation,
+        quality=quality,
+        image_format=image_format,
+    )
+
+
+def image_cache_key(uuid, **kwargs):
+    """Return the cache key of a rendered image.
+
+    The key is built from the normalized parameters, see
+    :func:`image_parameters`, so that the equivalent requests share their
+    cached image.
+    """
+    return "iiif:{uuid}/{region}/{size}/{quality}/{rotation}.{image_format}".format(
+        uuid=uuid, **image_parameters(uuid, **kwargs)
+    )
+
+
+def index_derivative(key, uuid, **api_parameters):
+    """Add a cached rendering to the index of its image, if any.
+
+    :param key: the resolved cache key of the rendering
+    :param uuid: the image uuid
+    """
+    if current_iiif.derivatives is None or source_size(uuid) is None:
+        return
+    try:
+        current_iiif.derivatives.add(
+            uuid, key, image_parameters(uuid, **api_parameters)
+        )
+    except Exception:
+        if not current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
+            raise
+
+
+def derive_image(version, uuid, region, size, rotation, quality, image_format):
+    """Render the requested image from a larger cached rendering, if any.
+
+    .. seealso::
+
+        :py:mod:`~flask_iiif.derivatives`
+
+    :returns: the encoded image as a `BytesIO` object, or ``None`` if no
+        cached rendering can be derived from
+    """
+    if current_iiif.derivatives is None or source_size(uuid) is None:
+        return None
+    parameters = image_parameters(
+        uuid,
+        version=version,
+        region=region,
+        size=size,
+        rotation=rotation,
+        quality=quality,
+        image_format=image_format,
+    )
+    if not resolved(parameters):
+        return None
+    try:
+        key = current_iiif.derivatives.find(
+            uuid,
+            parameters,
+            min_scale=current_app.config.get("IIIF_DERIVE_MIN_SCALE", 2.0),
+            formats=current_app.config.get("IIIF_DERIVE_FORMATS"),
+        )
+        data = key and current_iiif.cache.get(key)
+        if key and not data:
+            current_iiif.derivatives.discard(uuid, key)
+    except Exception:
+        if not current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
+            raise
+        data = None
+    if not data:
+        return None
+
+    cases = current_app.config["IIIF_VALIDATIONS"].get(version)
+    image = IIIFImageAPIWrapper.open_image(BytesIO(data))
+    try:
+        image.apply_api(
+            version=version,
+            region=cases["region"]["ignore"],
+            size=parameters["size"],
+            rotation=rotation,
+            quality=quality,
+        )
+        return image.serve(image_format=image_format)
+    finally:
+        image.close_image()
+
+
+def schedule(image, **api_parameters):
+    """Return the rendering slot of an opened image.
+
+    :param image: the opened :class:`~flask_iiif.api.IIIFImageAPIWrapper`
+    :returns: a context manager holding the slot, if the scheduler is enabled
+
+    .. seealso:: :py:mod:`~flask_iiif.scheduler`
+    """
+    if current_iiif.scheduler is None:
+        return nullcontext()
+    return current_iiif.scheduler.slot(
+        api_parameters["uuid"], image.estimate_cost(**api_parameters)
+    )
+
+
+def render_cost(**api_parameters):
+    """Return the cost of a rendering before opening its source, if known.
+
+    :returns: the estimated cost, or ``None`` if the scheduler is disabled
+        or the size of the source is not known by the process
+
+    .. seealso:: :func:`~flask_iiif.api.IIIFImageAPIWrapper.get_cost`
+    """
+    if current_iiif.scheduler is None:
+        return None
+    size = source_size(api_parameters["uuid"])
+    if size is None:
+        return None
+    return IIIFImageAPIWrapper.get_cost(*size, **api_parameters)
+
+
+def render_image(
+    version,
+    uuid,
+    region,
+    size,
+    rotation,
+    quality,
+    image_format,
+    data=None,
+    scheduled=False,
+):
+    """Open and render the requested image.
+
+    :param data: the image path or bytestream, given by the image opener if
+        not set
+    :param scheduled: the rendering slot is already held, see
+        :func:`run_render`
+    :returns: the encoded image as a `BytesIO` or a temporary file, or the
+        source file, see :class:`~flask_iiif.api.SourceFile`
+    """
+    to_serve = derive_image(
+        version, uuid, region, size, rotation, quality, image_format
+    )
+    if to_serve is not None:
+        return to_serve
+
+    if data is None:
+        data = current_iiif.uuid_to_image_opener(uuid)
+    image = IIIFImageAPIWrapper.open_image(
+        data, lazy=current_app.config.get("IIIF_LAZY_RENDERING", False)
+    )
+    index_metadata(uuid, image)
+    remember_size(uuid, *image.size())
+
+    try:
+        if current_app.config.get("IIIF_PASSTHROUGH", False) and image.is_identity(
+            version=version,
+            region=region,
+            size=size,
+            rotation=rotation,
+            quality=quality,
+            image_format=image_format,
+        ):
+            # The source file is already what has been requested
+            to_serve = image.serve_source()
+        else:
+            slot = nullcontext()
+            if not scheduled:
+                slot = schedule(
+                    image,
+                    uuid=uuid,
+                    version=version,
+                    region=region,
+                    size=size,
+                    rotation=rotation,
+                    quality=quality,
+                    image_format=image_format,
+                )
+            with slot:
+                if current_iiif.render_processes is not None:
+                    to_serve = current_iiif.render_processes.render(
+                        image,
+                        image_format,
+                        uuid=uuid,
+                        version=version,
+                        region=region,
+                        size=size,
+                        rotation=rotation,
+                        quality=quality,
+                    )
+                else:
+                    image.apply_api(
+                        uuid=uuid,
+                        version=version,
+                        region=region,
+                        size=size,
+                        rotation=rotation,
+                        quality=quality,
+                    )
+
+                    # prepare image to be serve
+                    to_serve = image.serve(image_format=image_format)
+    finally:
+        image.close_image()
+    return to_serve
+
+
+def run_render(**api_parameters):
+    """Render the requested image on the rendering threads, if any.
+
+    The rendering slot of the scheduler is taken before a thread when the
+    cost is known, see :func:`render_cost`.
+
+    :raises MultimediaRenderQueueFull: if too many images are waiting
+    :returns: the encoded image as a `BytesIO` object
+    """
+    executor = current_iiif.render_executor
+    if executor is None:
+        return render_image(**api_parameters)
+    cost = render_cost(**api_parameters)
+    if cost is None:
+        return executor.run(render_image, **api_parameters)
+    with current_iiif.scheduler.slot(api_parameters["uuid"], cost):
+        return executor.run(render_image, scheduled=True, **api_parameters)
+
+
+def cache_image(key, to_serve, content_type=None):
+    """Store a rendered image in the cache.
+
+    The images in memory are stored with their content type and their
+    entity tag, see :func:`~flask_iiif.cache.cache.ImageCache.set_entry`.
+
+    :param key: the image key
+    :param to_serve: the encoded image as a `BytesIO` or a temporary file
+    :param content_type: the content type of the image
+    :returns: the encoded image
+    """
+    try:
+        if isinstance(to_serve, BytesIO):
+            value = to_serve.getvalue()
+            current_iiif.cache.set_entry(
+                key,
+                value,
+                content_type=content_type,
+                etag=hashlib.sha1(value).hexdigest(),
+            )
+        else:
+            current_iiif.cache.set_stream(key, to_serve)
+    except Exception:
+        if not current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
+            raise
+    to_serve.seek(0)
+    return to_serve
+
+
+def index_keys(uuid, *keys):
+    """Add cached keys to the index of their image.
+
+    .. seealso::
+
+        :func:`~flask_iiif.cache.cache.ImageCache.index`
+
+    :param uuid: the image uuid
+    """
+    try:
+        current_iiif.cache.index(uuid, *keys)
+    except Exception:
+        if not current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
+            raise
+
+
+def cache_rendered(key, to_serve, content_type=None, **api_parameters):
+    """Store a rendered image under its cache key, once resolved too.
+
+    The key of the first request on an image is built before the size of
+    the source is known, so the image is also stored under the key resolved
+    with the size read while rendering it. The keys are added to the index
+    of the image, see :func:`index_keys`.
+
+    The source files streamed as they are for identity requests are not
+    cached, see :class:`~flask_iiif.api.SourceFile`.
+
+    :param key: the image key the request has looked up
+    :param to_serve: the encoded image as a `BytesIO` or a temporary file
+    :param content_type: the content type of the image
+    :returns: the encoded image
+    """
+    if isinstance(to_serve, SourceFile):
+        return to_serve
+    cache_image(key, to_serve, content_type)
+    resolved = image_cache_key(**api_parameters)
+    if resolved != key:
+        cache_image(resolved, to_serve, content_type)
+    index_derivative(resolved, **api_parameters)
+    index_keys(api_parameters["uuid"], key, resolved)
+    return to_serve
+
+
+def indexed_size(uuid):
+    """Return the size of an image from the metadata index, if any.
+
+    :param uuid: the image uuid
+    :returns: the ``(width, height)`` of the image or ``None``
+    """
+    metadata = current_iiif.metadata and current_iiif.metadata.get(uuid)
+    if metadata:
+        remember_size(uuid, metadata["width"], metadata["height"])
+        return metadata["width"], metadata["height"]
+    return None
+
+
+def image_size(uuid, data=None):
+    """Open an image to read its size.
+
+    :param uuid: the image uuid
+    :param data: the image path or bytestream, given by the image opener if
+        not set
+    :returns: the ``(width, height)`` of the image
+    """
+    if data is None:
+        data = current_iiif.uuid_to_image_opener(uuid)
+    image = IIIFImageAPIWrapper.open_image(data)
+    width, height = image.size()
+    index_metadata(uuid, image)
+    remember_size(uuid, width, height)
+    image.close_image()
+    return width, height
+
+
+def info_response(sender, version, width, height, base_uri):
+    """Return the information document of an image.
+
+    :param sender: the sender of the signals
+    :param base_uri: the URI of the image
+    """
+    data = current_app.config["IIIF_API_INFO_RESPONSE_SKELETON"][version]
+
+    data["@id"] = base_uri
+    data["width"] = width
+    data["height"] = height
+
+    # Trigger event after proccess the api request
+    iiif_after_info_request.send(sender, **data)
+
+    resp = jsonify(data)
+    if "application/ld+json" in request.headers.get("Accept", ""):
+        resp.mimetype = "application/ld+json"
+    return resp
+
+
+def image_response(sender, to_serve, last_modified, etag=None, **api_parameters):
+    """Return the response serving a rendered image.
+
+    :param sender: the sender of the signals
+    :param to_serve: the encoded image as a `BytesIO`, a temporary file or
+        a cached file, streamed by chunks and closed with the response
+    :param last_modified: the modification date of the cached image
+    :param etag: the entity tag of the cached image
+    """
+    uuid = api_parameters["uuid"]
+    region = api_parameters["region"]
+    size = api_parameters["size"]
+    quality = api_parameters["quality"]
+    rotation = api_parameters["rotation"]
+    image_format = api_parameters["image_format"]
+
+    # decide the mime_type from the requested image_format
+    mimetype = current_app.config["IIIF_FORMATS"].get(image_format, "image/jpeg")
+    # Built the after request parameters
+    api_after_request_parameters = dict(mimetype=mimetype, image=to_serve)
+
+    # Trigger event after proccess the api request
+    iiif_after_process_request.send(sender, **api_after_request_parameters)
+    send_file_kwargs = {"mimetype": mimetype}
+    if last_modified is None and isinstance(to_serve, SourceFile):
+        # Not cached, the source file is as old as the image
+        last_modified = to_serve.last_modified
+    # last_modified is not supported before flask 0.12
+    additional_headers = []
+    if last_modified:
+        send_file_kwargs.update(last_modified=last_modified)
+    if etag:
+        send_file_kwargs.update(etag=etag)
+
+    if "dl" in request.args:
+        filename = secure_filename(request.args.get("dl", ""))
+        if filename.lower() in {"", "1", "true"}:
+            filename = "{0}-{1}-{2}-{3}-{4}.{5}".format(
+                uuid, region, size, quality, rotation, image_format
+            )
+        send_file_kwargs.update(
+            as_attachment=True,
+            download_name=secure_filename(filename),
+        )
+    if_modified_since_raw = request.headers.get("If-Modified-Since")
+    if if_modified_since_raw:
+        if_modified_since = datetime.datetime(*parsedate(if_modified_since_raw)[:6])
+        if if_modified_since and if_modified_since >= last_modified:
+            to_serve.close()
+            return Response(status=304)
+    response = send_file(to_serve, **send_file_kwargs)
+    if additional_headers:
+        response.headers.extend(additional_headers)
+    return response
+
+
 class IIIFImageBase(Resource):
     """IIIF Image Base."""
 
@@ -61,7 +539,7 @@ class IIIFImageInfo(Resource):
         iiif_before_info_request.send(self, version=version, uuid=uuid)
 
         # build the image key
-        key = "iiif:info:{0}/{1}".format(version, uuid)
+        key = info_cache_key(version, uuid)
 
         # Check if its cached
         try:
@@ -75,32 +553,19 @@ class IIIFImageInfo(Resource):
         # If the image size is cached loaded from cache
         if cached:
             width, height = map(int, cached.split(","))
+            remember_size(uuid, width, height)
         else:
-            data = current_iiif.uuid_to_image_opener(uuid)
-            image = IIIFImageAPIWrapper.open_image(data)
-            width, height = image.size()
-            image.close_image()
+            width, height = indexed_size(uuid) or image_size(uuid)
             if should_cache(request.args):
                 try:
                     current_iiif.cache.set(key, "{0},{1}".format(width, height))
+                    current_iiif.cache.index(uuid, key)
                 except Exception:
                     if not current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
                         raise
 
-        data = current_app.config["IIIF_API_INFO_RESPONSE_SKELETON"][version]
-
         base_uri = url_for("iiifimagebase", uuid=uuid, version=version, _external=True)
-        data["@id"] = base_uri
-        data["width"] = width
-        data["height"] = height
-
-        # Trigger event after proccess the api request
-        iiif_after_info_request.send(self, **data)
-
-        resp = jsonify(data)
-        if "application/ld+json" in request.headers.get("Accept", ""):
-            resp.mimetype = "application/ld+json"
-        return resp
+        return info_response(self, version, width, height, base_uri)
 
 
 class IIIFImageAPI(Resource):
@@ -146,13 +611,13 @@ class IIIFImageAPI(Resource):
         IIIFImageAPIWrapper.validate_api(**api_parameters)
 
         # build the image key
-        key = "iiif:{0}/{1}/{2}/{3}/{4}.{5}".format(
-            uuid, region, size, quality, rotation, image_format
-        )
+        key = image_cache_key(**api_parameters)
+
+        mimetype = current_app.config["IIIF_FORMATS"].get(image_format, "image/jpeg")
 
         # Check if its cached
         try:
-            cached = current_iiif.cache.get(key)
+            cached = current_iiif.cache.get_entry(key, stream=True)
         except Exception:
             if current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
                 cached = None
@@ -161,30 +626,32 @@ class IIIFImageAPI(Resource):
 
         # If the image is cached loaded from cache
         if cached:
-            to_serve = BytesIO(cached)
-            to_serve.seek(0)
-        # Otherwise create the image
-        else:
-            data = current_iiif.uuid_to_image_opener(uuid)
-            image = IIIFImageAPIWrapper.open_image(data)
-
-            image.apply_api(
-                version=version,
-                region=region,
-                size=size,
-                rotation=rotation,
-                quality=quality,
+            return image_response(
+                self,
+                cached["value"],
+                cached["last_modification"],
+                etag=cached["etag"],
+                **api_parameters
             )
 
-            # prepare image to be serve
-            to_serve = image.serve(image_format=image_format)
-            image.close_image()
+        # Otherwise create the image, only once for all the requests
+        if should_cache(request.args) and current_app.config.get(
+            "IIIF_SINGLE_FLIGHT", False
+        ):
+            to_serve = current_iiif.single_flight(
+                current_iiif.cache,
+                key,
+                lambda: cache_rendered(
+                    key, run_render(**api_parameters), mimetype, **api_parameters
+                ),
+            )
+            if isinstance(to_serve, bytes):
+                # Rendered by another request
+                to_serve = BytesIO(to_serve)
+        else:
+            to_serve = run_render(**api_parameters)
             if should_cache(request.args):
-                try:
-                    current_iiif.cache.set(key, to_serve.getvalue())
-                except Exception:
-                    if not current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
-                        raise
+                cache_rendered(key, to_serve, mimetype, **api_parameters)
 
         try:
             last_modified = current_iiif.cache.get_last_modification(key)
@@ -193,35 +660,4 @@ class IIIFImageAPI(Resource):
                 raise
             last_modified = None
 
-        # decide the mime_type from the requested image_format
-        mimetype = current_app.config["IIIF_FORMATS"].get(image_format, "image/jpeg")
-        # Built the after request parameters
-        api_after_request_parameters = dict(mimetype=mimetype, image=to_serve)
-
-        # Trigger event after proccess the api request
-        iiif_after_process_request.send(self, **api_after_request_parameters)
-        send_file_kwargs = {"mimetype": mimetype}
-        # last_modified is not supported before flask 0.12
-        additional_headers = []
-        if last_modified:
-            send_file_kwargs.update(last_modified=last_modified)
-
-        if "dl" in request.args:
-            filename = secure_filename(request.args.get("dl", ""))
-            if filename.lower() in {"", "1", "true"}:
-                filename = "{0}-{1}-{2}-{3}-{4}.{5}".format(
-                    uuid, region, size, quality, rotation, image_format
-                )
-            send_file_kwargs.update(
-                as_attachment=True,
-                download_name=secure_filename(filename),
-            )
-        if_modified_since_raw = request.headers.get("If-Modified-Since")
-        if if_modified_since_raw:
-            if_modified_since = datetime.datetime(*parsedate(if_modified_since_raw)[:6])
-            if if_modified_since and if_modified_since >= last_modified:
-                return Response(status=304)
-        response = send_file(to_serve, **send_file_kwargs)
-        if additional_headers:
-            response.headers.extend(additional_headers)
-        return response
+        return image_response(self, to_serve, last_modified, **api_parameters)
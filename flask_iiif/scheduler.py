@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Schedule the renderings by their cost.
+
+The cost of each rendering is estimated from its parameters and the size of
+the source, see :func:`~flask_iiif.api.IIIFImageAPIWrapper.estimate_cost`.
+The renderings run in the first lane accepting their cost, each lane having
+its own number of concurrent renderings, so that the cheap tiles don't wait
+behind the full resolution exports:
+
+.. code-block:: python
+
+    IIIF_SCHEDULER_LANES = [
+        dict(name="tiles", max_cost=4 * 1024 * 1024, workers=8),
+        dict(name="exports", max_cost=None, workers=2),
+    ]
+
+The renderings of the same image are also limited, so that one large image
+does not take all the lanes.
+
+With the rendering threads of :py:mod:`~flask_iiif.executor`, the slot is
+taken before a thread once the size of the source is known by the process,
+so that the renderings waiting for their lane don't hold the threads the
+other lanes need.
+"""
+
+from __future__ import absolute_import
+
+import threading
+from contextlib import contextmanager
+
+from .errors import MultimediaRenderQueueFull
+
+
+class RenderLane(object):
+    """Lane of renderings under a cost."""
+
+    def __init__(self, name, max_cost=None, workers=1):
+        """Initialize the lane.
+
+        :param str name: The name of the lane
+        :param max_cost: The highest cost of the lane, ``None`` for any
+        :param int workers: The number of concurrent renderings
+        """
+        self.name = name
+        self.max_cost = max_cost
+        self.workers = workers
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def accepts(self, cost):
+        """Return if the lane runs the renderings of a cost."""
+        return self.max_cost is None or cost <= self.max_cost
+
+
+class RenderScheduler(object):
+    """Run the renderings in lanes chosen by their cost."""
+
+    def __init__(self, lanes, uuid_limit=None, timeout=None, retry_after=None):
+        """Initialize the scheduler.
+
+        :param list lanes: The ``name``, ``max_cost`` and ``workers`` of each
+            lane, by increasing cost
+        :param int uuid_limit: The concurrent renderings of the same image
+        :param timeout: The seconds a rendering waits for its lane
+        :param int retry_after: The seconds sent in the ``Retry-After``
+            header of the rejected requests
+        """
+        self.lanes = [RenderLane(**lane) for lane in lanes]
+        self.uuid_limit = uuid_limit
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.uuids = {}
+        self.condition = threading.Condition()
+
+    def lane(self, cost):
+        """Return the lane of a cost, the last one if none accepts it."""
+        for lane in self.lanes:
+            if lane.accepts(cost):
+                return lane
+        return self.lanes[-1]
+
+    def _available(self, lane, uuid):
+        """Return if a rendering of the image can start in the lane."""
+        if lane.running >= lane.workers:
+            return False
+        return not self.uuid_limit or self.uuids.get(uuid, 0) < self.uuid_limit
+
+    def acquire(self, uuid, cost):
+        """Take a rendering slot, waiting for it if needed.
+
+        :param uuid: The image uuid
+        :param int cost: The estimated cost of the rendering
+        :returns: The lane of the slot, to be released
+        :raises MultimediaRenderQueueFull: if the timeout elapses
+        """
+        lane = self.lane(cost)
+        with self.condition:
+            lane.waiting += 1
+            try:
+                available = self.condition.wait_for(
+                    lambda: self._available(lane, uuid), timeout=self.timeout
+                )
+            finally:
+                lane.waiting -= 1
+            if not available:
+                lane.rejected += 1
+                raise MultimediaRenderQueueFull(
+                    "Too many images are being rendered", retry_after=self.retry_after
+                )
+            lane.running += 1
+            self.uuids[uuid] = self.uuids.get(uuid, 0) + 1
+        return lane
+
+    def release(self, uuid, lane):
+        """Give back a rendering slot.
+
+        :param uuid: The image uuid
+        :param lane: The lane returned by :func:`acquire`
+        """
+        with self.condition:
+            lane.running -= 1
+            lane.completed += 1
+            self.uuids[uuid] -= 1
+            if not self.uuids[uuid]:
+                del self.uuids[uuid]
+            self.condition.notify_all()
+
+    @contextmanager
+    def slot(self, uuid, cost):
+        """Hold a rendering slot, waiting for it if needed.
+
+        :param uuid: The image uuid
+        :param int cost: The estimated cost of the rendering
+        :raises MultimediaRenderQueueFull: if the timeout elapses
+        """
+        lane = self.acquire(uuid, cost)
+        try:
+            yield lane
+        finally:
+            self.release(uuid, lane)
+
+    def stats(self):
+        """Return the measures of each lane.
+
+        :returns: A dictionary of the ``running``, ``waiting``,
+            ``completed`` and ``rejected`` renderings by lane name
+        """
+        with self.condition:
+            return {
+                lane.name: dict(
+                    running=lane.running,
+                    waiting=lane.waiting,
+                    completed=lane.completed,
+                    rejected=lane.rejected,
+                )
+                for lane in self.lanes
+            }
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Render each image cache miss only once.
+
+When a cached image expires, all the requests asking for it miss the cache at
+the same time. The rendering is coordinated at two levels:
+
+* the threads of a process wait for the one rendering the key, for at most
+  :py:data:`~flask_iiif.config.IIIF_SINGLE_FLIGHT_LEASE` seconds,
+* the workers of all the nodes sharing the cache wait on a lease stored in
+  the cache, see :func:`~flask_iiif.cache.cache.ImageCache.acquire_lock`.
+
+The waiting requests read the rendered image from the cache. If it has not
+been cached, or if its rendering takes too long, they render it themselves,
+at the same time.
+"""
+
+from __future__ import absolute_import
+
+import math
+import threading
+import time
+
+from flask import current_app
+
+
+class SingleFlight(object):
+    """Coordinate the rendering of the same cache misses."""
+
+    def __init__(self):
+        """Initialize the flights of the keys being rendered."""
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    def join(self, key):
+        """Join the flight of a key, leading it if there is none.
+
+        :param key: the image key
+        :returns: the event set once the flight lands and whether the caller
+            leads it
+        """
+        with self.lock:
+            event = self.flights.get(key)
+            if event is not None:
+                return event, False
+            event = self.flights[key] = threading.Event()
+            return event, True
+
+    def land(self, key, event):
+        """End the flight of a key and wake up its followers.
+
+        :param key: the image key
+        :param event: the event returned by :func:`join`
+        """
+        with self.lock:
+            if self.flights.get(key) is event:
+                del self.flights[key]
+        event.set()
+
+    def __call__(self, cache, key, render):
+        """Return the cached image, rendering it if no one else does.
+
+        :param cache: the :class:`~flask_iiif.cache.cache.ImageCache`
+        :param key: the image key
+        :param render: function rendering the image and caching it
+        :returns: the cached bytes, or what ``render`` returns
+        """
+        lease = current_app.config.get("IIIF_SINGLE_FLIGHT_LEASE", 30)
+        deadline = time.time() + current_app.config.get("IIIF_SINGLE_FLIGHT_WAIT", 10)
+        interval = current_app.config.get("IIIF_SINGLE_FLIGHT_INTERVAL", 0.05)
+
+        event, leader = self.join(key)
+        if not leader:
+            event.wait(lease)
+            cached = self._call(cache.get, key)
+            if cached:
+                return cached
+            # Not cached or too slow, render without waiting for each other
+            return render()
+
+        try:
+            while True:
+                cached = self._call(cache.get, key)
+                if cached:
+                    return cached
+                token = self._call(
+                    cache.acquire_lock, key, int(math.ceil(lease)), default=True
+                )
+                if token or time.time() >= deadline:
+                    # Render without the lease if its holder is too slow
+                    break
+                time.sleep(interval)
+
+            try:
+                return render()
+            finally:
+                if token:
+                    self._call(cache.release_lock, key, token)
+        finally:
+            self.land(key, event)
+
+    @staticmethod
+    def _call(method, *args, **kwargs):
+        """Call a cache method, ignoring its errors if configured so.
+
+        :param default: the value returned on ignored errors
+        """
+        default = kwargs.pop("default", None)
+        try:
+            return method(*args)
+        except Exception:
+            if not current_app.config.get("IIIF_CACHE_IGNORE_ERRORS", False):
+                raise
+            return default
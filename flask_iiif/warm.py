@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Render the images in bulk before they are requested.
+
+After a deployment or a flush of the cache, the first visitors of a gallery
+pay the rendering of every thumbnail. The cache is filled beforehand with
+the ``flask iiif warm`` command:
+
+.. code-block:: console
+
+    $ flask iiif warm uuids.txt --size '!100,100' --tiles 4 --workers 8
+
+or from Python:
+
+.. code-block:: python
+
+    from flask_iiif.warm import CacheWarmer, thumbnail_requests
+
+    warmer = CacheWarmer(workers=8, rate=50, state="warm.state")
+    warmer.warm(uuids, thumbnail_requests(["!100,100", "!400,400"]))
+
+The images are rendered as by the API and stored under the same cache keys.
+The images already cached are skipped, and the images of the uuids listed in
+the state file are not even looked up, so that an interrupted warming
+resumes where it stopped.
+
+.. note::
+
+    The images are opened outside of any request, the image opener must not
+    depend on it.
+"""
+
+from __future__ import absolute_import
+
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from flask import current_app
+
+from .api import IIIFImageAPIWrapper
+from .restful import (
+    cache_rendered,
+    current_iiif,
+    image_cache_key,
+    image_size,
+    render_image,
+    source_size,
+)
+
+
+def thumbnail_requests(sizes, image_format="jpg", quality="default"):
+    """Return the requests of the thumbnails of an image.
+
+    :param sizes: the sizes of the thumbnails, e.g. ``"!100,100"``
+    :param image_format: the format of the thumbnails
+    :param quality: the quality of the thumbnails
+    :returns: the parameters of the requests
+    """
+    return [
+        dict(
+            region="full",
+            size=size,
+            rotation="0",
+            quality=quality,
+            image_format=image_format,
+        )
+        for size in sizes
+    ]
+
+
+def tile_requests(
+    width,
+    height,
+    tile_width=256,
+    tile_height=None,
+    scale_factors=(1,),
+    min_scale_factor=1,
+    image_format="jpg",
+    quality="default",
+):
+    """Return the requests of the tiles of an image, as asked by the viewers.
+
+    :param int width: the width of the image
+    :param int height: the height of the image
+    :param int tile_width: the width of the tiles
+    :param int tile_height: the height of the tiles, their width if not set
+    :param scale_factors: the scale factors of the image information
+    :param int min_scale_factor: the smallest scale factor requested, the
+        larger ones are requested too
+    :returns: the parameters of the requests
+    """
+    tile_height = tile_height or tile_width
+    requests = []
+    for scale_factor in sorted(scale_factors, reverse=True):
+        if scale_factor < min_scale_factor:
+            continue
+        region_width, region_height = (
+            tile_width * scale_factor,
+            tile_height * scale_factor,
+        )
+        for y in range(0, height, region_height):
+            for x in range(0, width, region_width):
+                w, h = min(region_width, width - x), min(region_height, height - y)
+                requests.append(
+                    dict(
+                        region="{0},{1},{2},{3}".format(x, y, w, h),
+                        size="{0},".format(int(math.ceil(w / float(scale_factor)))),
+                        rotation="0",
+                        quality=quality,
+                        image_format=image_format,
+                    )
+                )
+    return requests
+
+
+def warm_image(**api_parameters):
+    """Render an image and cache it, unless it is already cached.
+
+    :returns: ``True`` if the image has been rendered
+    """
+    IIIFImageAPIWrapper.validate_api(**api_parameters)
+    key = image_cache_key(**api_parameters)
+    if current_iiif.cache.get_last_modification(key) is not None:
+        return False
+
+    to_serve = render_image(**api_parameters)
+    mimetype = current_app.config["IIIF_FORMATS"].get(
+        api_parameters["image_format"], "image/jpeg"
+    )
+    try:
+        cache_rendered(key, to_serve, mimetype, **api_parameters)
+    finally:
+        to_serve.close()
+    return True
+
+
+class RateLimiter(object):
+    """Space out the calls shared by several threads."""
+
+    def __init__(self, rate):
+        """Initialize the limiter.
+
+        :param float rate: the calls per second
+        """
+        self.interval = 1.0 / rate
+        self.next = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Wait for the turn of a call."""
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next - now
+            self.next = max(self.next, now) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CacheWarmer(object):
+    """Fill the image cache on a pool of threads."""
+
+    def __init__(
+        self,
+        app=None,
+        workers=4,
+        rate=None,
+        state=None,
+        progress=None,
+        version="v2",
+        min_scale_factor=None,
+        image_format="jpg",
+        quality="default",
+    ):
+        """Initialize the warmer.
+
+        :param int workers: the number of images rendered at the same time
+        :param float rate: the images rendered per second, unlimited if not
+            set
+        :param state: the file listing the uuids already warmed
+        :param progress: function called with the uuid and :func:`stats`
+            once the images of an uuid are warmed
+        :param version: the IIIF version of the requests
+        :param int min_scale_factor: warm the tiles of the image information
+            down to this scale factor, no tile if not set
+        :param image_format: the format of the tiles
+        :param quality: the quality of the tiles
+        """
+        self.app = app or current_app._get_current_object()
+        self.workers = workers
+        self.limiter = RateLimiter(rate) if rate else None
+        self.state = state
+        self.progress = progress
+        self.version = version
+        self.min_scale_factor = min_scale_factor
+        self.image_format = image_format
+        self.quality = quality
+        self.lock = threading.Lock()
+        self.counts = dict(uuids=0, skipped=0, rendered=0, cached=0, failed=0)
+
+    def stats(self):
+        """Return the counts of the warmed uuids and images."""
+        with self.lock:
+            return dict(self.counts)
+
+    def _count(self, name, value=1):
+        """Increment a count."""
+        with self.lock:
+            self.counts[name] += value
+
+    def done(self):
+        """Return the uuids listed in the state file."""
+        if not self.state:
+            return set()
+        try:
+            with open(self.state) as fp:
+                return set(line.strip() for line in fp if line.strip())
+        except (IOError, OSError):
+            return set()
+
+    def requests(self, uuid, requests):
+        """Return the requests warmed for an image, with its tiles.
+
+        :param uuid: the image uuid
+        :param requests: the parameters of the requests
+        """
+        requests = list(requests)
+        if self.min_scale_factor:
+            width, height = source_size(uuid) or image_size(uuid)
+            info = current_app.config["IIIF_API_INFO_RESPONSE_SKELETON"][self.version]
+            tiles = info.get("tiles") or [
+                dict(
+                    width=info.get("tile_width", 256),
+                    height=info.get("tile_height"),
+                    scaleFactors=info.get("scale_factors", [1]),
+                )
+            ]
+            for tile in tiles:
+                requests.extend(
+                    tile_requests(
+                        width,
+                        height,
+                        tile_width=tile["width"],
+                        tile_height=tile.get("height"),
+                        scale_factors=tile.get("scaleFactors", [1]),
+                        min_scale_factor=self.min_scale_factor,
+                        image_format=self.image_format,
+                        quality=self.quality,
+                    )
+                )
+        return requests
+
+    def warm_uuid(self, uuid, requests):
+        """Warm the images of an uuid.
+
+        :param uuid: the image uuid
+        :param requests: the parameters of the requests
+        :returns: ``True`` if all the images are cached
+        """
+        with self.app.app_context():
+            try:
+                requests = self.requests(uuid, requests)
+            except Exception:
+                current_app.logger.warning("Cannot open %s", uuid, exc_info=True)
+                self._count("failed")
+                return False
+
+            succeeded = True
+            for parameters in requests:
+                try:
+                    rendered = warm_image(uuid=uuid, version=self.version, **parameters)
+                except Exception:
+                    current_app.logger.warning(
+                        "Cannot warm %s with %s", uuid, parameters, exc_info=True
+                    )
+                    self._count("failed")
+                    succeeded = False
+                    rendered = True
+                else:
+                    self._count("rendered" if rendered else "cached")
+                if rendered and self.limiter is not None:
+                    # The cached images are skipped without waiting
+                    self.limiter.wait()
+        return succeeded
+
+    def _finish(self, uuid, succeeded):
+        """Record an uuid once its images are warmed."""
+        self._count("uuids")
+        if succeeded and self.state:
+            with self.lock:
+                with open(self.state, "a") as fp:
+                    fp.write(uuid + "\n")
+        if self.progress is not None:
+            self.progress(uuid, self.stats())
+
+    def warm(self, uuids, requests):
+        """Warm the images of the uuids.
+
+        The uuids are read as they are warmed, so that they can be streamed.
+
+        :param uuids: the image uuids
+        :param requests: the parameters of the requests of each uuid, see
+            :func:`thumbnail_requests`
+        :returns: the counts of the warmed uuids and images
+        """
+        requests = list(requests)
+        done = self.done()
+        pending = {}
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="iiif-warm"
+        ) as pool:
+            for uuid in uuids:
+                uuid = uuid.strip()
+                if not uuid:
+                    continue
+                if uuid in done:
+                    self._count("skipped")
+                    continue
+                if len(pending) >= 2 * self.workers:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        self._finish(pending.pop(future), future.result())
+                pending[pool.submit(self.warm_uuid, uuid, requests)] = uuid
+            for future in list(pending):
+                self._finish(pending.pop(future), future.result())
+        return self.stats()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Asynchronous IIIF Image API tests."""
+
+import asyncio
+import json
+import threading
+from io import BytesIO
+
+from PIL import Image
+
+from .helpers import IIIFTestCase
+
+
+class TestAsgiAPI(IIIFTestCase):
+    """Asynchronous IIIF Image API test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        self.asgi_app = self.app.extensions["iiif"].init_asgi()
+
+    def request(self, path, query_string=b"", headers=()):
+        """Run a GET request on the ASGI application."""
+        scope = dict(
+            type="http",
+            method="GET",
+            path=path,
+            query_string=query_string,
+            scheme="http",
+            server=("shield.worker.node.1", 80),
+            headers=[(b"host", b"shield.worker.node.1")] + list(headers),
+        )
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.asgi_app(scope, receive, send))
+        start = messages[0]
+        headers = {name.decode(): value.decode() for name, value in start["headers"]}
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        return start["status"], headers, body
+
+    def test_image(self):
+        """Test the image endpoint."""
+        path = "/api/multimedia/image/v2/valid:id/200,200,400,400/100,/90/grey.png"
+        status, headers, body = self.request(path)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"], "image/png")
+        image = Image.open(BytesIO(body))
+        self.assertEqual((image.size, image.mode), ((100, 100), "L"))
+
+        # Served from the cache the second time
+        self.app.extensions["iiif"].uuid_to_image_opener = None
+        self.assertEqual(self.request(path)[2], body)
+        self.assertIn("last-modified", self.request(path)[1])
+
+    def test_info(self):
+        """Test the information and base endpoints."""
+        status, headers, body = self.request(
+            "/api/multimedia/image/v2/valid:id/info.json"
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["access-control-allow-origin"], "*")
+        data = json.loads(body)
+        self.assertEqual((data["width"], data["height"]), (1280, 1024))
+        self.assertEqual(
+            data["@id"], "http://shield.worker.node.1/api/multimedia/image/v2/valid:id"
+        )
+
+        status, headers, _ = self.request("/api/multimedia/image/v2/valid:id")
+        self.assertEqual(status, 303)
+        self.assertTrue(
+            headers["location"].endswith("/api/multimedia/image/v2/valid:id/info.json")
+        )
+
+    def test_async_opener(self):
+        """Test the images are opened with the asynchronous opener."""
+        opened = []
+
+        async def opener(uuid):
+            opened.append(uuid)
+            await asyncio.sleep(0)
+            return self.create_image("valid")
+
+        self.app.extensions["iiif"].async_uuid_to_image_opener_handler(opener)
+        status, _, _ = self.request(
+            "/api/multimedia/image/v2/async/full/full/0/default.png"
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(opened, ["async"])
+
+    def test_errors(self):
+        """Test the errors are answered as by the synchronous endpoints."""
+        status, headers, body = self.request(
+            "/api/multimedia/image/v2/invalid/full/full/0/default.png"
+        )
+        self.assertEqual(status, 404)
+        self.assertEqual(headers["content-type"], "application/json")
+        self.assertEqual(json.loads(body)["code"], 404)
+
+        status, _, body = self.request(
+            "/api/multimedia/image/v2/valid:id/full/full/0/default.foo"
+        )
+        self.assertEqual(status, 400)
+
+        status, _, _ = self.request(
+            "/api/multimedia/image/v2/decorator/full/full/0/default.png"
+        )
+        self.assertEqual(status, 403)
+
+        status, _, _ = self.request("/api/multimedia/image/v2/valid:id/full/full")
+        self.assertEqual(status, 404)
+
+    def test_spooled_image(self):
+        """Test the spooled images are copied into the cache by chunks."""
+        from unittest.mock import patch
+
+        self.app.config["IIIF_SPOOL_MAX_SIZE"] = 1024
+        cache = self.app.extensions["iiif"].cache
+        path = "/api/multimedia/image/v2/valid:id/full/500,/0/default.tif"
+        with patch.object(cache, "set_stream", wraps=cache.set_stream) as set_stream:
+            status, _, body = self.request(path)
+        self.assertEqual(status, 200)
+        self.assertEqual(set_stream.call_count, 2)
+        self.assertEqual(Image.open(BytesIO(body)).size, (500, 400))
+        self.assertEqual(self.request(path)[2], body)
+
+    def test_streamed_response(self):
+        """Test the streamed responses are read off the event loop."""
+        from flask import Response
+
+        from flask_iiif.asgi import IIIFAsgiApp
+
+        threads = []
+
+        def generate():
+            for chunk in (b"12", b"34"):
+                threads.append(threading.current_thread())
+                yield chunk
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        with self.app.test_request_context() as context:
+            asyncio.run(
+                IIIFAsgiApp.send_response(
+                    Response(generate()), context.request.environ, send
+                )
+            )
+        self.assertEqual(b"".join(m.get("body", b"") for m in messages[1:]), b"1234")
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.main_thread(), threads)
+
+
+class TestAsyncImageRedisCache(IIIFTestCase):
+    """Asynchronous Redis image cache test case."""
+
+    def test_shared_entries(self):
+        """Test the entries are shared with the synchronous cache."""
+        from flask_iiif.cache.aioredis import AsyncImageRedisCache
+        from flask_iiif.cache.redis import ImageRedisCache
+
+        async def run():
+            cache = AsyncImageRedisCache()
+            await cache.set("async", b"image")
+            self.assertEqual(await cache.get("async"), b"image")
+            self.assertIsNotNone(await cache.get_last_modification("async"))
+            self.assertEqual(ImageRedisCache().get("async"), b"image")
+            await cache.set_entry("async", b"image", etag="abc")
+            entry = ImageRedisCache().get_entry("async")
+            self.assertEqual(entry["value"], b"image")
+            self.assertEqual(entry["etag"], "abc")
+            entry = await cache.get_entry("async")
+            self.assertEqual(entry["etag"], "abc")
+            self.assertIsNotNone(entry["last_modification"])
+            await cache.delete("async")
+            self.assertIsNone(await cache.get("async"))
+            self.assertIsNone(await cache.get_entry("async"))
+            await cache.set("async", b"image")
+            await cache.flush()
+            self.assertIsNone(await cache.get("async"))
+
+        asyncio.run(run())
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Derived renderings tests."""
+
+import threading
+import time
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from .helpers import IIIFTestCase
+
+
+class TestDerivatives(IIIFTestCase):
+    """Derived renderings test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        self.app.config.update(IIIF_DERIVE_FROM_CACHE=True, IIIF_PASSTHROUGH=False)
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        self.iiif = self.app.extensions["iiif"]
+
+    def request(self, region="full", size="full", rotation="0", quality="default"):
+        """Request an image and return it."""
+        get_the_response = self.get(
+            "iiifimageapi",
+            urlargs=dict(
+                uuid="valid:id-üni",
+                version="v2",
+                region=region,
+                size=size,
+                rotation=rotation,
+                quality=quality,
+                image_format="png",
+            ),
+        )
+        self.assert200(get_the_response)
+        return Image.open(BytesIO(get_the_response.data))
+
+    def test_index(self):
+        """Test the smallest large enough rendering is found."""
+        from flask_iiif.derivatives import DerivativeIndex
+
+        index = DerivativeIndex(self.app.config["IIIF_CACHE_HANDLER"], max_entries=3)
+        rendering = dict(
+            region="0,0,1280,1024",
+            size="1280,1024",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        index.add("image", "full", rendering)
+        index.add("image", "half", dict(rendering, size="640,512"))
+        index.add("image", "rotated", dict(rendering, size="320,256", rotation="90"))
+
+        request = dict(rendering, size="300,240")
+        self.assertEqual(index.find("image", request), "half")
+        self.assertEqual(index.find("image", dict(request, size="400,320")), "full")
+        self.assertIsNone(index.find("image", dict(request, size="1000,800")))
+        self.assertIsNone(index.find("image", dict(request, region="0,0,640,512")))
+        self.assertIsNone(index.find("image", request, formats=("jpeg",)))
+
+        index.discard("image", "half")
+        self.assertEqual(index.find("image", request), "full")
+        index.add("image", "gray", dict(rendering, quality="gray"))
+        index.add("image", "small", dict(rendering, size="10,8"))
+        self.assertEqual(list(index.get("image")), ["rotated", "gray", "small"])
+
+    def test_concurrent_index(self):
+        """Test the renderings indexed at the same time are all kept."""
+        from flask_iiif.cache.simple import ImageSimpleCache
+        from flask_iiif.derivatives import DerivativeIndex
+
+        cache = ImageSimpleCache()
+        set_value = cache.set
+
+        def slow_set(*args, **kwargs):
+            time.sleep(0.02)
+            return set_value(*args, **kwargs)
+
+        cache.set = slow_set
+        # Read outside of the application context by the threads
+        cache.timeout = 60
+        index = DerivativeIndex(cache)
+        rendering = dict(
+            region="0,0,1280,1024",
+            size="1280,1024",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        threads = [
+            threading.Thread(target=index.add, args=("image", str(i), rendering))
+            for i in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(index.get("image")), [str(i) for i in range(5)])
+
+        threads = [
+            threading.Thread(target=index.discard, args=("image", str(i)))
+            for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(index.get("image")), ["3", "4"])
+
+    def test_api_invalid(self):
+        """Test the invalid requests are rejected, not derived."""
+        self.request(size="640,")
+        for region, size, message in (
+            ("2000,2000,10,10", "full", "Outside of image borders"),
+            ("full", "0,", "cannot be zero"),
+        ):
+            get_the_response = self.get(
+                "iiifimageapi",
+                urlargs=dict(
+                    uuid="valid:id-üni",
+                    version="v2",
+                    region=region,
+                    size=size,
+                    rotation="0",
+                    quality="default",
+                    image_format="png",
+                ),
+            )
+            self.assert500(get_the_response)
+            self.assertIn(message, get_the_response.json["message"])
+
+    def test_api(self):
+        """Test the small images are derived from the cached larger ones."""
+        opener = self.iiif.uuid_to_image_opener
+        with patch.object(self.iiif, "uuid_to_image_opener", wraps=opener) as open_:
+            self.assertEqual(self.request(size="640,").size, (640, 512))
+            self.assertEqual(open_.call_count, 1)
+
+            self.assertEqual(self.request(size="300,").size, (300, 240))
+            self.assertEqual(self.request(size="!200,200").size, (200, 160))
+            image = self.request(size="pct:10", rotation="90", quality="gray")
+            self.assertEqual((image.size, image.mode), ((102, 128), "L"))
+            self.assertEqual(open_.call_count, 1)
+
+            # Not large enough
+            self.assertEqual(self.request(size="400,").size, (400, 320))
+            self.assertEqual(open_.call_count, 2)
+            # Another region
+            self.assertEqual(
+                self.request(region="0,0,640,512", size="50,").size, (50, 40)
+            )
+            self.assertEqual(open_.call_count, 3)
+
+            # The evicted renderings are forgotten
+            self.app.config["IIIF_CACHE_HANDLER"].flush()
+            self.iiif.derivatives.add(
+                "valid:id-üni",
+                "iiif:evicted",
+                dict(
+                    region="0,0,1280,1024",
+                    size="1280,1024",
+                    rotation="0",
+                    quality="default",
+                    image_format="png",
+                ),
+            )
+            self.assertEqual(self.request(size="100,").size, (100, 80))
+            self.assertEqual(open_.call_count, 4)
+        self.assertNotIn("iiif:evicted", self.iiif.derivatives.get("valid:id-üni"))
+
+    def test_disabled(self):
+        """Test the renderings are not indexed by default."""
+        self.app.config["IIIF_DERIVE_FROM_CACHE"] = False
+        self.iiif.__dict__.pop("derivatives", None)
+        self.request(size="640,")
+        self.assertIsNone(self.iiif.derivatives)
+        self.assertIsNone(
+            self.app.config["IIIF_CACHE_HANDLER"].get("iiif:derivatives:valid:id-üni")
+        )
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Image Filesystem Cache Tests."""
+
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from io import BytesIO
+from unittest.mock import patch
+
+from .helpers import IIIFTestCase
+
+
+class TestImageFileSystemCache(IIIFTestCase):
+    """Multimedia Image Filesystem Cache test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.cache.filesystem import ImageFileSystemCache
+
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.app.config.update(
+            IIIF_CACHE_FILESYSTEM_DIR=self.directory,
+            IIIF_CACHE_FILESYSTEM_SWEEP_INTERVAL=0,
+        )
+        self.cache = ImageFileSystemCache()
+
+    def test_set_and_get_function(self):
+        """Test cache set and get functions."""
+        self.cache.set("image_1", b"12345")
+        self.assertEqual(self.cache.get("image_1"), b"12345")
+        self.cache.set("info_1", "1280,1024")
+        self.assertEqual(self.cache.get("info_1"), "1280,1024")
+        self.assertIsNone(self.cache.get("image_2"))
+
+        path = self.cache.path("image_1")
+        self.assertTrue(path.startswith(self.directory))
+        # The object and its metadata are stored in a single file
+        self.assertEqual(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+
+        self.cache.set_stream("image_2", BytesIO(b"6789"))
+        with self.cache.get_stream("image_2") as stream:
+            self.assertEqual(stream.name, self.cache.path("image_2"))
+            self.assertEqual(stream.read(), b"6789")
+        self.assertIsNone(self.cache.get_stream("image_3"))
+
+        self.cache.delete("image_1")
+        self.assertIsNone(self.cache.get("image_1"))
+        self.cache.flush()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_last_modification(self):
+        """Test the modification dates."""
+        self.cache.set("image_1", b"12345")
+        last_modification = self.cache.get_last_modification("image_1")
+        self.assertIsInstance(last_modification, datetime)
+        self.cache.set_last_modification("image_1", datetime(2020, 1, 1))
+        self.assertEqual(
+            self.cache.get_last_modification("image_1"), datetime(2020, 1, 1)
+        )
+        self.assertIsNone(self.cache.get_last_modification("image_2"))
+
+    def test_sweep(self):
+        """Test the expired and the oldest objects are deleted."""
+        self.cache.set("image_1", b"12345", timeout=10)
+        self.cache.set("image_2", b"12345")
+        self.cache.set("image_3", b"12345")
+        os.utime(self.cache.path("image_2"), (0, 0))
+
+        self.cache.max_size = 5
+        later = time.time() + 100
+        with patch("flask_iiif.cache.filesystem.time.time", return_value=later):
+            self.cache.sweep()
+        self.assertFalse(os.path.exists(self.cache.path("image_1")))
+        self.assertIsNone(self.cache.get("image_1"))
+        self.assertIsNone(self.cache.get("image_2"))
+        self.assertEqual(self.cache.get("image_3"), b"12345")
+
+        with patch("flask_iiif.cache.filesystem.time.time", return_value=10**12):
+            self.cache.sweep()
+        self.assertFalse(os.path.exists(self.cache.path("image_3")))
+
+    def test_lock(self):
+        """Test the rendering lease."""
+        token = self.cache.acquire_lock("image_1", 30)
+        self.assertTrue(token)
+        self.assertIsNone(self.cache.acquire_lock("image_1", 30))
+        self.cache.release_lock("image_1", "other")
+        self.assertIsNone(self.cache.acquire_lock("image_1", 30))
+        self.cache.release_lock("image_1", token)
+        token = self.cache.acquire_lock("image_1", 30)
+        self.assertTrue(token)
+
+        # The lease of a worker which died expires
+        with patch("flask_iiif.cache.filesystem.time.time", return_value=10**12):
+            self.assertTrue(self.cache.acquire_lock("image_1", 30))
+
+    def test_sweep_locks(self):
+        """Test the expired leases are deleted."""
+        self.cache.acquire_lock("image_1", 10)
+        self.cache.acquire_lock("image_2", 1000)
+        with patch(
+            "flask_iiif.cache.filesystem.time.time", return_value=time.time() + 100
+        ):
+            self.cache.sweep()
+        self.assertFalse(os.path.exists(self.cache.path("image_1") + ".lock"))
+        self.assertTrue(os.path.exists(self.cache.path("image_2") + ".lock"))
+
+    def test_single_sweeper(self):
+        """Test a single worker sweeps the cache in each interval."""
+        from flask_iiif.cache.filesystem import ImageFileSystemCache
+
+        self.app.config["IIIF_CACHE_FILESYSTEM_SWEEP_INTERVAL"] = 0.1
+        caches = [ImageFileSystemCache(), ImageFileSystemCache()]
+        sweeps = []
+        for cache in caches:
+            self.addCleanup(cache.stop)
+            cache.sweep = lambda cache=cache: sweeps.append(cache)
+        time.sleep(0.6)
+        for cache in caches:
+            cache.stop()
+            cache.sweeper.join()
+        self.assertTrue(sweeps)
+        self.assertEqual(len(set(sweeps)), 1)
+
+    def test_api(self):
+        """Test the API serves the cached images from their files."""
+        iiif = self.app.extensions["iiif"]
+        iiif.cache = self.cache
+        self.addCleanup(iiif.__dict__.pop, "cache", None)
+
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="100,",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        first = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(first)
+        with patch.object(self.cache, "get", side_effect=AssertionError):
+            second = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(second)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(
+            second.headers["Last-Modified"], first.headers["Last-Modified"]
+        )
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Image Memory Cache Tests."""
+
+from __future__ import absolute_import
+
+from datetime import datetime
+from io import BytesIO
+from unittest.mock import patch
+
+from .helpers import IIIFTestCase
+
+
+class TestImageMemoryCache(IIIFTestCase):
+    """Multimedia Image Memory Cache test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.cache.memory import ImageMemoryCache
+
+        self.cache = ImageMemoryCache(max_bytes=10)
+
+    def test_set_and_get_function(self):
+        """Test the objects are returned without copies."""
+        value = b"12345"
+        self.cache.set("image_1", value)
+        self.assertIs(self.cache.get("image_1"), value)
+        self.assertEqual(self.cache.size, 5)
+        self.assertIsNone(self.cache.get("image_2"))
+
+        self.cache.set("image_1", bytearray(b"123"))
+        self.assertEqual(self.cache.get("image_1"), b"123")
+        self.assertEqual(self.cache.size, 3)
+
+        self.cache.set_stream("image_2", BytesIO(b"4567"))
+        self.assertEqual(self.cache.get("image_2"), b"4567")
+
+        # The strings are counted in encoded bytes
+        self.cache.set("info_1", "üni")
+        self.assertEqual(self.cache.get("info_1"), "üni")
+        self.assertEqual(list(self.cache.entries), ["image_2", "info_1"])
+        self.assertEqual(self.cache.size, 8)
+
+    def test_eviction(self):
+        """Test the least recently used objects are evicted."""
+        self.cache.set("image_1", b"12345")
+        self.cache.set("image_2", b"12345")
+        self.cache.get("image_1")
+        self.cache.set("image_3", b"12345")
+        self.assertEqual(list(self.cache.entries), ["image_1", "image_3"])
+        self.assertEqual(self.cache.size, 10)
+
+        # Too large for the cache
+        self.cache.set("image_1", b"0123456789a")
+        self.cache.set_stream("image_3", BytesIO(b"0123456789a"))
+        self.assertEqual(self.cache.entries, {})
+        self.assertEqual(self.cache.size, 0)
+
+    def test_timeout(self):
+        """Test the objects expire."""
+        self.cache.set("image_1", b"12345", timeout=10)
+        with patch("flask_iiif.cache.memory.time.time", return_value=10**10):
+            self.assertIsNone(self.cache.get("image_1"))
+        self.assertEqual(self.cache.size, 0)
+
+    def test_last_modification(self):
+        """Test the modification dates are kept with the objects."""
+        last_modification = datetime(2020, 1, 1)
+        self.cache.set("image_1", b"12345", last_modification=last_modification)
+        self.assertEqual(self.cache.get_last_modification("image_1"), last_modification)
+        self.cache.set_last_modification("image_1")
+        self.assertGreater(
+            self.cache.get_last_modification("image_1"), last_modification
+        )
+        self.cache.delete("image_1")
+        self.assertIsNone(self.cache.get_last_modification("image_1"))
+
+    def test_lock(self):
+        """Test the rendering lease."""
+        token = self.cache.acquire_lock("image_1", 30)
+        self.assertTrue(token)
+        self.assertIsNone(self.cache.acquire_lock("image_1", 30))
+        self.cache.release_lock("image_1", "other")
+        self.assertIsNone(self.cache.acquire_lock("image_1", 30))
+        self.cache.release_lock("image_1", token)
+        self.assertTrue(self.cache.acquire_lock("image_1", 30))
+
+    def test_invalidate(self):
+        """Test the evicted keys leave the index of their image."""
+        self.cache.set("image_1/a", b"12345")
+        self.cache.set("image_1/b", b"12345")
+        self.cache.index("image_1", "image_1/a", "image_1/b", "image_1/c")
+        self.assertEqual(self.cache.indexed("image_1"), {"image_1/a", "image_1/b"})
+        self.cache.set("image_2/a", b"123")
+        self.assertEqual(self.cache.indexed("image_1"), {"image_1/b"})
+
+        self.assertEqual(self.cache.invalidate("image_1"), 1)
+        self.assertEqual(list(self.cache.entries), ["image_2/a"])
+        self.assertEqual(self.cache.size, 3)
+        self.assertEqual(self.cache.indexes, {})
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Image Metadata Index Tests."""
+
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from .helpers import IIIFTestCase
+
+
+class TestImageMetadata(IIIFTestCase):
+    """Image metadata index test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.metadata.simple import ImageSimpleMetadataIndex
+
+        self.index = ImageSimpleMetadataIndex()
+        self.app.config["IIIF_METADATA_HANDLER"] = self.index
+        self.app.extensions["iiif"].__dict__.pop("metadata", None)
+
+    def test_image_metadata(self):
+        """Test the metadata read from the image header."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        tmp_file = BytesIO()
+        source = Image.new("RGB", (1280, 1024))
+        source.save(
+            tmp_file,
+            "tiff",
+            save_all=True,
+            append_images=[source.resize((640, 512))],
+        )
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        self.assertEqual(
+            image.metadata(),
+            dict(
+                width=1280,
+                height=1024,
+                mode="RGB",
+                format="TIFF",
+                tiles=None,
+                levels=[[1280, 1024], [640, 512]],
+                icc=False,
+            ),
+        )
+        self.assertTrue(image.image.tile)
+
+    def test_simple_index(self):
+        """Test the in-memory index."""
+        self.assertIsNone(self.index.get("foo"))
+        self.index.set("foo", dict(width=1, height=2))
+        self.assertEqual(self.index.get("foo"), dict(width=1, height=2))
+        self.index.delete("foo")
+        self.assertIsNone(self.index.get("foo"))
+        self.index.set("foo", dict(width=1, height=2))
+        self.index.flush()
+        self.assertIsNone(self.index.get("foo"))
+
+    def test_api_info_from_index(self):
+        """Test the info is answered from the index."""
+        urlargs = dict(uuid="valid:id", version="v2")
+        self.assert200(self.get("iiifimageinfo", urlargs=urlargs))
+        self.assertEqual(self.index.get("valid:id")["width"], 1280)
+
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        iiif = self.app.extensions["iiif"]
+        with patch.object(iiif, "uuid_to_image_opener") as opener:
+            get_the_response = self.get("iiifimageinfo", urlargs=urlargs)
+            self.assertFalse(opener.called)
+        self.assert200(get_the_response)
+        self.assertEqual(get_the_response.json["height"], 1024)
+
+    def test_api_image_fills_index(self):
+        """Test the index is filled when an image is rendered."""
+        urlargs = dict(
+            uuid="valid:id",
+            version="v2",
+            region="full",
+            size="100,",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+        self.assertEqual(self.index.get("valid:id")["mode"], "RGBA")
+
+        # The index isn't read again once the size is known
+        urlargs.update(size="50,")
+        with patch.object(self.index, "get") as get:
+            self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+            self.assertFalse(get.called)
+
+
+class TestImageRedisMetadata(IIIFTestCase):
+    """Image Redis metadata index test case."""
+
+    def test_redis_index(self):
+        """Test the Redis index."""
+        from flask_iiif.metadata.redis import ImageRedisMetadataIndex
+
+        index = ImageRedisMetadataIndex()
+        index.flush()
+        self.assertIsNone(index.get("foo"))
+        index.set("foo", dict(width=1, height=2, levels=[[1, 2]]))
+        self.assertEqual(index.get("foo"), dict(width=1, height=2, levels=[[1, 2]]))
+        index.delete("foo")
+        self.assertIsNone(index.get("foo"))
+        index.set("foo", dict(width=1, height=2))
+        index.flush()
+        self.assertIsNone(index.get("foo"))
+
+    def test_cache_flush(self):
+        """Test the index outlives a flush of the cache in the same database."""
+        from flask_iiif.cache.redis import ImageRedisCache
+        from flask_iiif.metadata.redis import ImageRedisMetadataIndex
+
+        self.app.config["IIIF_METADATA_REDIS_URL"] = self.app.config[
+            "IIIF_CACHE_REDIS_URL"
+        ]
+        index = ImageRedisMetadataIndex()
+        index.set("foo", dict(width=1, height=2))
+        cache = ImageRedisCache()
+        cache.set("foo", b"image")
+        cache.flush()
+        self.assertIsNone(cache.get("foo"))
+        self.assertEqual(index.get("foo"), dict(width=1, height=2))
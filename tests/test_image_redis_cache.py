@@ -11,6 +11,8 @@
 
 from __future__ import absolute_import
 
+from unittest.mock import patch
+
 from six import BytesIO
 
 from .helpers import IIIFTestCase
@@ -74,6 +76,71 @@ class TestImageRedisCache(IIIFTestCase):
         self.cache.delete("foo")
         self.assertEqual(self.cache.get("foo"), None)
 
+    def test_invalidate(self):
+        """Test the indexed keys of an image are deleted in a pipeline."""
+        self.cache.set_entry("image_1/full", b"1", etag="a")
+        self.cache.set("image_1/info", "1,1")
+        self.cache.set("image_2/full", b"2")
+        self.cache.index("image_1", "image_1/full", "image_1/info")
+        self.cache.index("image_2", "image_2/full")
+        self.assertEqual(
+            self.cache.indexed("image_1"), {"image_1/full", "image_1/info"}
+        )
+        name = self.cache.cache.key_prefix + "index::image_1"
+        self.assertGreater(self.cache.redis.ttl(name), 0)
+
+        with patch.object(self.cache.redis, "keys") as keys:
+            self.assertEqual(self.cache.invalidate("image_1"), 2)
+            keys.assert_not_called()
+        self.assertIsNone(self.cache.get_entry("image_1/full"))
+        self.assertIsNone(self.cache.get("image_1/info"))
+        self.assertFalse(
+            self.cache.redis.keys(self.cache.cache.key_prefix + "*image_1*")
+        )
+        self.assertEqual(self.cache.get("image_2/full"), b"2")
+
+    def test_cache_lock(self):
+        """Test cache lease functions."""
+        token = self.cache.acquire_lock("image_3", 10)
+        self.assertTrue(token)
+        self.assertIsNone(self.cache.acquire_lock("image_3", 10))
+        # Only the holder releases the lease
+        self.cache.release_lock("image_3", "another")
+        self.assertIsNone(self.cache.acquire_lock("image_3", 10))
+        self.cache.release_lock("image_3", token)
+        self.assertTrue(self.cache.acquire_lock("image_3", 10))
+
+    def test_cache_entry(self):
+        """Test cache entry functions."""
+        self.cache.set_entry(
+            "image_4",
+            self.image_file.getvalue(),
+            content_type="image/png",
+            etag="abc",
+        )
+        entry = self.cache.get_entry("image_4")
+        self.assertEqual(entry["value"], self.image_file.getvalue())
+        self.assertEqual(entry["content_type"], "image/png")
+        self.assertEqual(entry["etag"], "abc")
+        self.assertEqual(
+            entry["last_modification"], self.cache.get_last_modification("image_4")
+        )
+        entry = self.cache.get_entry("image_4", stream=True)
+        self.assertEqual(entry["value"].read(), self.image_file.getvalue())
+
+        # A single round trip
+        with patch.object(
+            self.cache.redis, "mget", wraps=self.cache.redis.mget
+        ) as mget, patch.object(self.cache.redis, "get") as get:
+            self.assertIsNotNone(self.cache.get_entry("image_4"))
+            mget.assert_called_once()
+            get.assert_not_called()
+
+        self.cache.set("image_4", b"image")
+        self.assertIsNone(self.cache.get_entry("image_4")["etag"])
+        self.cache.delete("image_4")
+        self.assertIsNone(self.cache.get_entry("image_4"))
+
     def test_cache_flush(self):
         """Test cache flush function."""
         self.cache.set("foo_1", "bar")
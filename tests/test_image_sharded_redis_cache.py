@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Image Sharded Redis Cache Tests."""
+
+from __future__ import absolute_import
+
+from unittest.mock import patch
+
+from .helpers import IIIFTestCase
+
+
+class TestImageShardedRedisCache(IIIFTestCase):
+    """Multimedia Image Sharded Redis Cache test case."""
+
+    urls = [
+        "redis://localhost:6379/1",
+        "redis://localhost:6379/2",
+        "redis://localhost:6379/3",
+    ]
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.cache.shardedredis import ImageShardedRedisCache
+
+        self.app.config.update(
+            IIIF_CACHE_REDIS_URLS=self.urls,
+            IIIF_CACHE_REDIS_OPTIONS=dict(max_connections=4, socket_timeout=5),
+        )
+        self.cache = ImageShardedRedisCache()
+        self.cache.flush()
+        self.addCleanup(self.cache.flush)
+
+    def test_sharding(self):
+        """Test the keys are spread over the nodes."""
+        keys = ["image_{0}".format(i) for i in range(300)]
+        for key in keys:
+            self.cache.set(key, key.encode())
+
+        for url, node in self.cache.nodes.items():
+            stored = [key for key in keys if self.cache.ring.get(key) == url]
+            self.assertGreater(len(stored), 50)
+            for key in stored:
+                self.assertEqual(node.get(key), key.encode())
+                self.assertEqual(self.cache.get(key), key.encode())
+
+        self.cache.delete("image_1")
+        self.assertIsNone(self.cache.get("image_1"))
+        self.cache.flush()
+        self.assertIsNone(self.cache.get("image_2"))
+
+    def test_entry(self):
+        """Test the entries are stored on a single node."""
+        self.cache.set_entry("image_1", b"image", content_type="image/png", etag="a")
+        node, _ = self.cache.route("image_1")
+        with patch.object(node.redis, "mget", wraps=node.redis.mget) as mget:
+            entry = self.cache.get_entry("image_1")
+            mget.assert_called_once()
+        self.assertEqual(entry["value"], b"image")
+        self.assertEqual(entry["etag"], "a")
+        self.assertEqual(
+            entry["last_modification"], self.cache.get_last_modification("image_1")
+        )
+
+        token = self.cache.acquire_lock("image_1", 10)
+        self.assertTrue(token)
+        self.assertIsNone(self.cache.acquire_lock("image_1", 10))
+        self.cache.release_lock("image_1", token)
+        self.assertTrue(self.cache.acquire_lock("image_1", 10))
+
+    def test_invalidate(self):
+        """Test the keys of an image are deleted on all the nodes."""
+        keys = ["image_1/{0}".format(i) for i in range(30)]
+        for key in keys:
+            self.cache.set(key, b"image")
+        self.cache.index("image_1", *keys)
+        self.assertEqual(
+            len(set(self.cache.ring.get(key) for key in keys)), len(self.urls)
+        )
+
+        self.assertEqual(self.cache.invalidate("image_1"), 30)
+        self.assertFalse(any(self.cache.get(key) for key in keys))
+        self.assertEqual(self.cache.indexed("image_1"), set())
+
+    def test_remapping(self):
+        """Test adding a node only moves a share of the keys."""
+        from flask_iiif.cache.shardedredis import HashRing
+
+        keys = ["image_{0}".format(i) for i in range(1000)]
+        ring = HashRing(self.urls)
+        before = dict((key, ring.get(key)) for key in keys)
+        ring.add("redis://localhost:6379/4")
+        moved = [key for key in keys if ring.get(key) != before[key]]
+        self.assertLess(len(moved), 400)
+        self.assertTrue(
+            all(ring.get(key) == "redis://localhost:6379/4" for key in moved)
+        )
+        ring.remove("redis://localhost:6379/4")
+        self.assertEqual(dict((key, ring.get(key)) for key in keys), before)
+
+    def test_cluster(self):
+        """Test the keys of an object share their hash slot on a cluster."""
+        from redis import StrictRedis
+
+        from flask_iiif.cache.shardedredis import ImageRedisClusterCache
+
+        client = StrictRedis.from_url(self.urls[0])
+        with patch(
+            "flask_iiif.cache.shardedredis.RedisCluster.from_url",
+            return_value=client,
+        ) as from_url:
+            cache = ImageRedisClusterCache()
+        from_url.assert_called_once_with(
+            self.app.config["IIIF_CACHE_REDIS_URL"],
+            max_connections=4,
+            socket_timeout=5,
+        )
+
+        cache.set("image_1", b"image")
+        self.assertEqual(cache.get("image_1"), b"image")
+        self.assertEqual(
+            sorted(client.keys("*image_1*")),
+            [
+                b"iiiflast_modification::{image_1}",
+                b"iiifmetadata::{image_1}",
+                b"iiif{image_1}",
+            ],
+        )
+        cache.delete("image_1")
+        self.assertIsNone(cache.get_entry("image_1"))
+
+    def test_router(self):
+        """Test the keys are stored where the router sends them."""
+        from flask_iiif.cache.shardedredis import ImageRoutedCache
+        from flask_iiif.cache.simple import ImageSimpleCache
+
+        images, infos = ImageSimpleCache(), ImageSimpleCache()
+
+        def router(key):
+            return (infos if key.startswith("info") else images), key
+
+        cache = ImageRoutedCache(router)
+        cache.set("image_1", b"image")
+        cache.set("info_1", "1,1")
+        self.assertEqual(cache.get("image_1"), b"image")
+        self.assertEqual(images.get("image_1"), b"image")
+        self.assertIsNone(images.get("info_1"))
+        self.assertEqual(infos.get("info_1"), "1,1")
@@ -11,7 +11,10 @@
 
 from __future__ import absolute_import
 
+import threading
+import time
 from io import BytesIO
+from unittest.mock import patch
 
 from .helpers import IIIFTestCase
 
@@ -74,6 +77,40 @@ class TestImageSimpleCache(IIIFTestCase):
         self.cache.delete("foo")
         self.assertEqual(self.cache.get("foo"), None)
 
+    def test_cache_lock(self):
+        """Test cache lease functions."""
+        token = self.cache.acquire_lock("image_3", 10)
+        self.assertTrue(token)
+        self.assertIsNone(self.cache.acquire_lock("image_3", 10))
+        # Only the holder releases the lease
+        self.cache.release_lock("image_3", "another")
+        self.assertIsNone(self.cache.acquire_lock("image_3", 10))
+        self.cache.release_lock("image_3", token)
+        self.assertTrue(self.cache.acquire_lock("image_3", 10))
+
+    def test_cache_entry(self):
+        """Test cache entry functions."""
+        self.cache.set_entry(
+            "image_4",
+            self.image_file.getvalue(),
+            content_type="image/png",
+            etag="abc",
+        )
+        entry = self.cache.get_entry("image_4")
+        self.assertEqual(entry["value"], self.image_file.getvalue())
+        self.assertEqual(entry["content_type"], "image/png")
+        self.assertEqual(entry["etag"], "abc")
+        self.assertEqual(
+            entry["last_modification"], self.cache.get_last_modification("image_4")
+        )
+        entry = self.cache.get_entry("image_4", stream=True)
+        self.assertEqual(entry["value"].read(), self.image_file.getvalue())
+
+        self.cache.set("image_4", b"image")
+        self.assertIsNone(self.cache.get_entry("image_4")["etag"])
+        self.cache.delete("image_4")
+        self.assertIsNone(self.cache.get_entry("image_4"))
+
     def test_cache_flush(self):
         """Test cache flush function."""
         self.cache.set("foo_1", "bar")
@@ -84,3 +121,61 @@ class TestImageSimpleCache(IIIFTestCase):
         self.cache.flush()
         for i in [1, 2, 3]:
             self.assertEqual(self.cache.get("foo_{0}".format(i)), None)
+
+    def test_invalidate(self):
+        """Test the indexed keys of an image are deleted."""
+        self.cache.set("image_1/full", b"1")
+        self.cache.set("image_1/info", "1,1")
+        self.cache.set("image_2/full", b"2")
+        self.cache.index("image_1", "image_1/full", "image_1/info")
+        self.cache.index("image_1", "image_1/full")
+        self.cache.index("image_2", "image_2/full")
+        self.assertEqual(
+            self.cache.indexed("image_1"), {"image_1/full", "image_1/info"}
+        )
+
+        self.assertEqual(self.cache.invalidate("image_1"), 2)
+        self.assertIsNone(self.cache.get("image_1/full"))
+        self.assertIsNone(self.cache.get_last_modification("image_1/info"))
+        self.assertEqual(self.cache.indexed("image_1"), set())
+        self.assertEqual(self.cache.get("image_2/full"), b"2")
+        self.assertEqual(self.cache.invalidate("image_1"), 0)
+
+    def test_concurrent_index(self):
+        """Test the keys indexed at the same time are all kept."""
+        set_value = self.cache.set
+
+        def slow_set(*args, **kwargs):
+            time.sleep(0.02)
+            return set_value(*args, **kwargs)
+
+        self.cache.set = slow_set
+        # Read outside of the application context by the threads
+        self.cache.timeout = 60
+        threads = [
+            threading.Thread(
+                target=self.cache.index, args=("image_1", "image_1/{0}".format(i))
+            )
+            for i in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            self.cache.indexed("image_1"), {"image_1/{0}".format(i) for i in range(5)}
+        )
+
+    def test_index_timeout(self):
+        """Test the index expires with the last object added."""
+        now = time.time()
+        self.cache.timeout = 100
+        with patch("cachelib.simple.time", return_value=now):
+            self.cache.set("image_1/full", b"1")
+            self.cache.index("image_1", "image_1/full")
+        with patch("cachelib.simple.time", return_value=now + 60):
+            self.cache.set("image_1/full", b"1")
+            self.cache.index("image_1", "image_1/full")
+        with patch("cachelib.simple.time", return_value=now + 120):
+            self.assertEqual(self.cache.get("image_1/full"), b"1")
+            self.assertEqual(self.cache.indexed("image_1"), {"image_1/full"})
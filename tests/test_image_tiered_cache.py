@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Image Tiered Cache Tests."""
+
+from __future__ import absolute_import
+
+from io import BytesIO
+from unittest.mock import patch
+
+from .helpers import IIIFTestCase
+
+
+class TestImageTieredCache(IIIFTestCase):
+    """Multimedia Image Tiered Cache test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.cache.simple import ImageSimpleCache
+        from flask_iiif.cache.tiered import ImageTieredCache
+
+        self.app.config.update(IIIF_CACHE_L1_SIZE=10, IIIF_CACHE_L1_TIMEOUT=60)
+        self.backend = ImageSimpleCache()
+        self.cache = ImageTieredCache(backend=self.backend)
+
+    def test_read_through(self):
+        """Test the second tier is read on a first tier miss."""
+        self.backend.set("image_1", b"12345")
+        self.assertEqual(self.cache.get("image_1"), b"12345")
+        with patch.object(self.backend, "get") as get:
+            self.assertEqual(self.cache.get("image_1"), b"12345")
+            get.assert_not_called()
+        self.assertIsNone(self.cache.get("image_2"))
+        stats = self.cache.stats()
+        self.assertEqual(
+            (stats["l1_hits"], stats["l2_hits"], stats["misses"], stats["l1_size"]),
+            (1, 1, 1, 5),
+        )
+
+    def test_write_through(self):
+        """Test the objects are written in both tiers."""
+        self.cache.set("image_1", b"12345")
+        self.assertEqual(self.backend.get("image_1"), b"12345")
+        self.assertEqual(self.cache.get("image_1"), b"12345")
+        self.assertEqual(self.cache.stats()["l1_hits"], 1)
+        self.assertEqual(
+            self.cache.get_last_modification("image_1"),
+            self.backend.get_last_modification("image_1"),
+        )
+
+        # Too large for the first tier
+        self.cache.set_stream("image_2", BytesIO(b"0123456789a"))
+        self.assertEqual(self.backend.get("image_2"), b"0123456789a")
+        self.assertEqual(self.cache.get("image_2"), b"0123456789a")
+        self.assertEqual(self.cache.stats()["l2_hits"], 1)
+
+        self.cache.delete("image_1")
+        self.assertIsNone(self.cache.get("image_1"))
+        self.assertIsNone(self.backend.get("image_1"))
+
+    def test_eviction(self):
+        """Test the first tier is bounded in bytes and in time."""
+        self.cache.set("image_1", b"12345")
+        self.cache.set("image_2", b"12345")
+        self.cache.get("image_1")
+        self.cache.set("image_3", b"12345")
+        self.assertEqual(set(self.cache.l1.entries), {"image_1", "image_3"})
+        self.assertEqual(self.cache.l1.size, 10)
+
+        with patch("flask_iiif.cache.memory.time.time", return_value=10**10):
+            self.assertEqual(self.cache.get("image_1"), b"12345")
+        self.assertEqual(self.cache.stats()["l2_hits"], 1)
+
+        self.cache.flush()
+        self.assertEqual(self.cache.l1.size, 0)
+        self.assertIsNone(self.cache.get("image_3"))
+
+    def test_api(self):
+        """Test the API with the tiered cache."""
+        from flask_iiif.cache.tiered import ImageTieredCache
+
+        self.app.config.update(
+            IIIF_CACHE_L1_SIZE=1024 * 1024,
+            IIIF_CACHE_TIERED_BACKEND="flask_iiif.cache.simple:ImageSimpleCache",
+        )
+        cache = ImageTieredCache()
+        iiif = self.app.extensions["iiif"]
+        iiif.cache = cache
+        self.addCleanup(iiif.__dict__.pop, "cache", None)
+
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="100,",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        first = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(first)
+        second = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(second)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(cache.stats()["l1_hits"], 1)
@@ -13,7 +13,7 @@
 from io import BytesIO
 
 import pytest
-from PIL import Image
+from PIL import Image, features
 
 from flask_iiif.api import MultimediaImage
 
@@ -189,3 +189,522 @@ class TestMultimediaAPI(IIIFTestCase):
     def test_image_tiff_support(self):
         """Test TIFF image support."""
         self.assertEqual(self.image_tiff.image.format, "TIFF")
+
+    def test_image_jpeg_draft(self):
+        """Test the reduced decoding of JPEG images."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        tmp_file = BytesIO()
+        image = Image.new("RGB", (1280, 1024), (255, 0, 0))
+        image.save(tmp_file, "jpeg")
+        cases = self.app.config["IIIF_VALIDATIONS"]["v2"]
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        decode = image.prepare_decode(cases, region="full", size="160,")
+        self.assertEqual(decode, dict(region="0,0,160,128", size="160,128"))
+        self.assertEqual(image.size(), (160, 128))
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        decode = image.prepare_decode(cases, region="640,512,640,512", size="pct:25")
+        self.assertEqual(decode, dict(region="160,128,160,128", size="160,128"))
+        self.assertEqual(image.size(), (320, 256))
+
+        # Upscaling needs the full resolution
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        self.assertEqual(image.prepare_decode(cases, region="full", size="2000,"), {})
+        self.assertEqual(image.size(), (1280, 1024))
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        image.apply_api(
+            region="20,20,1000,800",
+            size="!100,100",
+            rotation="0",
+            quality="grey",
+        )
+        self.assertEqual(image.size(), (100, 80))
+        self.assertEqual(image.image.mode, "L")
+
+        self.app.config["IIIF_JPEG_DRAFT"] = False
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        self.assertEqual(image.prepare_decode(cases, region="full", size="160,"), {})
+        self.assertEqual(image.size(), (1280, 1024))
+
+    def test_image_tiff_partial_decode(self):
+        """Test the partial decoding of striped TIFF images."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        tmp_file = BytesIO()
+        source = Image.radial_gradient("L").resize((1280, 1024)).convert("RGB")
+        # 64 rows per strip
+        source.save(tmp_file, "tiff", tiffinfo={278: 64})
+        cases = self.app.config["IIIF_VALIDATIONS"]["v2"]
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        self.assertEqual(len(image.image.tile), 16)
+        decode = image.prepare_decode(cases, region="256,300,256,256", size="full")
+        self.assertEqual(decode, dict(region="256,44,256,256", size="full"))
+        self.assertEqual(len(image.image.tile), 5)
+        self.assertEqual(image.size(), (1280, 320))
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        image.apply_api(
+            region="256,300,256,256", size="128,", rotation="0", quality="default"
+        )
+        expected = source.crop((256, 300, 512, 556)).resize((128, 128))
+        self.assertEqual(image.size(), (128, 128))
+        self.assertEqual(image.image.tobytes(), expected.tobytes())
+
+        self.app.config["IIIF_TIFF_PARTIAL_DECODE"] = False
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        decode = image.prepare_decode(cases, region="256,300,256,256", size="full")
+        self.assertEqual(decode, {})
+        self.assertEqual(len(image.image.tile), 16)
+
+    def test_image_tiff_pyramid(self):
+        """Test the level selection of pyramidal TIFF images."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        tmp_file = BytesIO()
+        source = Image.radial_gradient("L").resize((1280, 1024)).convert("RGB")
+        source.save(
+            tmp_file,
+            "tiff",
+            save_all=True,
+            append_images=[source.resize((640, 512)), source.resize((320, 256))],
+        )
+        cases = self.app.config["IIIF_VALIDATIONS"]["v2"]
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        self.assertEqual(
+            image.pyramid_levels(),
+            [(0, (1280, 1024)), (1, (640, 512)), (2, (320, 256))],
+        )
+        decode = image.prepare_decode(cases, region="full", size="200,")
+        self.assertEqual(decode, dict(region="0,0,320,256", size="200,160"))
+        self.assertEqual(image.image.tell(), 2)
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        decode = image.prepare_decode(cases, region="640,512,640,512", size="300,")
+        self.assertEqual(decode, dict(region="320,256,320,256", size="300,240"))
+        self.assertEqual(image.image.tell(), 1)
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        image.apply_api(region="full", size="200,", rotation="0", quality="default")
+        self.assertEqual(image.size(), (200, 160))
+
+        # Pages of a different shape are not resolution levels
+        tmp_file = BytesIO()
+        source.save(
+            tmp_file,
+            "tiff",
+            save_all=True,
+            append_images=[source.resize((640, 640))],
+        )
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        self.assertEqual(image.pyramid_levels(), [(0, (1280, 1024))])
+
+        self.app.config["IIIF_TIFF_PYRAMID"] = False
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        self.assertEqual(image.prepare_decode(cases, region="full", size="200,"), {})
+        self.assertEqual(image.image.tell(), 0)
+
+    @pytest.mark.skipif(
+        not features.check("jpg_2000"), reason="JPEG 2000 support is missing"
+    )
+    def test_image_jpeg2000_reduce(self):
+        """Test the reduced decoding of JPEG 2000 images."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        tmp_file = BytesIO()
+        source = Image.radial_gradient("L").resize((1280, 1024)).convert("RGB")
+        source.save(
+            tmp_file,
+            "JPEG2000",
+            num_resolutions=4,
+            quality_layers=[40, 20, 10],
+            quality_mode="rates",
+        )
+        cases = self.app.config["IIIF_VALIDATIONS"]["v2"]
+
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        decode = image.prepare_decode(cases, region="640,512,640,512", size="100,")
+        self.assertEqual(decode, dict(region="160,128,160,128", size="100,80"))
+        self.assertEqual(image.size(), (320, 256))
+        self.assertEqual(image.image.layers, 3)
+
+        # Never reduce further than the decomposition levels
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        decode = image.prepare_decode(cases, region="full", size="10,")
+        self.assertEqual(decode, dict(region="0,0,160,128", size="10,8"))
+
+        self.app.config["IIIF_JPEG2000_LAYERS"] = 1
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        image.apply_api(region="full", size="300,", rotation="0", quality="default")
+        self.assertEqual(image.size(), (300, 240))
+        self.assertEqual(image.image.mode, "RGB")
+
+        self.app.config["IIIF_JPEG2000_REDUCE"] = False
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+        self.assertEqual(image.prepare_decode(cases, region="full", size="300,"), {})
+        self.assertEqual(image.size(), (1280, 1024))
+
+    def test_image_lazy(self):
+        """Test the lazy mode against the eager one."""
+        source = Image.radial_gradient("L").resize((1280, 1024)).convert("RGB")
+        tmp_file = BytesIO()
+        source.save(tmp_file, "png")
+
+        tmp_file.seek(0)
+        eager = MultimediaImage.from_string(tmp_file)
+        tmp_file.seek(0)
+        lazy = MultimediaImage.from_string(tmp_file, lazy=True)
+
+        for image in (eager, lazy):
+            image.crop("20,20,1000,800")
+            image.resize("500,")
+            image.crop("pct:10,10,50,50")
+            image.resize("!100,100")
+        # Nothing has been applied yet
+        self.assertEqual(lazy.image.size, (1280, 1024))
+        self.assertEqual(lazy.size(), eager.size())
+        self.assertEqual(lazy.size(), (100, 80))
+
+        for image in (eager, lazy):
+            image.rotate(90, mirror=True)
+            image.quality("grey")
+        self.assertEqual(lazy.size(), (80, 100))
+
+        lazy.render()
+        self.assertEqual(lazy.image.size, eager.image.size)
+        self.assertEqual(lazy.image.mode, eager.image.mode)
+        difference = [
+            abs(a - b) for a, b in zip(lazy.image.tobytes(), eager.image.tobytes())
+        ]
+        self.assertLess(max(difference), 8)
+
+        # A crop only doesn't resample the image
+        tmp_file.seek(0)
+        lazy = MultimediaImage.from_string(tmp_file, lazy=True)
+        lazy.crop("10,10,100,100")
+        lazy.save(BytesIO(), "png")
+        self.assertEqual(
+            lazy.image.tobytes(), source.crop((10, 10, 110, 110)).tobytes()
+        )
+
+        # Geometry after a free rotation is applied on the rotated image
+        tmp_file.seek(0)
+        lazy = MultimediaImage.from_string(tmp_file, lazy=True)
+        lazy.rotate(45)
+        lazy.resize("100,100")
+        self.assertEqual(lazy.size(), (100, 100))
+        lazy.render()
+        self.assertEqual(lazy.image.mode, "RGBA")
+
+        # Errors are raised when the operations are recorded
+        from flask_iiif.errors import MultimediaImageCropError
+
+        self.assertRaises(MultimediaImageCropError, lazy.crop, "200,200,10,10")
+
+    def test_image_lazy_rotations(self):
+        """Test the lazy mode renders the rotations as the eager one."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        source = Image.linear_gradient("L").resize((160, 120)).convert("RGB")
+        tmp_file = BytesIO()
+        source.save(tmp_file, "png")
+
+        for rotation in ("0", "90", "!90", "180", "270", "!0", "!180", "45", "!360"):
+            rendered = []
+            for lazy in (False, True):
+                tmp_file.seek(0)
+                image = IIIFImageAPIWrapper.open_image(tmp_file, lazy=lazy)
+                image.apply_api(
+                    region="10,10,150,100",
+                    size="75,",
+                    rotation=rotation,
+                    quality="default",
+                )
+                rendered.append(image.serve(image_format="png").getvalue())
+            self.assertEqual(rendered[0], rendered[1], rotation)
+
+    def test_image_resize_reducing_gap(self):
+        """Test the integer pre-reduction of large downscales."""
+        from unittest.mock import patch
+
+        source = Image.radial_gradient("L").resize((1280, 1024)).convert("RGB")
+
+        for dimensions in ("128,", ",102", "pct:10", "!128,128", "128,102"):
+            image = MultimediaImage(source)
+            with patch.object(Image.Image, "reduce", wraps=source.reduce) as reduce:
+                image.resize(dimensions)
+                self.assertTrue(reduce.called)
+            expected = source.resize(image.size())
+            difference = [
+                abs(a - b) for a, b in zip(image.image.tobytes(), expected.tobytes())
+            ]
+            self.assertLess(max(difference), 8)
+
+        self.app.config["IIIF_RESIZE_REDUCING_GAP"] = None
+        image = MultimediaImage(source)
+        image.resize("128,")
+        self.assertEqual(image.image.tobytes(), source.resize((128, 102)).tobytes())
+
+    def test_image_identity(self):
+        """Test the detection of requests returning the source."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        tmp_file = BytesIO()
+        Image.new("RGB", (1280, 1024), (255, 0, 0)).save(tmp_file, "jpeg")
+        tmp_file.seek(0)
+        image = IIIFImageAPIWrapper.open_image(tmp_file)
+
+        parameters = dict(
+            version="v2",
+            region="full",
+            size="full",
+            rotation="0",
+            quality="default",
+            image_format="jpg",
+        )
+        for changes, identity in (
+            ({}, True),
+            (dict(image_format="jpeg"), True),
+            (dict(region="0,0,1280,1024", size="1280,"), True),
+            (dict(region="pct:0,0,100,100", size="pct:100"), True),
+            (dict(rotation="360", quality="color"), True),
+            (dict(image_format="png"), False),
+            (dict(region="0,0,1280,1000"), False),
+            (dict(size="1280,1000"), False),
+            (dict(rotation="!0"), False),
+            (dict(quality="grey"), False),
+        ):
+            arguments = dict(parameters, **changes)
+            self.assertEqual(image.is_identity(**arguments), identity, changes)
+
+        self.assertEqual(image.serve_source().read(), tmp_file.getvalue())
+        # Nothing has been decoded
+        self.assertTrue(image.image.tile)
+
+    def test_image_decoded_cache(self):
+        """Test the decoded images are shared between the requests."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+        from flask_iiif.cache.decoded import DecodedImageCache
+
+        iiif = self.app.extensions["iiif"]
+        iiif.decoded_cache = DecodedImageCache(4 * 1024 * 1024)
+        self.addCleanup(iiif.__dict__.pop, "decoded_cache", None)
+
+        tmp_file = BytesIO()
+        Image.new("RGB", (1280, 1024), (255, 0, 0)).save(tmp_file, "jpeg")
+
+        def render(region, size):
+            image = IIIFImageAPIWrapper.open_image(BytesIO(tmp_file.getvalue()))
+            image.apply_api(
+                uuid="id", region=region, size=size, rotation="0", quality="default"
+            )
+            output = image.serve(image_format="png").getvalue()
+            image.close_image()
+            return image, output
+
+        first, output = render("0,0,640,512", "160,")
+        self.assertEqual(len(iiif.decoded_cache.images), 1)
+        second, _ = render("640,512,640,512", "160,")
+        self.assertIs(second._shared, first._shared)
+        self.assertEqual(Image.open(BytesIO(output)).size, (160, 128))
+        # The shared image is not closed with the request, nor holds the file
+        self.assertEqual(first._shared.getpixel((0, 0)), (254, 0, 0))
+        self.assertIsNone(getattr(first._shared, "fp", None))
+
+        # Another resolution level is decoded on its own
+        third, output = render("full", "full")
+        self.assertIsNot(third._shared, first._shared)
+        self.assertEqual(len(iiif.decoded_cache.images), 2)
+        # The shared image is not saved
+        self.assertFalse(hasattr(third._shared, "encoderinfo"))
+        fourth, _ = render("full", "full")
+        self.assertIs(fourth._shared, third._shared)
+        self.assertEqual(render("full", "full")[1], output)
+
+    def test_decoded_cache_eviction(self):
+        """Test the decoded images cache is bounded in bytes."""
+        from flask_iiif.cache.decoded import DecodedImageCache
+
+        cache = DecodedImageCache(100 * 100 * 3 * 2)
+        cache.set("a", Image.new("RGB", (100, 100)))
+        cache.set("b", Image.new("RGB", (100, 100)))
+        self.assertIsNotNone(cache.get("a"))
+        cache.set("c", Image.new("RGB", (100, 100)))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(sorted(cache.images), ["a", "c"])
+        self.assertEqual(cache.size, 100 * 100 * 3 * 2)
+
+        # Too large to be cached
+        cache.set("d", Image.new("I", (200, 200)))
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(cache.image_bytes(Image.new("I;16", (10, 10))), 200)
+
+        cache.delete("a")
+        self.assertEqual(cache.size, 100 * 100 * 3)
+        cache.flush()
+        self.assertEqual((cache.images, cache.size), ({}, 0))
+
+    def test_image_spooled_serve(self):
+        """Test the large images are encoded into temporary files."""
+        from flask_iiif.api import MultimediaImage
+
+        source = Image.effect_noise((256, 256), 64)
+        expected = MultimediaImage(source).serve(image_format="png").getvalue()
+
+        self.app.config["IIIF_SPOOL_MAX_SIZE"] = 1024
+        image_buffer = MultimediaImage(source).serve(image_format="png")
+        self.assertNotIsInstance(image_buffer, BytesIO)
+        self.assertEqual(image_buffer.read(), expected)
+        image_buffer.close()
+
+        # Small images are kept in memory
+        self.app.config["IIIF_SPOOL_MAX_SIZE"] = len(expected)
+        image_buffer = MultimediaImage(source).serve(image_format="png")
+        self.assertIsInstance(image_buffer, BytesIO)
+        self.assertEqual(image_buffer.getvalue(), expected)
+
+    def test_image_spool_writer(self):
+        """Test the spooled data are moved to a temporary file once large."""
+        from flask_iiif.api import _SpoolWriter
+
+        spool = _SpoolWriter(4)
+        spool.write(b"123")
+        spool.seek(1)
+        self.assertIsInstance(spool.file, BytesIO)
+        spool.write(b"abcd")
+        self.assertNotIsInstance(spool.file, BytesIO)
+        self.assertEqual(spool.tell(), 5)
+        spool.seek(0)
+        self.assertEqual(spool.read(), b"1abcd")
+        spool.close()
+
+    def test_image_limits(self):
+        """Test the requests over the size limits are rejected."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+        from flask_iiif.errors import MultimediaImageTooLarge
+
+        tmp_file = BytesIO()
+        Image.new("RGB", (1280, 1024), (255, 0, 0)).save(tmp_file, "jpeg")
+
+        def apply_api(**kwargs):
+            image = IIIFImageAPIWrapper.open_image(BytesIO(tmp_file.getvalue()))
+            arguments = dict(
+                region="full", size="full", rotation="0", quality="default"
+            )
+            arguments.update(kwargs)
+            image.apply_api(**arguments)
+            return image
+
+        self.app.config["IIIF_MAX_WIDTH"] = 1000
+        with self.assertRaises(MultimediaImageTooLarge) as error:
+            apply_api()
+        self.assertEqual(error.exception.code, 400)
+        # Nothing has been decoded
+        self.assertEqual(apply_api(size="1000,").size(), (1000, 800))
+        self.assertEqual(apply_api(region="0,0,1000,1024").size(), (1000, 1024))
+        self.assertRaises(MultimediaImageTooLarge, apply_api, size="pct:200")
+        # The rotated image is higher than large
+        self.app.config["IIIF_MAX_WIDTH"] = None
+        self.app.config["IIIF_MAX_HEIGHT"] = 1100
+        self.assertRaises(MultimediaImageTooLarge, apply_api, rotation="90")
+        self.assertRaises(MultimediaImageTooLarge, apply_api, rotation="10")
+        self.assertEqual(apply_api(rotation="180").size(), (1280, 1024))
+
+        self.app.config["IIIF_MAX_HEIGHT"] = None
+        self.app.config["IIIF_MAX_OUTPUT_PIXELS"] = 640 * 512
+        self.assertRaises(MultimediaImageTooLarge, apply_api, size="641,")
+        self.assertEqual(apply_api(size="640,").size(), (640, 512))
+
+        # The decoded image is reduced by the JPEG decoder
+        self.app.config["IIIF_MAX_OUTPUT_PIXELS"] = None
+        self.app.config["IIIF_MAX_DECODE_PIXELS"] = 640 * 512
+        self.assertRaises(MultimediaImageTooLarge, apply_api)
+        self.assertEqual(apply_api(size="320,").size(), (320, 256))
+
+    def test_canonical_parameters(self):
+        """Test the equivalent requests get the same parameters."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        def canonical(width=1280, height=1024, **kwargs):
+            arguments = dict(
+                region="full",
+                size="full",
+                rotation="0",
+                quality="default",
+                image_format="png",
+            )
+            arguments.update(kwargs)
+            return IIIFImageAPIWrapper.canonical_parameters(width, height, **arguments)
+
+        expected = dict(
+            region="0,0,1280,1024",
+            size="1280,1024",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        self.assertEqual(canonical(), expected)
+        self.assertEqual(canonical(region="0,0,2000,2000"), expected)
+        self.assertEqual(
+            canonical(region="pct:0,0,100,100", size="pct:100", rotation="360"),
+            expected,
+        )
+        self.assertEqual(
+            canonical(size="!1280,2000", quality="color", rotation="0.0"), expected
+        )
+
+        self.assertEqual(
+            canonical(region="pct:50,50,50,50", size="320,", rotation="!90.0"),
+            dict(expected, region="640,512,640,512", size="320,256", rotation="!90"),
+        )
+        self.assertEqual(
+            canonical(quality="grey", image_format="jpg")["quality"], "gray"
+        )
+        self.assertEqual(canonical(image_format="jpg")["image_format"], "jpeg")
+        self.assertEqual(canonical(image_format="tif")["image_format"], "tiff")
+
+        # Unresolved without the size of the source or if invalid
+        self.assertEqual(
+            canonical(width=None, height=None, size="pct:50")["size"], "pct:50"
+        )
+        self.assertEqual(canonical(region="2000,0,10,10")["region"], "2000,0,10,10")
+        self.assertEqual(canonical(rotation="400")["rotation"], "400")
+        self.assertEqual(canonical(rotation="!450")["rotation"], "!450")
+
+    def test_image_full_rotation(self):
+        """Test a full rotation leaves the image as it is."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        tmp_file = BytesIO()
+        Image.new("RGB", (64, 32), (255, 0, 0)).save(tmp_file, "png")
+
+        def render(rotation):
+            image = IIIFImageAPIWrapper.open_image(BytesIO(tmp_file.getvalue()))
+            image.apply_api(
+                region="full", size="full", rotation=rotation, quality="default"
+            )
+            return image.serve(image_format="png").getvalue()
+
+        self.assertEqual(render("360"), render("0"))
+        self.assertEqual(render("0.0"), render("0"))
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Render executor tests."""
+
+import threading
+from io import BytesIO
+
+from .helpers import IIIFTestCase
+
+
+class TestRenderExecutor(IIIFTestCase):
+    """Render executor test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.executor import RenderExecutor
+
+        self.executor = RenderExecutor(1, max_queue=1, retry_after=3)
+        self.addCleanup(self.executor.shutdown)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def block(self):
+        """Hold a rendering thread until released."""
+        self.release.wait(5)
+        return "rendered"
+
+    def test_admission(self):
+        """Test the requests are rejected once the queue is full."""
+        from flask_iiif.errors import MultimediaRenderQueueFull
+
+        running = self.executor.submit(self.block)
+        queued = self.executor.submit(self.block)
+        self.assertEqual(self.executor.queue_depth, 1)
+        with self.assertRaises(MultimediaRenderQueueFull) as error:
+            self.executor.submit(self.block)
+        self.assertEqual(error.exception.code, 503)
+        self.assertEqual(error.exception.retry_after, 3)
+
+        self.release.set()
+        self.assertEqual(running.result(), "rendered")
+        self.assertEqual(queued.result(), "rendered")
+        stats = self.executor.stats()
+        self.assertEqual(
+            (stats["queued"], stats["running"], stats["completed"], stats["rejected"]),
+            (0, 0, 2, 1),
+        )
+        self.assertGreater(stats["max_wait_time"], 0)
+        self.assertGreaterEqual(stats["wait_time"], stats["max_wait_time"])
+
+    def test_application_context(self):
+        """Test the functions run within the application context."""
+        from flask import current_app
+
+        self.assertEqual(self.executor.run(lambda: current_app.name), self.app.name)
+
+    def test_api_queue_full(self):
+        """Test the API answers 503 when the queue is full."""
+        iiif = self.app.extensions["iiif"]
+        iiif.render_executor = self.executor
+        self.addCleanup(iiif.__dict__.pop, "render_executor", None)
+
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="100,",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(get_the_response)
+
+        self.executor.submit(self.block)
+        self.executor.submit(self.block)
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assertStatus(get_the_response, 503)
+        self.assertEqual(get_the_response.headers["Retry-After"], "3")
+        self.assertEqual(get_the_response.json["code"], 503)
+
+
+class TestProcessRenderExecutor(IIIFTestCase):
+    """Process render executor test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.processpool import ProcessRenderExecutor
+
+        self.executor = ProcessRenderExecutor(1)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_worker_config(self):
+        """Test only the picklable IIIF configuration is sent."""
+        config = self.executor.worker_config(self.app.config)
+        self.assertIn("IIIF_VALIDATIONS", config)
+        self.assertNotIn("IIIF_CACHE_HANDLER", config)
+        self.assertNotIn("SERVER_NAME", config)
+
+    def test_api(self):
+        """Test the API renders the images on the processes."""
+        from PIL import Image
+
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="200,200,600,400",
+            size="300,",
+            rotation="45",
+            quality="default",
+            image_format="png",
+        )
+        expected = IIIFImageAPIWrapper.open_image(self.create_image(urlargs["uuid"]))
+        expected.apply_api(
+            region="200,200,600,400", size="300,", rotation="45", quality="default"
+        )
+
+        iiif = self.app.extensions["iiif"]
+        iiif.render_processes = self.executor
+        self.addCleanup(iiif.__dict__.pop, "render_processes", None)
+        get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(get_the_response)
+        image = Image.open(BytesIO(get_the_response.data))
+        self.assertEqual(image.size, expected.size())
+        self.assertEqual(image.tobytes(), expected.image.tobytes())
+
+    def test_spooled(self):
+        """Test the images encoded into temporary files are returned."""
+        from PIL import Image
+
+        from flask_iiif.processpool import ProcessRenderExecutor
+
+        self.app.config["IIIF_SPOOL_MAX_SIZE"] = 1024
+        executor = ProcessRenderExecutor(2)
+        self.addCleanup(executor.shutdown)
+
+        iiif = self.app.extensions["iiif"]
+        iiif.render_processes = executor
+        self.addCleanup(iiif.__dict__.pop, "render_processes", None)
+        # Spooled into a temporary file, then kept in memory
+        for size, image_format in (("500,", "tif"), ("5,", "png")):
+            get_the_response = self.get(
+                "iiifimageapi",
+                urlargs=dict(
+                    uuid="valid:id-üni",
+                    version="v2",
+                    region="full",
+                    size=size,
+                    rotation="0",
+                    quality="default",
+                    image_format=image_format,
+                ),
+            )
+            self.assert200(get_the_response)
+            image = Image.open(BytesIO(get_the_response.data))
+            self.assertEqual(image.size, (int(size[:-1]), int(size[:-1]) * 4 // 5))
+
+    def test_source_file(self):
+        """Test the images are opened from their path."""
+        import os
+        import tempfile
+
+        from PIL import Image
+
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        descriptor, path = tempfile.mkstemp(suffix=".png")
+        os.close(descriptor)
+        self.addCleanup(os.remove, path)
+        Image.new("RGB", (100, 80), (255, 0, 0)).save(path)
+
+        image = IIIFImageAPIWrapper.from_file(path)
+        output = self.executor.render(
+            image, "png", region="full", size="50,", rotation="0", quality="gray"
+        )
+        image.close_image()
+        output = Image.open(output)
+        self.assertEqual((output.size, output.mode), ((50, 40), "L"))
+
+    def test_budget(self):
+        """Test the pixels rendered by the processes are reserved."""
+        from unittest.mock import patch
+
+        from flask_iiif.api import IIIFImageAPIWrapper
+        from flask_iiif.budget import PixelBudget
+
+        iiif = self.app.extensions["iiif"]
+        iiif.pixel_budget = PixelBudget(2000 * 2000)
+        self.addCleanup(iiif.__dict__.pop, "pixel_budget", None)
+
+        image = IIIFImageAPIWrapper.open_image(self.create_image("valid"))
+        with patch.object(
+            iiif.pixel_budget, "acquire", wraps=iiif.pixel_budget.acquire
+        ) as acquire:
+            output = self.executor.render(
+                image,
+                "png",
+                region="full",
+                size="50,",
+                rotation="0",
+                quality="default",
+            )
+        acquire.assert_called_once_with(1280 * 1024)
+        self.assertEqual(iiif.pixel_budget.available, 2000 * 2000 - 1280 * 1024)
+        image.close_image()
+        self.assertEqual(iiif.pixel_budget.available, 2000 * 2000)
+        self.assertEqual(output.read(8), b"\x89PNG\r\n\x1a\n")
+        output.close()
+
+    def test_errors(self):
+        """Test the errors of the processes are raised."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+        from flask_iiif.errors import MultimediaImageCropError
+
+        image = IIIFImageAPIWrapper.open_image(self.create_image("valid"))
+        with self.assertRaises(MultimediaImageCropError) as error:
+            self.executor.render(
+                image, "png", region="2000,2000,10,10", size="full", rotation="0"
+            )
+        self.assertEqual(error.exception.code, 500)
+        self.assertNotEqual(error.exception.message, "MultimediaImageCropError")
+
+    def test_broken_pool(self):
+        """Test the pool is replaced once a rendering process died."""
+        import os
+        from concurrent.futures.process import BrokenProcessPool
+
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        parameters = dict(region="full", size="50,", rotation="0", quality="default")
+        broken = self.executor.pool
+        with self.assertRaises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        image = IIIFImageAPIWrapper.open_image(self.create_image("valid"))
+        with self.assertRaises(BrokenProcessPool):
+            self.executor.render(image, "png", **parameters)
+        self.assertIsNot(self.executor.pool, broken)
+        output = self.executor.render(image, "png", **parameters)
+        self.assertEqual(output.read(8), b"\x89PNG\r\n\x1a\n")
+        output.close()
+        image.close_image()
+
+    def test_output_unlinked(self):
+        """Test the image of a process is destroyed if it is not returned."""
+        from multiprocessing import shared_memory
+        from unittest.mock import patch
+
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        submit = self.executor.pool.submit
+        specs = []
+
+        def rendered_then_failed(function, spec):
+            specs.append(spec)
+            submit(function, spec).result()
+            raise RuntimeError("interrupted")
+
+        image = IIIFImageAPIWrapper.open_image(self.create_image("valid"))
+        with patch.object(self.executor.pool, "submit", rendered_then_failed):
+            with self.assertRaises(RuntimeError):
+                self.executor.render(
+                    image,
+                    "png",
+                    region="full",
+                    size="50,",
+                    rotation="0",
+                    quality="default",
+                )
+        image.close_image()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=specs[0]["output"])
+
+
+class TestPixelBudget(IIIFTestCase):
+    """Pixel budget test case."""
+
+    def test_budget(self):
+        """Test the decoded pixels are bounded."""
+        from flask_iiif.budget import PixelBudget
+        from flask_iiif.errors import MultimediaRenderQueueFull
+
+        budget = PixelBudget(1000, timeout=0.05, retry_after=2)
+        self.assertEqual(budget.acquire(600), 600)
+        with self.assertRaises(MultimediaRenderQueueFull) as error:
+            budget.acquire(600)
+        self.assertEqual(error.exception.retry_after, 2)
+
+        # Waiting for the pixels to be released
+        budget.timeout = 5
+        timer = threading.Timer(0.05, budget.release, (600,))
+        timer.start()
+        self.assertEqual(budget.acquire(600), 600)
+        timer.join()
+        budget.release(600)
+
+        # Larger images are decoded alone
+        self.assertEqual(budget.acquire(5000), 1000)
+        self.assertEqual(budget.available, 0)
+
+    def test_api_budget(self):
+        """Test the images release their pixels once closed."""
+        from flask_iiif.budget import PixelBudget
+
+        iiif = self.app.extensions["iiif"]
+        iiif.pixel_budget = PixelBudget(2000 * 2000)
+        self.addCleanup(iiif.__dict__.pop, "pixel_budget", None)
+
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="100,",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+        urlargs.update(region="0,0,10000,10000")
+        self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+        self.assertEqual(iiif.pixel_budget.available, 2000 * 2000)
+
+        self.app.config["IIIF_MAX_WIDTH"] = 50
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        self.assert400(self.get("iiifimageapi", urlargs=urlargs))
@@ -9,6 +9,8 @@
 
 """Test REST API."""
 
+import os
+import tempfile
 from io import BytesIO
 from unittest.mock import patch
 
@@ -271,6 +273,7 @@ class TestRestAPI(IIIFTestCase):
 
     def test_api_cache_control(self):
         """Test cache-control headers"""
+        from flask_iiif.restful import image_cache_key
 
         urlargs = dict(
             uuid="valid:id-üni",
@@ -282,14 +285,7 @@ class TestRestAPI(IIIFTestCase):
             image_format="pdf",
         )
 
-        key = "iiif:{0}/{1}/{2}/{3}/{4}.{5}".format(
-            urlargs["uuid"],
-            urlargs["region"],
-            urlargs["size"],
-            urlargs["quality"],
-            urlargs["rotation"],
-            urlargs["image_format"],
-        )
+        key = image_cache_key(**urlargs)
 
         cache = self.app.config["IIIF_CACHE_HANDLER"].cache
 
@@ -369,3 +365,220 @@ class TestRestAPI(IIIFTestCase):
             self.assert200(resp)
 
             current_app.config["IIIF_CACHE_REDIS_PREFIX"] = old_value
+
+    def test_api_lazy_rendering(self):
+        """Test the API with lazy rendering."""
+        self.app.config["IIIF_LAZY_RENDERING"] = True
+        get_the_response = self.get(
+            "iiifimageapi",
+            urlargs=dict(
+                uuid="valid:id-üni",
+                version="v2",
+                region="200,200,800,600",
+                size="!400,400",
+                rotation="90",
+                quality="grey",
+                image_format="png",
+            ),
+        )
+        self.assert200(get_the_response)
+        image = Image.open(BytesIO(get_the_response.data))
+        self.assertEqual(image.size, (300, 400))
+        self.assertEqual(image.mode, "L")
+
+    def test_api_spooled_image(self):
+        """Test the API streams and caches images encoded into files."""
+        from flask_iiif.restful import image_cache_key
+
+        self.app.config["IIIF_SPOOL_MAX_SIZE"] = 1024
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="full",
+            rotation="90",
+            quality="default",
+            image_format="png",
+        )
+        get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(get_the_response)
+        self.assertGreater(len(get_the_response.data), 1024)
+        image = Image.open(BytesIO(get_the_response.data))
+        self.assertEqual(image.size, (1024, 1280))
+
+        cached = self.app.config["IIIF_CACHE_HANDLER"].get(image_cache_key(**urlargs))
+        self.assertEqual(cached, get_the_response.data)
+
+    def test_api_passthrough(self):
+        """Test the source is served as it is for identity requests."""
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="full",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        with patch("flask_iiif.api.IIIFImageAPIWrapper.serve") as serve:
+            get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+            self.assertFalse(serve.called)
+        self.assert200(get_the_response)
+        self.assertEqual(
+            get_the_response.data, self.create_image(urlargs["uuid"]).getvalue()
+        )
+
+        # The source files are streamed from their path, without being cached
+        from flask_iiif.restful import image_cache_key
+
+        descriptor, path = tempfile.mkstemp(suffix=".png")
+        os.close(descriptor)
+        self.addCleanup(os.remove, path)
+        with open(path, "wb") as fp:
+            fp.write(self.create_image(urlargs["uuid"]).getvalue())
+        os.utime(path, (0, 86400))
+        urlargs.update(uuid="valid:file")
+        iiif = self.app.extensions["iiif"]
+        with patch.object(iiif, "uuid_to_image_opener", return_value=path):
+            get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(get_the_response)
+        self.assertFalse(get_the_response.is_sequence)
+        self.assertEqual(
+            get_the_response.headers["Last-Modified"], "Fri, 02 Jan 1970 00:00:00 GMT"
+        )
+        with open(path, "rb") as fp:
+            self.assertEqual(get_the_response.get_data(), fp.read())
+        cache = self.app.config["IIIF_CACHE_HANDLER"]
+        self.assertIsNone(cache.get(image_cache_key(**urlargs)))
+
+        self.app.config["IIIF_PASSTHROUGH"] = False
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(get_the_response)
+
+    def test_api_etag(self):
+        """Test the cached images are served with their entity tag."""
+        import hashlib
+
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="50,",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(get_the_response)
+
+        get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(get_the_response)
+        etag = get_the_response.headers["ETag"]
+        self.assertEqual(
+            etag.strip('"'), hashlib.sha1(get_the_response.data).hexdigest()
+        )
+        self.assertEqual(get_the_response.headers["Content-Type"], "image/png")
+
+        get_the_response = self.get(
+            "iiifimageapi", urlargs=urlargs, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(get_the_response.status_code, 304)
+
+    def test_api_canonical_key(self):
+        """Test the equivalent requests share their cached image."""
+        from flask_iiif import restful
+
+        self.app.config.update(IIIF_PASSTHROUGH=False)
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        requests = (
+            ("full", "100,", "0", "default", "jpg"),
+            ("0,0,1280,1024", "100,80", "360", "color", "jpeg"),
+            ("pct:0,0,100,100", "!100,100", "0", "default", "jpg"),
+        )
+        responses = []
+        with patch.object(restful, "run_render", wraps=restful.run_render) as render:
+            for region, size, rotation, quality, image_format in requests:
+                get_the_response = self.get(
+                    "iiifimageapi",
+                    urlargs=dict(
+                        uuid="valid:id-üni",
+                        version="v2",
+                        region=region,
+                        size=size,
+                        rotation=rotation,
+                        quality=quality,
+                        image_format=image_format,
+                    ),
+                )
+                self.assert200(get_the_response)
+                responses.append(get_the_response.data)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(len(set(responses)), 1)
+        self.assertEqual(Image.open(BytesIO(responses[0])).size, (100, 80))
+
+        # The size of the source is kept by the process
+        self.assertEqual(restful.source_size("valid:id-üni"), (1280, 1024))
+        self.assertEqual(
+            restful.image_cache_key(
+                uuid="valid:id-üni",
+                region="full",
+                size="100,",
+                rotation="0",
+                quality="default",
+                image_format="jpg",
+            ),
+            "iiif:valid:id-üni/0,0,1280,1024/100,80/default/0.jpeg",
+        )
+
+    def test_api_canonical_rotation(self):
+        """Test the rotations out of range are not served from the cache."""
+        self.app.config.update(IIIF_PASSTHROUGH=False)
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="100,",
+            rotation="40",
+            quality="default",
+            image_format="png",
+        )
+        self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+        self.assert500(self.get("iiifimageapi", urlargs=dict(urlargs, rotation="400")))
+
+    def test_api_invalidate(self):
+        """Test everything cached about an image is deleted."""
+        from flask_iiif.restful import image_cache_key, info_cache_key
+
+        self.app.config.update(IIIF_PASSTHROUGH=False, IIIF_DERIVE_FROM_CACHE=True)
+        iiif = self.app.extensions["iiif"]
+        cache = self.app.config["IIIF_CACHE_HANDLER"]
+        cache.flush()
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="full",
+            size="100,",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+        self.assert200(
+            self.get("iiifimageinfo", urlargs=dict(uuid="valid:id-üni", version="v2"))
+        )
+        self.assert200(self.get("iiifimageapi", urlargs=dict(urlargs, size="50,")))
+        self.assert200(
+            self.get("iiifimageapi", urlargs=dict(urlargs, uuid="valid:other"))
+        )
+        key = image_cache_key(**urlargs)
+        self.assertIn(key, cache.indexed("valid:id-üni"))
+
+        self.assertEqual(iiif.invalidate("valid:id-üni"), 4)
+        self.assertIsNone(cache.get(key))
+        self.assertIsNone(cache.get(info_cache_key("v2", "valid:id-üni")))
+        self.assertEqual(iiif.derivatives.get("valid:id-üni"), {})
+        self.assertIsNone(iiif.source_sizes.get("valid:id-üni"))
+        self.assertTrue(cache.get(image_cache_key(**dict(urlargs, uuid="valid:other"))))
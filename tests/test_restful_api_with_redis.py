@@ -271,6 +271,7 @@ class TestRestAPI(IIIFTestCaseWithRedis):
 
     def test_api_cache_control(self):
         """Test cache-control headers"""
+        from flask_iiif.restful import image_cache_key
 
         urlargs = dict(
             uuid="valid:id-üni",
@@ -282,14 +283,7 @@ class TestRestAPI(IIIFTestCaseWithRedis):
             image_format="pdf",
         )
 
-        key = "iiif:{0}/{1}/{2}/{3}/{4}.{5}".format(
-            urlargs["uuid"],
-            urlargs["region"],
-            urlargs["size"],
-            urlargs["quality"],
-            urlargs["rotation"],
-            urlargs["image_format"],
-        )
+        key = image_cache_key(**urlargs)
 
         cache = self.app.config["IIIF_CACHE_HANDLER"].cache
 
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Render scheduler tests."""
+
+import threading
+
+from flask import url_for
+
+from .helpers import IIIFTestCase
+
+
+class TestRenderScheduler(IIIFTestCase):
+    """Render scheduler test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.scheduler import RenderScheduler
+
+        self.scheduler = RenderScheduler(
+            [
+                dict(name="tiles", max_cost=1000, workers=2),
+                dict(name="exports", max_cost=None, workers=1),
+            ],
+            uuid_limit=1,
+            timeout=0.1,
+            retry_after=3,
+        )
+
+    def test_lanes(self):
+        """Test the renderings run in the lane of their cost."""
+        self.assertEqual(self.scheduler.lane(10).name, "tiles")
+        self.assertEqual(self.scheduler.lane(1000).name, "tiles")
+        self.assertEqual(self.scheduler.lane(1001).name, "exports")
+
+        with self.scheduler.slot("export", 10**6) as lane:
+            self.assertEqual(lane.name, "exports")
+            # The tiles don't wait for the exports
+            with self.scheduler.slot("tile", 10) as lane:
+                self.assertEqual(lane.name, "tiles")
+                self.assertEqual(self.scheduler.stats()["tiles"]["running"], 1)
+
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["tiles"]["completed"], 1)
+        self.assertEqual(stats["exports"]["completed"], 1)
+
+    def test_lane_full(self):
+        """Test the renderings are rejected once their lane is busy."""
+        from flask_iiif.errors import MultimediaRenderQueueFull
+
+        with self.scheduler.slot("export", 10**6):
+            with self.assertRaises(MultimediaRenderQueueFull) as error:
+                with self.scheduler.slot("other", 10**6):
+                    pass
+        self.assertEqual(error.exception.code, 503)
+        self.assertEqual(error.exception.retry_after, 3)
+        self.assertEqual(self.scheduler.stats()["exports"]["rejected"], 1)
+
+    def test_uuid_limit(self):
+        """Test the renderings of the same image wait for each other."""
+        from flask_iiif.errors import MultimediaRenderQueueFull
+
+        self.scheduler.timeout = 5
+        started = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def render(uuid):
+            with self.scheduler.slot(uuid, 10):
+                order.append(uuid)
+                started.set()
+                release.wait(5)
+
+        first = threading.Thread(target=render, args=("huge",))
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=render, args=("huge",))
+        second.start()
+
+        # Other images still have a tile slot
+        with self.scheduler.slot("small", 10):
+            order.append("small")
+        self.scheduler.timeout = 0.1
+        with self.assertRaises(MultimediaRenderQueueFull):
+            with self.scheduler.slot("huge", 10):
+                pass
+
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(order, ["huge", "small", "huge"])
+        self.assertEqual(self.scheduler.uuids, {})
+
+    def test_estimate_cost(self):
+        """Test the cost of the requests."""
+        from flask_iiif.api import IIIFImageAPIWrapper
+
+        image = IIIFImageAPIWrapper.open_image(self.create_image("valid"))
+        parameters = dict(
+            version="v2",
+            region="full",
+            size="full",
+            rotation="0",
+            quality="default",
+        )
+        tile = image.estimate_cost(
+            version="v2",
+            region="0,0,256,256",
+            size="256,",
+            rotation="0",
+            quality="default",
+            image_format="jpg",
+        )
+        self.assertEqual(tile, 2 * 256 * 256)
+        full = image.estimate_cost(image_format="jpg", **parameters)
+        self.assertEqual(full, 2 * 1280 * 1024)
+        self.assertEqual(
+            image.estimate_cost(image_format="png", **parameters), 3 * 1280 * 1024
+        )
+
+    def test_api(self):
+        """Test the API renders the images through the scheduler."""
+        iiif = self.app.extensions["iiif"]
+        iiif.scheduler = self.scheduler
+        self.addCleanup(iiif.__dict__.pop, "scheduler", None)
+
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="0,0,10,10",
+            size="full",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assert200(get_the_response)
+        self.assertEqual(self.scheduler.stats()["tiles"]["completed"], 1)
+
+        urlargs.update(region="full", size="1000,")
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        with self.scheduler.slot("busy", 10**7):
+            get_the_response = self.get("iiifimageapi", urlargs=urlargs)
+        self.assertStatus(get_the_response, 503)
+        self.assertEqual(get_the_response.headers["Retry-After"], "3")
+        self.assertEqual(self.scheduler.stats()["exports"]["rejected"], 1)
+
+    def test_api_executor(self):
+        """Test the renderings wait for their lane before a thread."""
+        from flask_iiif.executor import RenderExecutor
+
+        iiif = self.app.extensions["iiif"]
+        iiif.scheduler = self.scheduler
+        iiif.render_executor = RenderExecutor(1)
+        self.addCleanup(iiif.render_executor.shutdown)
+        self.addCleanup(iiif.__dict__.pop, "scheduler", None)
+        self.addCleanup(iiif.__dict__.pop, "render_executor", None)
+        self.scheduler.timeout = 5
+
+        urlargs = dict(
+            uuid="valid:id-üni",
+            version="v2",
+            region="0,0,10,10",
+            size="full",
+            rotation="0",
+            quality="default",
+            image_format="png",
+        )
+        # The size of the source is learnt
+        self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+
+        url = url_for("iiifimageapi", **dict(urlargs, region="full", size="1000,"))
+        responses = []
+
+        def request():
+            responses.append(self.client.get(url, base_url=self.app.config["SITE_URL"]))
+
+        with self.scheduler.slot("busy", 10**7):
+            thread = threading.Thread(target=request)
+            thread.start()
+            for _ in range(500):
+                if self.scheduler.stats()["exports"]["waiting"]:
+                    break
+                thread.join(0.01)
+            self.assertEqual(self.scheduler.stats()["exports"]["waiting"], 1)
+            # The rendering thread is free for the tiles
+            self.assertEqual(iiif.render_executor.stats()["running"], 0)
+            urlargs.update(region="10,10,10,10")
+            self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+        thread.join()
+        self.assert200(responses[0])
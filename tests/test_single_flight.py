@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Single-flight rendering tests."""
+
+import threading
+import time
+
+from .helpers import IIIFTestCase
+
+
+class TestSingleFlight(IIIFTestCase):
+    """Single-flight rendering test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        from flask_iiif.cache.simple import ImageSimpleCache
+        from flask_iiif.singleflight import SingleFlight
+
+        self.cache = ImageSimpleCache()
+        self.single_flight = SingleFlight()
+        self.renders = []
+        self.app.config["IIIF_SINGLE_FLIGHT_INTERVAL"] = 0.01
+
+    def render(self, delay=0):
+        """Render an image slowly and cache it."""
+        self.renders.append(threading.current_thread())
+        time.sleep(delay)
+        self.cache.set("key", b"image")
+        return b"image"
+
+    def test_threads(self):
+        """Test the threads of a process render the image once."""
+        results = []
+
+        def request():
+            with self.app.app_context():
+                results.append(
+                    self.single_flight(self.cache, "key", lambda: self.render(0.1))
+                )
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.renders), 1)
+        self.assertEqual(results, [b"image"] * 5)
+        self.assertEqual(self.single_flight.flights, {})
+        # The lease has been released
+        self.assertTrue(self.cache.acquire_lock("key", 10))
+
+    def test_other_worker(self):
+        """Test waiting for the image rendered by another worker."""
+        token = self.cache.acquire_lock("key", 10)
+
+        def worker():
+            time.sleep(0.1)
+            with self.app.app_context():
+                self.cache.set("key", b"image")
+                self.cache.release_lock("key", token)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertEqual(self.single_flight(self.cache, "key", self.render), b"image")
+        thread.join()
+        self.assertEqual(self.renders, [])
+
+    def test_wait_timeout(self):
+        """Test rendering when the other worker is too slow."""
+        self.app.config["IIIF_SINGLE_FLIGHT_WAIT"] = 0.05
+        self.cache.acquire_lock("key", 10)
+        self.assertEqual(self.single_flight(self.cache, "key", self.render), b"image")
+        self.assertEqual(len(self.renders), 1)
+
+    def test_lease_released_without_image(self):
+        """Test rendering when the other worker failed."""
+        token = self.cache.acquire_lock("key", 10)
+        timer = threading.Timer(0.05, self.cache.release_lock, ("key", token))
+        timer.start()
+        self.assertEqual(self.single_flight(self.cache, "key", self.render), b"image")
+        timer.join()
+        self.assertEqual(len(self.renders), 1)
+
+    def test_not_cached(self):
+        """Test the threads render at the same time if nothing is cached."""
+        results, running = [], [0, 0]
+        lock = threading.Lock()
+
+        def render():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.1)
+            with lock:
+                running[0] -= 1
+            return b"image"
+
+        def request():
+            with self.app.app_context():
+                results.append(self.single_flight(self.cache, "key", render))
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [b"image"] * 4)
+        # The waiting threads have rendered at the same time
+        self.assertGreater(running[1], 1)
+
+    def test_leader_hangs(self):
+        """Test the threads stop waiting for a hanging rendering."""
+        self.app.config["IIIF_SINGLE_FLIGHT_LEASE"] = 0.05
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def hang():
+            release.wait(5)
+            return b"late"
+
+        def request():
+            with self.app.app_context():
+                self.single_flight(self.cache, "key", hang)
+
+        thread = threading.Thread(target=request)
+        thread.start()
+        while "key" not in self.single_flight.flights:
+            time.sleep(0.01)
+        start = time.time()
+        self.assertEqual(self.single_flight(self.cache, "key", self.render), b"image")
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(len(self.renders), 1)
+        release.set()
+        thread.join()
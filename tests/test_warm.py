@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Flask-IIIF
+# Copyright (C) 2026 CERN.
+#
+# Flask-IIIF is free software; you can redistribute it and/or modify
+# it under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Cache warming tests."""
+
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from .helpers import IIIFTestCase
+
+
+class TestCacheWarmer(IIIFTestCase):
+    """Cache warming test case."""
+
+    def setUp(self):
+        """Run before the test."""
+        self.app.config["IIIF_CACHE_HANDLER"].flush()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.state = os.path.join(self.directory, "warm.state")
+
+    def test_tile_requests(self):
+        """Test the tiles are requested as by the viewers."""
+        from flask_iiif.warm import tile_requests
+
+        requests = tile_requests(
+            1280, 1024, tile_width=256, scale_factors=[1, 2, 4, 8], min_scale_factor=4
+        )
+        self.assertEqual(
+            [(request["region"], request["size"]) for request in requests],
+            [
+                ("0,0,1280,1024", "160,"),
+                ("0,0,1024,1024", "256,"),
+                ("1024,0,256,1024", "64,"),
+            ],
+        )
+
+    def test_warm(self):
+        """Test the images of the uuids are rendered and cached."""
+        from flask_iiif.restful import image_cache_key
+        from flask_iiif.warm import CacheWarmer, thumbnail_requests
+
+        cache = self.app.config["IIIF_CACHE_HANDLER"]
+        requests = thumbnail_requests(["!100,100"], image_format="png")
+        progress = []
+        warmer = CacheWarmer(
+            workers=2,
+            state=self.state,
+            progress=lambda uuid, stats: progress.append(uuid),
+            min_scale_factor=4,
+        )
+        stats = warmer.warm(["valid:1", "valid:2", "", "invalid"], requests)
+        self.assertEqual(
+            stats, dict(uuids=3, skipped=0, rendered=14, cached=0, failed=1)
+        )
+        self.assertEqual(sorted(progress), ["invalid", "valid:1", "valid:2"])
+        with open(self.state) as fp:
+            self.assertEqual(sorted(fp.read().split()), ["valid:1", "valid:2"])
+        self.assertTrue(cache.get(image_cache_key(uuid="valid:1", **requests[0])))
+
+        # The request is served from the cache
+        urlargs = dict(requests[0], uuid="valid:1", version="v2", size="100,")
+        with patch("flask_iiif.restful.render_image") as render_image:
+            self.assert200(self.get("iiifimageapi", urlargs=urlargs))
+            render_image.assert_not_called()
+
+        # Resumed
+        stats = CacheWarmer(state=self.state).warm(["valid:1", "valid:3"], requests)
+        self.assertEqual(
+            stats, dict(uuids=1, skipped=1, rendered=1, cached=0, failed=0)
+        )
+        # Already cached, without waiting
+        warmer = CacheWarmer(rate=0.001)
+        with patch.object(warmer.limiter, "wait") as wait:
+            stats = warmer.warm(iter(["valid:1"]), requests)
+        self.assertEqual(
+            stats, dict(uuids=1, skipped=0, rendered=0, cached=1, failed=0)
+        )
+        wait.assert_not_called()
+
+    def test_rate(self):
+        """Test the renderings are spaced out."""
+        from flask_iiif.warm import RateLimiter
+
+        with patch("flask_iiif.warm.time") as time:
+            time.monotonic.return_value = 10
+            limiter = RateLimiter(100)
+            for _ in range(3):
+                limiter.wait()
+        delays = [call.args[0] for call in time.sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertAlmostEqual(delays[0], 0.01)
+        self.assertAlmostEqual(delays[1], 0.02)
+
+    def test_cli(self):
+        """Test the warm command."""
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(
+            args=["iiif", "warm", "--size", "50,", "--resume", self.state],
+            input="valid:1\ninvalid\n",
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("1 images rendered", result.output)
+        self.assertIn("1 failed", result.output)
+
+        result = runner.invoke(
+            args=["iiif", "warm", "--size", "50,", "--resume", self.state],
+            input="valid:1\n",
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("skipped 1", result.output)